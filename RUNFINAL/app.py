@@ -2,28 +2,141 @@
 import eventlet
 eventlet.monkey_patch()
 import os
+import sys
+import json
+import queue
+import random
 import sqlite3
+import threading
+import time
+import uuid
+import functools
+import subprocess
+from collections import Counter, OrderedDict
 from io import BytesIO
-from datetime import datetime
+from datetime import datetime, timezone
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import (Flask, render_template, request, jsonify, send_file, Response, stream_with_context,
+                   g, has_app_context)
 from flask_sqlalchemy import SQLAlchemy
-from flask_socketio import SocketIO
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.units import inch
+import sqlalchemy.event
+from sqlalchemy.engine import Engine
+from flask_socketio import SocketIO, join_room, leave_room
+
+import report
+from assets import Assets
+from metrics import Registry, COUNT_BUCKETS, CONTENT_TYPE
+
+try:
+    import msgpack
+except ImportError:  # the compact format still works as JSON arrays
+    msgpack = None
 
 DB_PATH = os.environ.get("instance/database.db", "database.db")
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'f3cfe9ed8fae309f02079dbf'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///database.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Multi-worker mode: point SOCKETIO_MESSAGE_QUEUE at Redis (redis://host:6379/0)
+# so emits from any worker reach clients connected to every other worker.
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+BOARD_MESSAGE_QUEUE = os.environ.get('BOARD_MESSAGE_QUEUE', SOCKETIO_MESSAGE_QUEUE)
+# Status clicks arriving within this window are committed as one transaction.
+STATUS_BATCH_WINDOW_MS = int(os.environ.get('STATUS_BATCH_WINDOW_MS', '30'))
+# A board snapshot is stored every this many revisions, bounding as-of replays.
+BOARD_SNAPSHOT_EVERY = int(os.environ.get('BOARD_SNAPSHOT_EVERY', '500'))
+# PDF reports render in this many worker processes; finished jobs are kept for download.
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', '2'))
+REPORT_JOBS_KEPT = int(os.environ.get('REPORT_JOBS_KEPT', '20'))
+REPORT_TIMEOUT = float(os.environ.get('REPORT_TIMEOUT', '120'))   # seconds a download waits for its render
+
 db = SQLAlchemy(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+assets = Assets(app)
+socketio = SocketIO(app, cors_allowed_origins="*", message_queue=SOCKETIO_MESSAGE_QUEUE)
+
+# Instrumentation, exposed on /metrics. SQL is attributed to the HTTP route or
+# socket event that ran it through g.sql = [statements, seconds].
+metrics = Registry()
+REQUEST_SECONDS = metrics.histogram('http_request_duration_seconds', 'HTTP request latency.',
+                                    ('method', 'route', 'status'))
+SOCKET_EVENT_SECONDS = metrics.histogram('socketio_event_duration_seconds',
+                                         'Socket.IO handler latency, up to the ack.', ('event',))
+SQL_STATEMENTS = metrics.histogram('db_statements_per_handler', 'SQL statements per request or socket event.',
+                                   ('handler',), buckets=COUNT_BUCKETS)
+SQL_SECONDS = metrics.histogram('db_seconds_per_handler', 'Time spent in SQL per request or socket event.',
+                                ('handler',))
+SQL_TOTAL = metrics.counter('db_statements_total', 'SQL statements executed by this process.')
+EMITS = metrics.counter('socketio_emits_total', 'Socket.IO emits.', ('event',))
+EMIT_BYTES = metrics.counter('socketio_emit_bytes_total', 'Payload bytes per emit, before fan-out to clients '
+                             '(JSON payloads estimated from a sample).', ('event',))
+# Bytes payloads (msgpack) are counted exactly. JSON payloads would need an
+# extra json.dumps each, so one in EMIT_SIZE_SAMPLE is sized and counted that
+# many times over.
+EMIT_SIZE_SAMPLE = 16
+CLIENTS = metrics.gauge('socketio_connected_clients', 'Socket.IO clients connected to this process.')
+REPORT_SECONDS = metrics.histogram('report_render_seconds', 'Report job time, from start to PDF, in a worker process.')
+
+
+@sqlalchemy.event.listens_for(Engine, 'before_cursor_execute')
+def sql_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('sql_started', []).append(time.perf_counter())
+
+
+@sqlalchemy.event.listens_for(Engine, 'after_cursor_execute')
+def sql_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['sql_started'].pop()
+    SQL_TOTAL.inc()
+    if has_app_context() and 'sql' in g:
+        g.sql[0] += 1
+        g.sql[1] += elapsed
+
+
+def record_sql(handler):
+    SQL_STATEMENTS.observe(g.sql[0], handler)
+    SQL_SECONDS.observe(g.sql[1], handler)
+
+
+@app.before_request
+def start_request_timer():
+    g.started = time.perf_counter()
+    g.sql = [0, 0.0]
+
+
+@app.after_request
+def record_request(response):
+    if 'started' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - g.started, request.method, route, response.status_code)
+        record_sql(route)
+    return response
+
+
+def socket_event(name):
+    """socketio.on(name) that also records the handler's latency and SQL."""
+    def decorate(handler):
+        @functools.wraps(handler)
+        def timed(*args):
+            g.sql = [0, 0.0]
+            started = time.perf_counter()
+            try:
+                return handler(*args)
+            finally:
+                SOCKET_EVENT_SECONDS.observe(time.perf_counter() - started, name)
+                record_sql(f'socket:{name}')
+        return socketio.on(name)(timed)
+    return decorate
+
+
+def emit_event(event, data, to):
+    """socketio.emit, counting the emit and (for a sample of JSON payloads) its size."""
+    EMITS.inc(event)
+    if isinstance(data, bytes):
+        EMIT_BYTES.inc(event, amount=len(data))
+    elif random.random() * EMIT_SIZE_SAMPLE < 1:
+        EMIT_BYTES.inc(event, amount=EMIT_SIZE_SAMPLE * len(json.dumps(data, separators=(',', ':'))))
+    socketio.emit(event, data, to=to)
 
 class Door(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -42,42 +155,625 @@ class DoorDetail(db.Model):
     notes = db.Column(db.Text, nullable=True)
     door = db.relationship('Door', backref=db.backref('detail', uselist=False))
 
+class BoardState(db.Model):
+    """Single row holding the board revision shared by every worker."""
+    id = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    epoch = db.Column(db.String(32), nullable=False)
+
+class DoorEvent(db.Model):
+    """Append-only log of every board and NEW DOORS change.
+
+    Board events carry the revision they were committed at and the changes
+    applied to one door (``data`` is JSON, e.g. ``{"status": "Empty",
+    "detail": null}``); NEW DOORS events have no revision or door.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    rev = db.Column(db.Integer, nullable=True)
+    at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    kind = db.Column(db.String(20), nullable=False)
+    door_id = db.Column(db.Integer, nullable=True, index=True)
+    data = db.Column(db.Text, nullable=False)
+
+class BoardSnapshot(db.Model):
+    """The board and NEW DOORS list as of event ``event_id`` (JSON in ``data``)."""
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, nullable=False, index=True)
+    rev = db.Column(db.Integer, nullable=False)
+    at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    data = db.Column(db.Text, nullable=False)
+
 class NewDoor(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     door_number = db.Column(db.String(50), nullable=False)
     trailer_number = db.Column(db.String(50), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+DETAIL_FIELDS = ('run_number', 'loader', 'trailer', 'trailer_temp1', 'trailer_temp2', 'stores', 'notes')
+
+
+def door_to_dict(door):
+    """Plain snapshot of a door and its detail, safe to share between requests."""
+    detail = door.detail
+    return {
+        'id': door.id,
+        'name': door.name,
+        'status': door.status,
+        'detail': {f: getattr(detail, f) for f in DETAIL_FIELDS} if detail else None,
+    }
+
+
+# Compact wire format for low-bandwidth clients. Doors travel as fixed-field
+# arrays and changes as ``[door_id, mask, *values]`` carrying only the fields
+# that changed; bit i of the mask stands for DELTA_FIELDS[i]. Statuses are sent
+# as their index in STATUS_CODES (anything else as the plain string). Clients
+# get WIRE_HEADER once, when they negotiate the encoding.
+STATUS_CODES = ('Empty', 'Loading', 'Loaded', 'Backhaul')
+DELTA_FIELDS = ('status',) + DETAIL_FIELDS
+DETAIL_CLEARED = 1 << len(DELTA_FIELDS)
+WIRE_HEADER = {'v': 1, 'statuses': STATUS_CODES, 'fields': DELTA_FIELDS, 'detail_cleared': DETAIL_CLEARED}
+ENCODINGS = ('json', 'compact', 'msgpack') if msgpack else ('json', 'compact')
+
+
+def encode_status(status):
+    return STATUS_CODES.index(status) if status in STATUS_CODES else status
+
+
+def encode_door(door):
+    """A door snapshot as ``[id, name, status, rev, detail values or None]``."""
+    detail = door['detail']
+    return [door['id'], door['name'], encode_status(door['status']), door['rev'],
+            [detail[f] for f in DETAIL_FIELDS] if detail else None]
+
+
+def encode_delta(previous, door):
+    """The fields of ``door`` that differ from ``previous`` as ``[id, mask, *values]``, or None.
+
+    With no ``previous`` every field is sent.
+    """
+    mask, values = 0, []
+    if previous is None or previous['status'] != door['status']:
+        mask |= 1
+        values.append(encode_status(door['status']))
+    old = previous['detail'] if previous else None
+    new = door['detail']
+    if new is None:
+        if old is not None or previous is None:
+            mask |= DETAIL_CLEARED
+    else:
+        for bit, field in enumerate(DETAIL_FIELDS, 1):
+            if old is None or old[field] != new[field]:
+                mask |= 1 << bit
+                values.append(new[field])
+    return [door['id'], mask] + values if mask else None
+
+
+def encode_changes(changes, encoding):
+    """Encode a changes_since() answer: JSON as is, otherwise ``[header, epoch, rev, full, doors]``."""
+    if encoding == 'json':
+        return changes
+    compact = [WIRE_HEADER, changes['epoch'], changes['rev'], changes['full'],
+               [encode_door(door) for door in changes['doors']]]
+    return msgpack.packb(compact) if encoding == 'msgpack' else compact
+
+
+def pick_encoding(preferred):
+    """First of the client's encodings (a name or a list) that the server supports."""
+    if isinstance(preferred, str):
+        preferred = [preferred]
+    for encoding in preferred or ():
+        if encoding in ENCODINGS:
+            return encoding
+    return 'json'
+
+
+class BoardCache:
+    """Process-wide copy of the door board (doors plus their DoorDetail).
+
+    The board is loaded once with a single joined query and then kept current
+    by the write paths below, so page renders and API reads never touch the
+    database. Entries are replaced, never mutated, so a snapshot handed to a
+    template stays consistent while a write lands.
+
+    Every write is stamped with the next board revision (see next_revision),
+    and each door remembers the revision it last changed at, which lets
+    clients ask for "changes since revision N" instead of reloading the whole
+    board. The revision and ``epoch`` live in the database, so they are shared
+    by every worker and survive restarts; a new database gets a new epoch and
+    clients holding revisions from the old one fall back to a full snapshot.
+
+    Per-status counters are maintained alongside the doors, so status counts
+    are an O(1) read instead of a scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._doors = None
+        self._counts = Counter()
+        self.epoch = None
+        self.revision = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_loaded(self, record=True):
+        if self._doors is None:
+            if record:
+                self.misses += 1
+            # Revision first: doors read afterwards are at least that new.
+            state = db.session.get(BoardState, 1)
+            self.epoch, self.revision = (state.epoch, state.revision) if state else (None, 0)
+            doors = Door.query.options(db.joinedload(Door.detail)).order_by(Door.id).all()
+            self._doors = {door.id: dict(door_to_dict(door), rev=self.revision) for door in doors}
+            self._counts = Counter(door.status for door in doors)
+        elif record:
+            self.hits += 1
+
+    def doors(self):
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._doors.values())
+
+    def get(self, door_id):
+        with self._lock:
+            self._ensure_loaded()
+            return self._doors.get(door_id)
+
+    def _replace(self, current, door, rev):
+        door = dict(door, rev=rev)
+        if current is None or door['status'] != current['status']:
+            if current is not None:
+                self._counts[current['status']] -= 1
+                if not self._counts[current['status']]:
+                    del self._counts[current['status']]
+            self._counts[door['status']] += 1
+        self._doors[door['id']] = door
+        return door
+
+    def apply(self, rev, changes_by_door):
+        """Write-through after a commit: apply ``{door_id: changes}`` at revision ``rev``.
+
+        Returns the updated doors and their compact deltas (see encode_delta).
+        """
+        with self._lock:
+            # Loaded only now, after the commit, the cache cannot tell what changed.
+            known = self._doors is not None
+            self._ensure_loaded(record=False)
+            self.revision = max(self.revision, rev)
+            updated, delta = [], []
+            for door_id, changes in changes_by_door.items():
+                current = self._doors.get(door_id)
+                if current is not None:
+                    door = self._replace(current, {**current, **changes}, rev)
+                    updated.append(door)
+                    row = encode_delta(current if known else None, door)
+                    if row:
+                        delta.append(row)
+            return updated, delta
+
+    def refresh(self, rev, door_ids):
+        """Re-read doors another worker changed at revision ``rev``."""
+        with self._lock:
+            # Even unloaded, the cache must not report a revision older than the board's.
+            self.revision = max(self.revision, rev)
+            if self._doors is None:
+                return
+            doors = (Door.query.options(db.joinedload(Door.detail))
+                     .filter(Door.id.in_(door_ids)).all())
+            for door in doors:
+                self._replace(self._doors.get(door.id), door_to_dict(door), rev)
+
+    def status_counts(self):
+        with self._lock:
+            self._ensure_loaded()
+            return dict(self._counts)
+
+    def snapshot(self):
+        """Current doors together with the revision they are consistent with."""
+        with self._lock:
+            self._ensure_loaded()
+            return {'epoch': self.epoch, 'rev': self.revision, 'doors': list(self._doors.values())}
+
+    def changes_since(self, since, epoch=None, door_ids=None):
+        """Doors changed after revision ``since``; a full board if that revision is unknown.
+
+        ``door_ids`` narrows the answer to the doors a client is subscribed to.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            full = epoch != self.epoch or since is None or since > self.revision
+            doors = [d for d in self._doors.values()
+                     if (full or d['rev'] > since) and (door_ids is None or d['id'] in door_ids)]
+            return {'epoch': self.epoch, 'rev': self.revision, 'full': full, 'doors': doors}
+
+    def invalidate(self):
+        with self._lock:
+            self._doors = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'doors': len(self._doors) if self._doors is not None else 0,
+                'loaded': self._doors is not None,
+                'revision': self.revision,
+            }
+
+
+board_cache = BoardCache()
+
+
+class LocalBoardBus:
+    """In-process board bus: all a single worker needs, and a stand-in for Redis in tests."""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, message):
+        for callback in list(self._subscribers):
+            callback(message)
+
+    def start(self):
+        pass
+
+
+class RedisBoardBus(LocalBoardBus):
+    """Tells the other workers which doors changed, over Redis pub/sub."""
+
+    channel = 'loxdash:board'
+
+    def __init__(self, url):
+        super().__init__()
+        import redis
+        self._redis = redis.Redis.from_url(url)
+
+    def publish(self, message):
+        self._redis.publish(self.channel, json.dumps(message))
+
+    def start(self):
+        socketio.start_background_task(self._listen)
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Anything published while we were not listening is lost, so start over.
+                board_cache.invalidate()
+                for item in pubsub.listen():
+                    super().publish(json.loads(item['data']))
+            except Exception:
+                app.logger.exception('board bus connection lost, reconnecting')
+                eventlet.sleep(1)
+
+
+WORKER_ID = uuid.uuid4().hex
+board_bus = RedisBoardBus(BOARD_MESSAGE_QUEUE) if BOARD_MESSAGE_QUEUE else LocalBoardBus()
+
+
+def on_board_message(message):
+    if message.get('origin') == WORKER_ID:
+        return
+    with app.app_context():
+        board_cache.refresh(message['rev'], message['door_ids'])
+
+
+board_bus.subscribe(on_board_message)
+board_bus.start()
+
+
+# Socket.IO rooms. Clients subscribe to the topics their view needs instead of
+# receiving every event: 'board' (every door change), 'door:<id>' (changes to
+# one door), 'counts' (status counters) and 'new_doors' (the NEW DOORS list).
+# Board rooms exist once per encoding ('board', 'board~compact', ...), so each
+# client gets door changes in the encoding it negotiated.
+TOPICS = ('board', 'counts', 'new_doors')
+MAX_SUBSCRIBED_DOORS = 500
+
+
+def door_room(door_id):
+    return f'door:{door_id}'
+
+
+def encoded_room(room, encoding):
+    return room if encoding == 'json' else f'{room}~{encoding}'
+
+
+def board_rooms(door_ids, encoding='json'):
+    """Rooms that want to hear about a change to ``door_ids``."""
+    return [encoded_room(room, encoding) for room in ['board'] + [door_room(i) for i in door_ids]]
+
+
+def emit_board(event, payload, rev, door_ids, delta):
+    """Send a board change: ``payload`` as ``event`` to JSON subscribers, and
+    ``[rev, delta]`` as 'board_delta' to compact and msgpack subscribers."""
+    emit_event(event, payload, board_rooms(door_ids))
+    compact = [rev, delta]
+    for encoding in ENCODINGS[1:]:
+        data = msgpack.packb(compact) if encoding == 'msgpack' else compact
+        emit_event('board_delta', data, board_rooms(door_ids, encoding))
+
+
+def parse_door_ids(value):
+    """Accept a list of door ids or a range string such as ``"1-12,20"``."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        door_ids = set()
+        for part in filter(None, (p.strip() for p in value.split(','))):
+            first, _, last = part.partition('-')
+            if not first.isdigit() or (last and not last.isdigit()):
+                raise ValueError(f'bad door range {part!r}')
+            first, last = int(first), int(last or first)
+            if last < first or last - first >= MAX_SUBSCRIBED_DOORS:
+                raise ValueError(f'bad door range {part!r}')
+            door_ids.update(range(first, last + 1))
+    elif isinstance(value, list) and all(isinstance(i, int) for i in value):
+        door_ids = set(value)
+    else:
+        raise ValueError('doors must be a list of ids or a range string')
+    if len(door_ids) > MAX_SUBSCRIBED_DOORS:
+        raise ValueError(f'at most {MAX_SUBSCRIBED_DOORS} doors per subscription')
+    return door_ids
+
+
+def parse_subscription(data):
+    """Turn ``{topics: [...], doors: ..., encoding: [...]}`` into ``(rooms, encoding)``."""
+    data = data if isinstance(data, dict) else {}
+    topics = data.get('topics') or []
+    if not isinstance(topics, list) or any(t not in TOPICS for t in topics):
+        raise ValueError(f'topics must be a list drawn from {", ".join(TOPICS)}')
+    door_ids = parse_door_ids(data.get('doors')) or ()
+    encoding = pick_encoding(data.get('encoding'))
+    rooms = [t for t in topics if t != 'board']
+    rooms += board_rooms(sorted(door_ids), encoding)[0 if 'board' in topics else 1:]
+    return rooms, encoding
+
+
+def next_revision():
+    """Bump the shared board revision inside the current transaction.
+
+    SQLite serialises writers, so revisions are handed out in commit order
+    across all workers.
+    """
+    db.session.execute(db.update(BoardState).where(BoardState.id == 1)
+                       .values(revision=BoardState.revision + 1))
+    return db.session.execute(db.select(BoardState.revision).where(BoardState.id == 1)).scalar_one()
+
+
+def commit_board(changes_by_door):
+    """Commit the session as the next board revision and propagate ``{door_id: changes}``.
+
+    Updates this worker's cache and tells the other workers to refresh those
+    doors. Returns ``(rev, updated door snapshots, compact deltas)``.
+    """
+    rev = next_revision()
+    log_board_events(rev, changes_by_door)
+    db.session.commit()
+    doors, delta = board_cache.apply(rev, changes_by_door)
+    board_bus.publish({'origin': WORKER_ID, 'rev': rev, 'door_ids': list(changes_by_door)})
+    return rev, doors, delta
+
+def event_kind(changes):
+    if 'detail' in changes:
+        return 'detail' if changes['detail'] is not None else 'clear'
+    return 'status'
+
+
+def log_board_events(rev, changes_by_door):
+    """Record one DoorEvent per changed door in the current transaction.
+
+    Every BOARD_SNAPSHOT_EVERY revisions a snapshot is stored too. The
+    transaction already holds SQLite's write lock (next_revision), so the
+    snapshot and the event log cannot drift apart.
+    """
+    now = datetime.utcnow()
+    db.session.add_all(DoorEvent(rev=rev, at=now, kind=event_kind(changes), door_id=door_id,
+                                 data=json.dumps(changes))
+                       for door_id, changes in changes_by_door.items())
+    if rev % BOARD_SNAPSHOT_EVERY == 0:
+        db.session.flush()
+        take_board_snapshot(rev)
+
+
+def log_new_door_event(kind, data):
+    db.session.add(DoorEvent(kind=kind, data=json.dumps(data)))
+
+
+def new_door_to_dict(nd):
+    return {'id': nd.id, 'door_number': nd.door_number, 'trailer_number': nd.trailer_number}
+
+
+def take_board_snapshot(rev):
+    """Store the board as the database has it now, inside the caller's transaction."""
+    event_id = db.session.execute(db.select(db.func.max(DoorEvent.id))).scalar() or 0
+    # Bulk updates bypass the identity map, so reload what the session holds.
+    doors = (Door.query.options(db.joinedload(Door.detail)).order_by(Door.id)
+             .execution_options(populate_existing=True).all())
+    new_doors = NewDoor.query.order_by(NewDoor.id).all()
+    db.session.add(BoardSnapshot(event_id=event_id, rev=rev, data=json.dumps({
+        'doors': [door_to_dict(door) for door in doors],
+        'new_doors': [new_door_to_dict(nd) for nd in new_doors],
+    })))
+
+
+def board_as_of(at):
+    """Rebuild the board at time ``at``: the nearest earlier snapshot plus the events after it.
+
+    Returns None when ``at`` is older than the first snapshot.
+    """
+    snapshot = (BoardSnapshot.query.filter(BoardSnapshot.at <= at)
+                .order_by(BoardSnapshot.event_id.desc()).first())
+    if snapshot is None:
+        return None
+    state = json.loads(snapshot.data)
+    doors = {door['id']: door for door in state['doors']}
+    new_doors = {nd['id']: nd for nd in state['new_doors']}
+    rev = snapshot.rev
+    events = (DoorEvent.query.filter(DoorEvent.id > snapshot.event_id, DoorEvent.at <= at)
+              .order_by(DoorEvent.id).yield_per(500))
+    for event in events:
+        data = json.loads(event.data)
+        if event.kind == 'new_door_added':
+            new_doors[data['id']] = data
+        elif event.kind == 'new_door_removed':
+            new_doors.pop(data['id'], None)
+        elif event.door_id in doors:
+            doors[event.door_id].update(data)
+            rev = event.rev
+    return {'at': at.isoformat(), 'rev': rev, 'doors': list(doors.values()),
+            'new_doors': list(new_doors.values())}
+
+
+# Schema migrations. db.create_all() only creates missing tables, so changes to
+# existing ones are versioned here and applied once per database; the applied
+# version is kept in SQLite's user_version. Steps are idempotent, so a database
+# created by create_all() at the latest schema passes through them unchanged.
+def add_missing_columns(conn):
+    """Add model columns that older tables lack (e.g. DoorDetail.loader, trailer, temps, stores)."""
+    for table in db.metadata.sorted_tables:
+        existing = {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table.name})')}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} '
+                                     f'{column.type.compile(conn.dialect)}')
+
+
+MIGRATIONS = (
+    (1, add_missing_columns),
+    (2, 'CREATE INDEX IF NOT EXISTS ix_new_door_created_at ON new_door (created_at)'),
+)
+
+
+def run_migrations(engine=None):
+    """Apply the MIGRATIONS newer than the database's user_version, each in its own transaction."""
+    engine = engine or db.engine
+    with engine.connect() as conn:
+        current = conn.exec_driver_sql('PRAGMA user_version').scalar()
+    for version, step in MIGRATIONS:
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            if callable(step):
+                step(conn)
+            else:
+                conn.exec_driver_sql(step)
+            conn.exec_driver_sql(f'PRAGMA user_version = {version}')
+        app.logger.info('migrated database to version %s', version)
+
 
 def init_db():
     with app.app_context():
         db.create_all()
+        run_migrations()
         if Door.query.count() == 0:
             for i in range(1, 51):
                 db.session.add(Door(name=f"Run  {i}", status="Backhaul"))
             db.session.commit()
+        if db.session.get(BoardState, 1) is None:
+            db.session.add(BoardState(id=1, revision=0, epoch=uuid.uuid4().hex))
+            db.session.commit()
+        if BoardSnapshot.query.first() is None:
+            # History starts here: replays need a snapshot to start from.
+            take_board_snapshot(db.session.get(BoardState, 1).revision)
+            db.session.commit()
+        board_cache.invalidate()
+
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create tables, migrate and seed the doors (run once before starting workers)."""
+    init_db()
+
+
+def hot_queries():
+    """The queries on the board's hot paths, as (name, statement, reads whole table)."""
+    since = datetime(2000, 1, 1)
+    return [
+        ('board', Door.query.options(db.joinedload(Door.detail)).order_by(Door.id), True),
+        ('door detail', DoorDetail.query.filter_by(door_id=1), False),
+        ('new doors', NewDoor.query.order_by(NewDoor.created_at.asc()), False),
+        ('events in range', DoorEvent.query.filter(DoorEvent.at >= since, DoorEvent.at < since)
+         .order_by(DoorEvent.at, DoorEvent.id), False),
+        ('events of a door', DoorEvent.query.filter(DoorEvent.door_id == 1), False),
+        ('snapshot before', BoardSnapshot.query.filter(BoardSnapshot.at <= since)
+         .order_by(BoardSnapshot.event_id.desc()), False),
+        ('events after snapshot', DoorEvent.query.filter(DoorEvent.id > 1, DoorEvent.at <= since)
+         .order_by(DoorEvent.id), False),
+    ]
+
+
+def full_scans(plan):
+    """Plan steps that read a whole table without an index."""
+    return [detail for detail in plan if detail.startswith('SCAN ') and ' USING ' not in detail]
+
+
+def explain_hot_queries():
+    """(name, plan steps, unexpected full scans) for each hot query.
+
+    The plans come from an empty in-memory database built from the models and
+    MIGRATIONS, so checking them never touches (or creates) the real one.
+    """
+    engine = sqlalchemy.create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    run_migrations(engine)
+    try:
+        with engine.connect() as conn:
+            for name, query, whole_table in hot_queries():
+                compiled = query.statement.compile(dialect=conn.dialect)
+                params = tuple(compiled.params[key] for key in compiled.positiontup)
+                plan = [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params)]
+                yield name, plan, [] if whole_table else full_scans(plan)
+    finally:
+        engine.dispose()
+
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """EXPLAIN every hot query; exit non-zero if one scans a table it should search."""
+    failed = False
+    for name, plan, bad in explain_hot_queries():
+        failed = failed or bool(bad)
+        print(f"{'FAIL' if bad else 'ok'}  {name}: {'; '.join(plan)}")
+    if failed:
+        raise SystemExit(1)
 
 @app.route('/')
 def index():
-    doors = Door.query.all()
-    return render_template('index.html', doors=doors)
+    """The door board; ``?doors=1-12`` shows (and subscribes to) just those doors."""
+    board = board_cache.snapshot()
+    door_range = request.args.get('doors')
+    doors = board['doors']
+    if door_range:
+        try:
+            door_ids = parse_door_ids(door_range)
+        except ValueError as exc:
+            return jsonify({'error': str(exc)}), 400
+        doors = [door for door in doors if door['id'] in door_ids]
+    return render_template('index.html', doors=doors, board_rev=board['rev'],
+                           board_epoch=board['epoch'], door_range=door_range or '')
 
 @app.route('/runs')
 def runs():
-    doors = Door.query.all()
+    doors = board_cache.doors()
     return render_template('runs.html', doors=doors)
 
 @app.route('/api/door/<int:door_id>/details', methods=['GET', 'POST'])
 def door_details(door_id):
     if request.method == 'GET':
-        detail = DoorDetail.query.filter_by(door_id=door_id).first()
+        door = board_cache.get(door_id)
+        detail = door['detail'] if door else None
         if detail:
             return jsonify({
                 'door_id': door_id,
-                'run_number': detail.run_number,
-                'loader': detail.loader,
-                'trailer': detail.trailer,
-                'stores': detail.stores,
-                'notes': detail.notes
+                'run_number': detail['run_number'],
+                'loader': detail['loader'],
+                'trailer': detail['trailer'],
+                'stores': detail['stores'],
+                'notes': detail['notes']
             })
         return jsonify({'door_id': door_id}), 200
 
@@ -107,9 +803,11 @@ def door_details(door_id):
         detail.stores = stores
         detail.notes = notes
 
-    db.session.commit()
+    cached_detail = {f: getattr(detail, f) for f in DETAIL_FIELDS}
+    rev, _, delta = commit_board({door_id: {'detail': cached_detail}})
     
     emit_payload = {
+        'rev': rev,
         'door_id': door_id,
         'run_number': run_number,
         'loader': loader,
@@ -117,7 +815,7 @@ def door_details(door_id):
         'stores': stores,
         'notes': notes
     }
-    socketio.emit('door_details', emit_payload)
+    emit_board('door_details', emit_payload, rev, [door_id], delta)
     return jsonify(emit_payload), 200
 
 @app.route('/new_doors_ui')
@@ -126,64 +824,144 @@ def new_doors_ui():
 
 @app.route('/api/status_counts', methods=['GET'])
 def status_counts():
-    doors = Door.query.all()
-    counts = {}
-    for door in doors:
-        status = door.status
-        counts[status] = counts.get(status, 0) + 1
-    return jsonify(counts)
+    return jsonify(board_cache.status_counts())
+
+
+def emit_status_counts():
+    """Push the live per-status counters to the clients subscribed to them."""
+    emit_event('status_counts', board_cache.status_counts(), 'counts')
+
+def parse_status_changes(data):
+    """Validate a bulk payload into ``{door_id: status}``; the last change per door wins.
+
+    Every door must be on the board and every status one of STATUS_CODES.
+    """
+    changes = data.get('changes') if isinstance(data, dict) else data
+    if not isinstance(changes, list) or not changes:
+        raise ValueError('changes must be a non-empty list of {door_id, status}')
+    parsed = {}
+    for change in changes:
+        door_id = change.get('door_id') if isinstance(change, dict) else None
+        status = change.get('status') if isinstance(change, dict) else None
+        if not isinstance(door_id, int) or isinstance(door_id, bool) or not isinstance(status, str):
+            raise ValueError('each change needs an integer door_id and a status')
+        status = status.strip()
+        if status not in STATUS_CODES:
+            raise ValueError(f'status must be one of {", ".join(STATUS_CODES)}')
+        if board_cache.get(door_id) is None:
+            raise ValueError(f'unknown door {door_id}')
+        parsed[door_id] = status
+    return parsed
+
+
+def apply_status_changes(statuses, clear_details=False):
+    """Apply ``{door_id: status}`` in one transaction and broadcast one board_patch.
+
+    With ``clear_details`` the DoorDetail rows of those doors are deleted in the
+    same transaction. Returns ``(rev, updated doors)``.
+    """
+    by_status = {}
+    for door_id, status in statuses.items():
+        by_status.setdefault(status, []).append(door_id)
+    for status, door_ids in by_status.items():
+        Door.query.filter(Door.id.in_(door_ids)).update({'status': status}, synchronize_session=False)
+    if clear_details:
+        DoorDetail.query.filter(DoorDetail.door_id.in_(list(statuses))).delete(synchronize_session=False)
+    changes = {}
+    for door_id, status in statuses.items():
+        changes[door_id] = {'status': status, 'detail': None} if clear_details else {'status': status}
+    rev, doors, delta = commit_board(changes)
+    # One frame per client regardless of how many doors changed (or how many
+    # of its rooms they touch)
+    emit_board('board_patch', {'rev': rev, 'doors': doors}, rev, statuses, delta)
+    emit_status_counts()
+    return rev, doors
+
+
+class StatusBatcher:
+    """Coalesces update_status clicks into one transaction per ``window`` seconds.
+
+    The first click of a batch schedules a flush; clicks arriving before it
+    join the batch, and a later click for the same door replaces the earlier
+    one. The flush goes through apply_status_changes, so the whole batch is one
+    commit and one board_patch. submit() blocks the calling green thread until
+    that commit, so a client's acknowledgement means its change is durable.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._lock = threading.Lock()
+        self._statuses = {}
+        self._waiters = []
+        self.batches = 0
+        self.updates = 0
+
+    def submit(self, door_id, status):
+        """Queue ``door_id -> status`` and wait for its batch; returns the commit's ack."""
+        done = threading.Event()
+        ack = {}
+        with self._lock:
+            if not self._waiters:
+                socketio.start_background_task(self._flush_later)
+            self._statuses[door_id] = status
+            self._waiters.append((done, ack))
+        done.wait()
+        return ack
+
+    def _flush_later(self):
+        socketio.sleep(self.window)
+        with self._lock:
+            statuses, self._statuses = self._statuses, {}
+            waiters, self._waiters = self._waiters, []
+        with app.app_context():
+            try:
+                rev, doors = apply_status_changes(statuses)
+                result = {'rev': rev, 'count': len(doors)}
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('status batch failed')
+                result = {'error': 'update failed'}
+        self.batches += 1
+        self.updates += len(waiters)
+        for done, ack in waiters:
+            ack.update(result)
+            done.set()
+
+    def stats(self):
+        return {'batches': self.batches, 'updates': self.updates, 'window_ms': self.window * 1000}
+
+
+status_batcher = StatusBatcher(STATUS_BATCH_WINDOW_MS / 1000)
+
+
+@app.route('/api/doors/status', methods=['POST'])
+def bulk_update_status():
+    """Apply a list of {door_id, status} changes in a single transaction."""
+    try:
+        statuses = parse_status_changes(request.get_json() or {})
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    rev, doors = apply_status_changes(statuses)
+    return jsonify({'rev': rev, 'count': len(doors)}), 200
 
 @app.route('/api/reset_all', methods=['POST'])
 def reset_all():
     """Reset all doors to Empty status"""
-    doors = Door.query.all()
-    for door in doors:
-        door.status = 'Empty'
-    db.session.commit()
-    for door in doors:
-        socketio.emit('status_updated', {'door_id': door.id, 'status': door.status})
+    rev, doors = apply_status_changes({door['id']: 'Empty' for door in board_cache.doors()})
     return jsonify({'reset': True, 'count': len(doors)}), 200
 
 @app.route('/api/clear_all_data', methods=['POST'])
 def clear_all_data():
     """Clear all door details and reset statuses to Empty"""
-    # Delete all door details
-    DoorDetail.query.delete()
-    
-    # Reset all doors to Empty
-    doors = Door.query.all()
-    for door in doors:
-        door.status = 'Empty'
-    
-    db.session.commit()
-    
-    # Emit updates to all clients
-    for door in doors:
-        socketio.emit('status_updated', {
-            'door_id': door.id, 
-            'status': door.status,
-            'run_number': None,
-            'stores': None,
-            'loader': None,
-            'trailer': None,
-            
-            'notes': None
-        })
-    
+    rev, doors = apply_status_changes({door['id']: 'Empty' for door in board_cache.doors()},
+                                      clear_details=True)
     return jsonify({'cleared': True, 'count': len(doors)}), 200
 
 @app.route('/api/new_doors', methods=['GET'])
 def get_new_doors():
     """Return all current NEW DOORS entries."""
     new_doors = NewDoor.query.order_by(NewDoor.created_at.asc()).all()
-    return jsonify([
-        {
-            'id': nd.id,
-            'door_number': nd.door_number,
-            'trailer_number': nd.trailer_number,
-        }
-        for nd in new_doors
-    ])
+    return jsonify([new_door_to_dict(nd) for nd in new_doors])
 
 
 @app.route('/api/new_doors', methods=['POST'])
@@ -198,16 +976,12 @@ def create_new_door():
 
     nd = NewDoor(door_number=door_number, trailer_number=trailer_number)
     db.session.add(nd)
+    db.session.flush()
+    payload = new_door_to_dict(nd)
+    log_new_door_event('new_door_added', payload)
     db.session.commit()
 
-    payload = {
-        'id': nd.id,
-        'door_number': nd.door_number,
-        'trailer_number': nd.trailer_number,
-    }
-
-    # Broadcast to all connected clients
-    socketio.emit('new_door_added', payload, broadcast=True)
+    emit_event('new_door_added', payload, 'new_doors')
 
     return jsonify(payload), 201
 
@@ -220,179 +994,388 @@ def delete_new_door(new_door_id):
         return jsonify({'error': 'not found'}), 404
 
     db.session.delete(nd)
+    log_new_door_event('new_door_removed', {'id': new_door_id})
     db.session.commit()
 
-    # Broadcast deletion
-    socketio.emit('new_door_removed', {'id': new_door_id}, broadcast=True)
+    emit_event('new_door_removed', {'id': new_door_id}, 'new_doors')
 
     return jsonify({'deleted': True, 'id': new_door_id}), 200
 
-@app.route('/api/export_pdf', methods=['GET'])
-def export_pdf():
-    """Export all door data to PDF"""
-    # Create PDF in memory
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), 
-                           rightMargin=10, leftMargin=10,
-                           topMargin=30, bottomMargin=18)
-    
-    # Container for PDF elements
-    elements = []
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=25,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=30,
-        alignment=1  # Center
-    )
-    
-    # Title
-    title = Paragraph(f"Daily Load Report - {datetime.now().strftime('%Y-%m-%d %H:%M')}", title_style)
-    elements.append(title)
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # Get all doors with details
-    doors = Door.query.order_by(Door.id).all()
-    
-    # Status summary
-    status_counts = {}
-    for door in doors:
-        status_counts[door.status] = status_counts.get(door.status, 0) + 1
-    
-    summary_data = [
-        ['Status Summary', 'Count'],
-        ['Empty', status_counts.get('Empty', 0)],
-        ['Loading', status_counts.get('Loading', 0)],
-        ['Loaded', status_counts.get('Loaded', 0)],
-        ['Backhaul', status_counts.get('Backhaul', 0)],
-        ['Total Doors', len(doors)]
-    ]
-    
-    summary_table = Table(summary_data, colWidths=[2*inch, 1*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 16),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(summary_table)
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Detailed door information
-    detail_title = Paragraph("Detailed Run Information", styles['Heading2'])
-    elements.append(detail_title)
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # Table headers
-    data = [['Run', 'Status', 'Door #', 'Loader', 'Trailer', 'Stores', 'Notes']]
-    
-    # Add door data
-    for door in doors:
-        detail = door.detail
-        notes_text = ''
-        if detail and detail.notes:
-            # Truncate long notes
-            notes_text = detail.notes[:50] + '...' if len(detail.notes) > 50 else detail.notes
-        
-        row = [
-            door.name,
-            door.status,
-            detail.run_number if detail else '',
-            detail.loader if detail else '',
-            detail.trailer if detail else '',
-            detail.stores if detail else '',
-            notes_text
-        ]
-        data.append(row)
-    
-    # Create table with adjusted column widths
-    col_widths = [1*inch, 1*inch, 1*inch, 1.2*inch, 1.2*inch, 1.2*inch, 2*inch]
-    table = Table(data, colWidths=col_widths)
-    
-    # Define status colors
-    status_colors = {
-        'Empty': colors.HexColor("#952B16"),
-        'Loading': colors.HexColor('#ecc94b'),
-        'Loaded': colors.HexColor("#64953b"),
-        'Backhaul': colors.HexColor("#193244")
-    }
-    
-    # Apply table style
-    table_style = [
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 15),
-        ('FONTSIZE', (0, 1), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]
-    
-    # Color code rows based on status
-    for i, door in enumerate(doors, start=1):
-        bg_color = status_colors.get(door.status, colors.white)
-        table_style.append(('BACKGROUND', (0, i), (-1, i), bg_color))
-        # Add black text for better contrast on colored backgrounds
-        table_style.append(('TEXTCOLOR', (0, i), (-1, i), colors.black))
-    
-    table.setStyle(TableStyle(table_style))
-    elements.append(table)
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Prepare file for download
-    buffer.seek(0)
-    filename = f"door_management_report_{datetime.now().strftime('%m%d%Y_%H%M%S')}.pdf"
-    
+class ReportWorkers:
+    """Render worker processes (``python report.py``), started on first use.
+
+    Jobs go to a worker's stdin and results come back on its stdout through
+    eventlet's green pipes, so waiting for a render never blocks the hub and
+    Socket.IO traffic keeps flowing while ReportLab runs.
+    """
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report.py')
+
+    def __init__(self, size):
+        self.size = size
+        self.started = 0
+        # A slot is held for a whole render and given back however it ends, so
+        # a worker that dies mid-render frees its slot for the next waiter.
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+
+    def _spawn(self):
+        worker = subprocess.Popen([sys.executable, self.script], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.started += 1
+        return worker
+
+    def render(self, *args):
+        """build_report_pdf(*args) in a worker process."""
+        with self._slots:
+            worker = self._idle.pop() if self._idle else self._spawn()
+            try:
+                report.write_message(worker.stdin, args)
+                pdf, error = report.read_message(worker.stdout)
+            except (EOFError, OSError):
+                worker.kill()
+                worker.wait()
+                self.started -= 1
+                raise RuntimeError('report worker exited')
+            self._idle.append(worker)
+        if error:
+            raise RuntimeError(error)
+        return pdf
+
+
+class ReportJob:
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = 'pending'
+        self.pdf = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'created_at': self.created_at.isoformat(),
+            'size': len(self.pdf) if self.pdf else None,
+            'error': self.error,
+            'status_url': f'/api/reports/{self.id}',
+            'pdf_url': f'/api/reports/{self.id}/pdf',
+        }
+
+
+class ReportJobs:
+    """PDF report renders as jobs, deduplicated by board revision.
+
+    Any door or detail write bumps the board revision, which is all the
+    invalidation the report needs: a request for an unchanged board joins the
+    pending job, or gets the finished PDF, instead of starting another render.
+    The newest ``keep`` jobs stay available for download.
+    """
+
+    def __init__(self, workers, keep):
+        self.workers = workers
+        self.keep = keep
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def submit(self, key, load):
+        """The job for ``key``, starting one that renders ``load()``'s arguments if there is none."""
+        job = self._by_key.get(key)
+        if job is not None and job.status != 'failed':
+            self.hits += 1
+            return job
+        self.misses += 1
+        # Registered before load() runs, so requests arriving meanwhile join this job.
+        job = ReportJob(key)
+        self._jobs[job.id] = self._by_key[key] = job
+        while len(self._jobs) > self.keep:
+            _, old = self._jobs.popitem(last=False)
+            if self._by_key.get(old.key) is old:
+                del self._by_key[old.key]
+        try:
+            args = load()
+        except Exception:
+            job.status, job.error = 'failed', 'Report data could not be loaded'
+            job.done.set()
+            raise
+        eventlet.spawn(self._run, job, args)
+        return job
+
+    def _run(self, job, args):
+        started = time.perf_counter()
+        try:
+            job.pdf = self.workers.render(*args)
+            job.status = 'done'
+        except Exception as exc:
+            app.logger.error('report job %s failed: %s', job.id, exc)
+            job.status, job.error = 'failed', 'Report rendering failed'
+        REPORT_SECONDS.observe(time.perf_counter() - started)
+        job.done.set()
+
+
+report_jobs = ReportJobs(ReportWorkers(REPORT_WORKERS), REPORT_JOBS_KEPT)
+
+
+def load_report():
+    """build_report_pdf arguments for the current board."""
+    # Doors and details in one joined query
+    doors = Door.query.options(db.joinedload(Door.detail)).order_by(Door.id).all()
+    counts = dict(db.session.query(Door.status, db.func.count(Door.id)).group_by(Door.status).all())
+    return [door_to_dict(door) for door in doors], counts, datetime.now()
+
+
+def submit_report():
+    # The key comes from BoardState, not this worker's board cache, which may
+    # never have been loaded or may lag behind writes made on other workers.
+    # It is read before querying so a write racing the render can only make
+    # the job's PDF newer than its key, never older.
+    key = tuple(db.session.execute(db.select(BoardState.epoch, BoardState.revision)
+                                   .where(BoardState.id == 1)).one())
+    return report_jobs.submit(key, load_report)
+
+
+def send_report(job):
+    """The job's PDF as a download, once rendered (the wait is green)."""
+    if not job.done.wait(REPORT_TIMEOUT):
+        return jsonify(job.to_dict()), 202
+    if job.status == 'failed':
+        return jsonify(job.to_dict()), 500
+    filename = f"door_management_report_{job.created_at.strftime('%m%d%Y_%H%M%S')}.pdf"
     return send_file(
-        buffer,
+        BytesIO(job.pdf),
         as_attachment=True,
         download_name=filename,
         mimetype='application/pdf'
     )
-    
+
+
+@app.route('/api/export_pdf', methods=['GET'])
+def export_pdf():
+    """Export all door data to PDF"""
+    return send_report(submit_report())
+
+
+@app.route('/api/reports', methods=['POST'])
+def create_report():
+    """Start a report render of the current board, or join the one already running for it."""
+    job = submit_report()
+    response = jsonify(job.to_dict())
+    response.status_code = 200 if job.status == 'done' else 202
+    response.headers['Location'] = job.to_dict()['status_url']
+    return response
+
+
+@app.route('/api/reports/<job_id>', methods=['GET'])
+def report_status(job_id):
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Report not found'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/reports/<job_id>/pdf', methods=['GET'])
+def report_pdf(job_id):
+    """Download a report, waiting for it if it is still rendering."""
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Report not found'}), 404
+    return send_report(job)
+
+@app.route('/api/board', methods=['GET'])
+def board_changes():
+    """Doors changed since ``?since=<rev>&epoch=<epoch>[&doors=1-12]``, or the full board."""
+    return board_response(request.args.get('since', type=int), request.args.get('epoch'))
+
+@app.route('/api/board/snapshot', methods=['GET'])
+def board_snapshot():
+    """The whole board (or ``?doors=1-12``) without rendering index.html."""
+    return board_response(None, None)
+
+
+def parse_time(value, name):
+    """ISO-8601 query parameter as a naive UTC datetime (what the models store)."""
+    try:
+        at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise ValueError(f'{name} must be an ISO-8601 time')
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+@app.route('/api/board/as_of', methods=['GET'])
+def board_at():
+    """The board and NEW DOORS list as they were at ``?at=<ISO time>`` (UTC)."""
+    try:
+        at = parse_time(request.args.get('at'), 'at')
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    board = board_as_of(at)
+    if board is None:
+        return jsonify({'error': 'no history that far back'}), 404
+    return jsonify(board)
+
+@app.route('/api/events', methods=['GET'])
+def door_events():
+    """Stream the event log between ``?since=`` and ``?until=`` (ISO times) as NDJSON.
+
+    ``?door_id=`` narrows it to one door.
+    """
+    try:
+        since = parse_time(request.args['since'], 'since') if 'since' in request.args else None
+        until = parse_time(request.args['until'], 'until') if 'until' in request.args else None
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    query = DoorEvent.query
+    if since is not None:
+        query = query.filter(DoorEvent.at >= since)
+    if until is not None:
+        query = query.filter(DoorEvent.at < until)
+    door_id = request.args.get('door_id', type=int)
+    if door_id is not None:
+        query = query.filter(DoorEvent.door_id == door_id)
+
+    def generate():
+        # (at, id) is the order of ix_door_event_at, so no sort is needed
+        for event in query.order_by(DoorEvent.at, DoorEvent.id).yield_per(500):
+            yield json.dumps({
+                'id': event.id,
+                'rev': event.rev,
+                'at': event.at.isoformat(),
+                'kind': event.kind,
+                'door_id': event.door_id,
+                'data': json.loads(event.data),
+            }) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+BOARD_MIMETYPES = {
+    'application/json': 'json',
+    'application/vnd.loxdash.compact+json': 'compact',
+    'application/msgpack': 'msgpack',
+}
+
+
+def board_response(since, epoch):
+    """changes_since() in the encoding picked by ``?format=`` or the Accept header."""
+    try:
+        door_ids = parse_door_ids(request.args.get('doors'))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    encoding = request.args.get('format')
+    if encoding is None:
+        mimetype = request.accept_mimetypes.best_match(
+            [m for m, e in BOARD_MIMETYPES.items() if e in ENCODINGS], 'application/json')
+        encoding = BOARD_MIMETYPES[mimetype]
+    elif encoding not in ENCODINGS:
+        return jsonify({'error': f'format must be one of {", ".join(ENCODINGS)}'}), 400
+    body = encode_changes(board_cache.changes_since(since, epoch, door_ids), encoding)
+    if encoding == 'msgpack':
+        response = Response(body, mimetype='application/msgpack')
+    else:
+        response = jsonify(body)
+        if encoding == 'compact':
+            response.mimetype = 'application/vnd.loxdash.compact+json'
+    response.vary.add('Accept')
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text exposition of this process's metrics."""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+@app.route('/api/cache_stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters for the in-memory door board and the PDF report, plus status batching."""
+    return jsonify(dict(board_cache.stats(), report={'hits': report_jobs.hits, 'misses': report_jobs.misses,
+                                                   'workers': report_jobs.workers.started},
+                        status_batches=status_batcher.stats()))
+
 @app.route('/details')
 def details_view():
-    doors = Door.query.all()
+    doors = board_cache.doors()
     return render_template('details.html', doors=doors)
 
     
 
 
-@socketio.on('update_status')
+@socketio.on('connect')
+def on_connect(auth=None):
+    CLIENTS.inc()
+
+
+@socketio.on('disconnect')
+def on_disconnect(*args):
+    CLIENTS.dec()
+
+
+@socket_event('update_status')
 def on_update_status(data):
-    door_id = data.get('door_id')
-    new_status = data.get('status')
-    door = Door.query.get(door_id)
-    if door:
-        door.status = new_status
-        db.session.commit()
-        detail = door.detail
-        socketio.emit('status_updated', {
-            'door_id': door.id,
-            'status': door.status,
-            'run_number': detail.run_number if detail else None,
-            'stores': detail.stores if detail else None,
-            'loader': detail.loader if detail else None,
-            'trailer': detail.trailer if detail else None,
-            'stores': detail.stores if detail else None,
-            'notes': detail.notes if detail else None
-        })
-    
+    """Queue one door's status change; the ack arrives once its batch is committed."""
+    try:
+        (door_id, status), = parse_status_changes([data]).items()
+    except ValueError as exc:
+        return {'error': str(exc)}
+    return status_batcher.submit(door_id, status)
+
+
+@socket_event('bulk_update_status')
+def on_bulk_update_status(data):
+    try:
+        statuses = parse_status_changes(data or {})
+    except ValueError as exc:
+        return {'error': str(exc)}
+    rev, doors = apply_status_changes(statuses)
+    return {'rev': rev, 'count': len(doors)}
+
+
+@socket_event('board_sync')
+def on_board_sync(data):
+    """Return the doors changed since the client's revision (acknowledgement payload),
+    in the client's ``encoding``."""
+    data = data or {}
+    since = data.get('since')
+    try:
+        door_ids = parse_door_ids(data.get('doors'))
+    except ValueError as exc:
+        return {'error': str(exc)}
+    changes = board_cache.changes_since(since if isinstance(since, int) else None, data.get('epoch'), door_ids)
+    return encode_changes(changes, pick_encoding(data.get('encoding')))
+
+
+@socket_event('subscribe')
+def on_subscribe(data):
+    """Join rooms: ``{topics: ['board', 'counts', 'new_doors'], doors: '1-12',
+    encoding: ['msgpack', 'compact']}``. The ack names the encoding the server
+    picked and, unless it is JSON, the header needed to decode it."""
+    try:
+        rooms, encoding = parse_subscription(data)
+    except ValueError as exc:
+        return {'error': str(exc)}
+    for room in rooms:
+        join_room(room)
+    ack = {'rooms': rooms, 'encoding': encoding}
+    if encoding != 'json':
+        ack['header'] = WIRE_HEADER
+    return ack
+
+
+@socket_event('unsubscribe')
+def on_unsubscribe(data):
+    try:
+        rooms, _ = parse_subscription(data)
+    except ValueError as exc:
+        return {'error': str(exc)}
+    for room in rooms:
+        leave_room(room)
+    return {'rooms': rooms}
+
 if __name__ == "__main__":
     init_db()
     socketio.run(app, host="0.0.0.0", port=8222, debug=True)
@@ -0,0 +1,31 @@
+# Multi-worker deployment:
+#
+#   export SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# Each eventlet worker holds its own Socket.IO connections; emits are fanned
+# out to every worker through the message queue, and the board revision lives
+# in the database, so all workers agree on it. Dock screens connect with the
+# websocket transport only, so no sticky sessions are needed in front of the
+# workers. Without SOCKETIO_MESSAGE_QUEUE keep WEB_CONCURRENCY=1.
+#
+# Without Redis, localqueue.py stands in for it on one machine:
+#
+#   python localqueue.py --port 6390 &
+#   export SOCKETIO_MESSAGE_QUEUE=redis://127.0.0.1:6390/0
+import os
+import subprocess
+import sys
+
+bind = os.environ.get('BIND', '0.0.0.0:8222')
+worker_class = 'eventlet'
+workers = int(os.environ.get('WEB_CONCURRENCY', '4' if os.environ.get('SOCKETIO_MESSAGE_QUEUE') else '1'))
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', '1000'))
+timeout = 60
+
+
+def on_starting(server):
+    # Create tables and seed doors once, before any worker forks, in a separate
+    # process so the master is never monkey-patched by importing the app.
+    subprocess.run([sys.executable, '-c', 'import app; app.init_db()'],
+                   cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
@@ -0,0 +1,174 @@
+"""A local stand-in for Redis pub/sub, for running and testing several workers without Redis.
+
+It speaks enough of the Redis protocol (RESP2 and RESP3) for the Socket.IO
+message queue and the board bus: PUBLISH, SUBSCRIBE, UNSUBSCRIBE, PING and
+the connection handshake. Any number of worker processes can share it
+through an ordinary redis:// URL:
+
+    python localqueue.py --port 6390 &
+    export SOCKETIO_MESSAGE_QUEUE=redis://127.0.0.1:6390/0
+    gunicorn -c gunicorn.conf.py app:app
+
+Nothing is stored: like Redis pub/sub, a message reaches the connections
+subscribed when it is published. Tests start one in-process with
+``LocalQueue(port=0).start()`` and hand its ``url`` to the workers.
+"""
+import argparse
+import socketserver
+import threading
+
+
+def read_command(rfile):
+    """One RESP command as a list of bytes arguments, or None at end of stream."""
+    line = rfile.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        return line.split()   # inline command, as typed into telnet
+    args = []
+    for _ in range(int(line[1:])):
+        size = int(rfile.readline()[1:])
+        args.append(rfile.read(size + 2)[:-2])
+    return args
+
+
+def bulk(value):
+    if value is None:
+        return b'$-1\r\n'
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def array(*items, kind=b'*'):
+    return kind + b'%d\r\n' % len(items) + b''.join(items)
+
+
+def integer(value):
+    return b':%d\r\n' % value
+
+
+class Connection(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.channels = set()
+        self.write_lock = threading.Lock()
+        self.protocol = 2
+
+    def push(self, *items):
+        """A pub/sub frame: an array in RESP2, a push message once the client said HELLO 3."""
+        return array(*items, kind=b'>' if self.protocol == 3 else b'*')
+
+    def send(self, data):
+        with self.write_lock:
+            self.wfile.write(data)
+            self.wfile.flush()
+
+    def handle(self):
+        try:
+            while True:
+                command = read_command(self.rfile)
+                if command is None:
+                    return
+                if command:
+                    self.dispatch(command[0].upper(), command[1:])
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.server.unsubscribe(self, self.channels)
+
+    def dispatch(self, name, args):
+        if name == b'PUBLISH' and len(args) == 2:
+            self.send(integer(self.server.publish(*args)))
+        elif name == b'SUBSCRIBE' and args:
+            for channel in args:
+                self.channels.add(channel)
+                self.server.subscribe(self, channel)
+                self.send(self.push(bulk(b'subscribe'), bulk(channel), integer(len(self.channels))))
+        elif name == b'UNSUBSCRIBE':
+            channels = args or sorted(self.channels)
+            self.server.unsubscribe(self, channels)
+            for channel in channels:
+                self.channels.discard(channel)
+                self.send(self.push(bulk(b'unsubscribe'), bulk(channel), integer(len(self.channels))))
+            if not channels:
+                self.send(self.push(bulk(b'unsubscribe'), bulk(None), integer(0)))
+        elif name == b'HELLO':
+            self.hello(args)
+        elif name == b'PING':
+            if self.channels and self.protocol == 2:
+                self.send(array(bulk(b'pong'), bulk(args[0] if args else b'')))
+            else:
+                self.send(bulk(args[0]) if args else b'+PONG\r\n')
+        elif name == b'ECHO' and len(args) == 1:
+            self.send(bulk(args[0]))
+        elif name in (b'SELECT', b'CLIENT', b'AUTH'):
+            self.send(b'+OK\r\n')
+        elif name == b'QUIT':
+            self.send(b'+OK\r\n')
+            raise ConnectionError
+        else:
+            self.send(b"-ERR unknown command '%s'\r\n" % name)
+
+    def hello(self, args):
+        version = int(args[0]) if args and args[0].isdigit() else self.protocol
+        if version not in (2, 3):
+            self.send(b'-NOPROTO unsupported protocol version\r\n')
+            return
+        self.protocol = version
+        fields = [bulk(b'server'), bulk(b'redis'), bulk(b'version'), bulk(b'7.0.0'),
+                  bulk(b'proto'), integer(version), bulk(b'mode'), bulk(b'standalone'),
+                  bulk(b'role'), bulk(b'master'), bulk(b'modules'), array()]
+        if version == 3:
+            self.send(b'%%%d\r\n' % (len(fields) // 2) + b''.join(fields))
+        else:
+            self.send(array(*fields))
+
+
+class LocalQueue(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=6390):
+        super().__init__((host, port), Connection)
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'redis://{host}:{port}/0'
+
+    def start(self):
+        """Serve on a background thread; returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def subscribe(self, connection, channel):
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(connection)
+
+    def unsubscribe(self, connection, channels):
+        with self._lock:
+            for channel in channels:
+                self._subscribers.get(channel, set()).discard(connection)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        delivered = 0
+        for connection in subscribers:
+            try:
+                connection.send(connection.push(bulk(b'message'), bulk(channel), bulk(message)))
+                delivered += 1
+            except OSError:
+                self.unsubscribe(connection, [channel])
+        return delivered
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local Redis pub/sub stand-in.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    args = parser.parse_args()
+    server = LocalQueue(args.host, args.port)
+    print(f'listening on {server.url}', flush=True)
+    server.serve_forever()
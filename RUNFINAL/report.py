@@ -0,0 +1,184 @@
+"""The daily load report, rendered with ReportLab.
+
+ReportLab is CPU-bound pure Python, so the web process never renders in its
+own event loop: ``python report.py`` runs a render worker that reads jobs from
+stdin and writes results to stdout, each a 4-byte big-endian length followed by
+a pickle. A job is ``(doors, status_counts, generated_at)`` as passed to
+build_report_pdf; a result is ``(pdf_bytes, None)`` or ``(None, error)``.
+"""
+import pickle
+import struct
+import sys
+import traceback
+from io import BytesIO
+
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.units import inch
+
+HEADER = struct.Struct('>I')
+
+
+def write_message(stream, obj):
+    data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def read_exactly(stream, size):
+    # Green (non-blocking) pipes return whatever has arrived, so read until done.
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise EOFError('report stream closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_message(stream):
+    """The next message on ``stream``, or raise EOFError when it is closed."""
+    size, = HEADER.unpack(read_exactly(stream, HEADER.size))
+    return pickle.loads(read_exactly(stream, size))
+
+
+def build_report_pdf(doors, status_counts, generated_at):
+    """Render the daily load report for ``doors`` (plain dicts, see app.door_to_dict) to PDF bytes."""
+    # Create PDF in memory
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), 
+                           rightMargin=10, leftMargin=10,
+                           topMargin=30, bottomMargin=18)
+    
+    # Container for PDF elements
+    elements = []
+    
+    # Styles
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=25,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=30,
+        alignment=1  # Center
+    )
+    
+    # Title
+    title = Paragraph(f"Daily Load Report - {generated_at.strftime('%Y-%m-%d %H:%M')}", title_style)
+    elements.append(title)
+    elements.append(Spacer(1, 0.2*inch))
+    
+    # Status summary
+    summary_data = [
+        ['Status Summary', 'Count'],
+        ['Empty', status_counts.get('Empty', 0)],
+        ['Loading', status_counts.get('Loading', 0)],
+        ['Loaded', status_counts.get('Loaded', 0)],
+        ['Backhaul', status_counts.get('Backhaul', 0)],
+        ['Total Doors', len(doors)]
+    ]
+    
+    summary_table = Table(summary_data, colWidths=[2*inch, 1*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 16),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    
+    elements.append(summary_table)
+    elements.append(Spacer(1, 0.4*inch))
+    
+    # Detailed door information
+    detail_title = Paragraph("Detailed Run Information", styles['Heading2'])
+    elements.append(detail_title)
+    elements.append(Spacer(1, 0.2*inch))
+    
+    # Table headers
+    data = [['Run', 'Status', 'Door #', 'Loader', 'Trailer', 'Stores', 'Notes']]
+    
+    # Add door data
+    for door in doors:
+        detail = door['detail']
+        notes_text = ''
+        if detail and detail['notes']:
+            # Truncate long notes
+            notes_text = detail['notes'][:50] + '...' if len(detail['notes']) > 50 else detail['notes']
+        
+        row = [
+            door['name'],
+            door['status'],
+            detail['run_number'] if detail else '',
+            detail['loader'] if detail else '',
+            detail['trailer'] if detail else '',
+            detail['stores'] if detail else '',
+            notes_text
+        ]
+        data.append(row)
+    
+    # Create table with adjusted column widths
+    col_widths = [1*inch, 1*inch, 1*inch, 1.2*inch, 1.2*inch, 1.2*inch, 2*inch]
+    table = Table(data, colWidths=col_widths)
+    
+    # Define status colors
+    status_colors = {
+        'Empty': colors.HexColor("#952B16"),
+        'Loading': colors.HexColor('#ecc94b'),
+        'Loaded': colors.HexColor("#64953b"),
+        'Backhaul': colors.HexColor("#193244")
+    }
+    
+    # Apply table style
+    table_style = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 15),
+        ('FONTSIZE', (0, 1), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]
+    
+    # Color code rows based on status
+    for i, door in enumerate(doors, start=1):
+        bg_color = status_colors.get(door['status'], colors.white)
+        table_style.append(('BACKGROUND', (0, i), (-1, i), bg_color))
+        # Add black text for better contrast on colored backgrounds
+        table_style.append(('TEXTCOLOR', (0, i), (-1, i), colors.black))
+    
+    table.setStyle(TableStyle(table_style))
+    elements.append(table)
+    
+    # Build PDF
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def serve(jobs, results):
+    """Render jobs until ``jobs`` is closed."""
+    while True:
+        try:
+            args = read_message(jobs)
+        except EOFError:
+            return
+        try:
+            result = (build_report_pdf(*args), None)
+        except Exception:
+            result = (None, traceback.format_exc())
+        write_message(results, result)
+
+
+if __name__ == '__main__':
+    serve(sys.stdin.buffer, sys.stdout.buffer)
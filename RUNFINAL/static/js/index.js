@@ -0,0 +1,410 @@
+// websocket only: any worker can serve the connection without sticky sessions
+const socket = io({transports: ['websocket']});
+const modal = document.getElementById('detailModal');
+const confirmModal = document.getElementById('confirmModal');
+const closeBtn = document.querySelector('.close');
+const form = document.getElementById('detailForm');
+let currentDoorId = null;
+let isFormOpen = false;
+
+const statusCycle = ['Empty', 'Loading', 'Loaded', 'Backhaul'];
+const detailKeys = ['run_number', 'loader', 'trailer', 'trailer_temp1', 'trailer_temp2', 'stores', 'notes'];
+
+// Board state: the page is rendered at revision `rev`; after that only
+// socket deltas are applied. On (re)connect, or when a revision gap is
+// detected, the client asks the server for the doors changed since `rev`.
+// With ?doors=1-12 the page only subscribes to those doors, so it sees
+// just some revisions and cannot treat a skipped revision as a gap.
+const doorGrid = document.getElementById('door-grid');
+const board = {
+    epoch: doorGrid.dataset.boardEpoch,
+    rev: parseInt(doorGrid.dataset.boardRev, 10) || 0,
+    range: doorGrid.dataset.doorRange || null,
+    doors: {}
+};
+JSON.parse(document.getElementById('board-data').textContent)
+    .forEach(door => { board.doors[door.id] = door; });
+let syncPending = false;
+// Header of the compact encoding, set once the server has agreed to it.
+let wire = null;
+
+function escapeHtml(value) {
+    return String(value == null ? '' : value).replace(/[&<>"']/g, c => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[c]);
+}
+
+function renderDoor(door) {
+    const card = doorGrid.querySelector(`[data-door-id="${door.id}"]`);
+    if (!card) return;
+    if (card.dataset.status) card.classList.remove(card.dataset.status);
+    statusCycle.forEach(status => card.classList.remove(status));
+    card.classList.add(door.status);
+    card.dataset.status = door.status;
+
+    const d = door.detail;
+    card.querySelector('.info').innerHTML = `<div> <h4>  ${escapeHtml(door.status)} </h4></div>` + (d ? `
+        <div><strong>Door #:</strong> ${escapeHtml(d.run_number)}</div>
+        <div><strong>Stores:</strong> ${escapeHtml(d.stores)}</div>
+        <div><strong>Trailer:</strong> ${escapeHtml(d.trailer)}</div>
+        <div><strong>Temp:</strong> ${escapeHtml(d.trailer_temp1)}</div>
+        <div><strong>Loader:</strong> ${escapeHtml(d.loader)}</div>
+        <div> <h5> ${escapeHtml(d.notes)}</h5></div>` : '');
+}
+
+// Update status counters from the local board state
+function updateStatusCounters() {
+    const counts = {};
+    Object.values(board.doors).forEach(door => {
+        counts[door.status] = (counts[door.status] || 0) + 1;
+    });
+    document.getElementById('count-empty').textContent = counts['Empty'] || 0;
+    document.getElementById('count-loading').textContent = counts['Loading'] || 0;
+    document.getElementById('count-loaded').textContent = counts['Loaded'] || 0;
+}
+
+function refreshView() {
+    updateStatusCounters();
+    filterDoors(searchInput.value);
+}
+
+// Ask the server for everything after our revision and apply it.
+function requestSync() {
+    if (syncPending) return;
+    syncPending = true;
+    const request = {since: board.rev, epoch: board.epoch, doors: board.range,
+                     encoding: wire ? 'compact' : 'json'};
+    socket.emit('board_sync', request, function(res) {
+        syncPending = false;
+        if (res.error) return;
+        if (Array.isArray(res)) res = decodeChanges(res);
+        if (res.full) board.doors = {};
+        res.doors.forEach(door => {
+            board.doors[door.id] = door;
+            renderDoor(door);
+        });
+        board.epoch = res.epoch;
+        board.rev = res.rev;
+        refreshView();
+    });
+}
+
+// Compact encoding: doors are [id, name, status, rev, detail values]
+// and deltas [door_id, mask, ...values of the fields set in mask].
+function decodeStatus(status) {
+    return typeof status === 'number' ? wire.statuses[status] : status;
+}
+
+function decodeChanges([header, epoch, rev, full, rows]) {
+    const detailFields = header.fields.slice(1);
+    const doors = rows.map(([id, name, status, doorRev, detail]) => ({
+        id, name, status: decodeStatus(status), rev: doorRev,
+        detail: detail && Object.fromEntries(detailFields.map((field, i) => [field, detail[i]]))
+    }));
+    return {epoch, rev, full, doors};
+}
+
+function applyCompactDelta([rev, rows]) {
+    if (rev <= board.rev) return;
+    if (isGap(rev)) {
+        requestSync();
+        return;
+    }
+    rows.forEach(row => {
+        const door = board.doors[row[0]];
+        if (!door) return;
+        const mask = row[1];
+        let next = 2;
+        wire.fields.forEach((field, bit) => {
+            if (!(mask & (1 << bit))) return;
+            const value = row[next++];
+            if (field === 'status') {
+                door.status = decodeStatus(value);
+            } else {
+                door.detail = door.detail || {};
+                door.detail[field] = value;
+            }
+        });
+        if (mask & wire.detail_cleared) door.detail = null;
+        door.rev = rev;
+        renderDoor(door);
+    });
+    board.rev = rev;
+    refreshView();
+}
+
+// Apply one socket delta if it is the next revision; resync on a gap.
+function isGap(rev) {
+    return syncPending || (!board.range && rev !== board.rev + 1);
+}
+
+function applyDelta(data) {
+    if (data.rev <= board.rev) return;
+    if (isGap(data.rev)) {
+        requestSync();
+        return;
+    }
+    const door = board.doors[data.door_id];
+    if (door) {
+        if (data.status !== undefined) door.status = data.status;
+        detailKeys.forEach(key => {
+            if (key in data) {
+                door.detail = door.detail || {};
+                door.detail[key] = data[key];
+            }
+        });
+        renderDoor(door);
+    }
+    board.rev = data.rev;
+    refreshView();
+}
+
+// A board_patch carries full door snapshots that all share one revision.
+function applyPatch(patch) {
+    if (patch.rev <= board.rev) return;
+    if (isGap(patch.rev)) {
+        requestSync();
+        return;
+    }
+    patch.doors.forEach(door => {
+        if (board.range && !(door.id in board.doors)) return;
+        board.doors[door.id] = door;
+        renderDoor(door);
+    });
+    board.rev = patch.rev;
+    refreshView();
+}
+
+// Rooms are per connection, so subscribe again after every reconnect.
+socket.on('connect', function() {
+    const subscription = board.range ? {doors: board.range} : {topics: ['board']};
+    subscription.encoding = ['compact'];
+    socket.emit('subscribe', subscription, function(res) {
+        wire = res.encoding === 'compact' ? res.header : null;
+        requestSync();
+    });
+});
+
+// Load door details
+function loadDoorDetails(doorId) {
+    fetch(`/api/door/${doorId}/details`)
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('run_number').value = data.run_number || '';
+            document.getElementById('loader').value = data.loader || '';
+            document.getElementById('trailer').value = data.trailer || '';
+            document.getElementById('stores').value = data.stores || '';
+            document.getElementById('notes').value = data.notes || '';
+        })
+        .catch(error => console.error('Error loading details:', error));
+}
+
+// Save door details
+form.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const doorId = document.getElementById('current-door-id').value;
+    const data = {
+        run_number: document.getElementById('run_number').value,
+        stores: document.getElementById('stores').value,
+        loader: document.getElementById('loader').value,
+        trailer: document.getElementById('trailer').value,
+        notes: document.getElementById('notes').value
+    };
+
+    fetch(`/api/door/${doorId}/details`, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(() => {
+        modal.style.display = 'none';
+        isFormOpen = false;
+    })
+    .catch(error => console.error('Error saving details:', error));
+});
+
+// Handle door card clicks with delay to detect double-click
+let clickTimer = null;
+let preventClick = false;
+
+document.getElementById('door-grid').addEventListener('click', function(e) {
+    const card = e.target.closest('.door-card');
+    if (!card) return;
+
+    // Prevent single click action if double-click was detected
+    if (preventClick) {
+        preventClick = false;
+        return;
+    }
+
+    const doorId = card.dataset.doorId;
+    const currentStatus = card.dataset.status;
+
+    // Clear any existing timer
+    clearTimeout(clickTimer);
+
+    // Set a timer to handle single click
+    clickTimer = setTimeout(function() {
+        // Single click - cycle status
+        const currentIndex = statusCycle.indexOf(currentStatus);
+        const nextStatus = statusCycle[(currentIndex + 1) % statusCycle.length];
+
+        // Acknowledged once the change is committed (with others in its batch)
+        socket.emit('update_status', {
+            door_id: parseInt(doorId),
+            status: nextStatus
+        }, function(res) {
+            if (res && res.error) console.error('Status update failed:', res.error);
+        });
+    }, 250); // 250ms delay to detect double-click
+});
+
+// Handle double click to open modal
+document.getElementById('door-grid').addEventListener('dblclick', function(e) {
+    const card = e.target.closest('.door-card');
+    if (!card) return;
+
+    // Cancel the single-click timer and prevent status change
+    clearTimeout(clickTimer);
+    preventClick = true;
+
+    const doorId = card.dataset.doorId;
+    currentDoorId = doorId;
+
+    document.getElementById('current-door-id').value = doorId;
+    document.getElementById('modal-title').textContent = `Edit ${card.querySelector('h3').textContent}`;
+
+    loadDoorDetails(doorId);
+    modal.style.display = 'block';
+    isFormOpen = true;
+});
+
+// Close modal
+closeBtn.addEventListener('click', function() {
+    modal.style.display = 'none';
+    isFormOpen = false;
+});
+
+window.addEventListener('click', function(e) {
+    if (e.target === modal) {
+        modal.style.display = 'none';
+        isFormOpen = false;
+    }
+});
+
+// Confirm clear all data
+function confirmClearAll() {
+    confirmModal.style.display = 'block';
+}
+
+function closeConfirmDialog() {
+    confirmModal.style.display = 'none';
+}
+
+// Clear all data
+function clearAllData() {
+    fetch('/api/clear_all_data', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'}
+    })
+    .then(response => response.json())
+    .then(data => {
+        console.log('Data cleared:', data);
+        closeConfirmDialog();
+        // Page will update via socket events
+    })
+    .catch(error => console.error('Error clearing data:', error));
+}
+
+// Export to PDF
+function exportToPDF() {
+    window.location.href = '/api/export_pdf';
+}
+
+// Socket listeners
+socket.on('status_updated', applyDelta);
+socket.on('door_details', applyDelta);
+socket.on('board_patch', applyPatch);
+socket.on('board_delta', applyCompactDelta);
+
+// Search functionality
+const searchInput = document.getElementById('searchInput');
+
+// Initial counter update
+updateStatusCounters();
+
+function filterDoors(searchTerm) {
+    const cards = doorGrid.querySelectorAll('.door-card');
+    const lowerSearchTerm = searchTerm.toLowerCase();
+
+    cards.forEach(card => {
+        const info = card.querySelector('.info').textContent;
+        const name = card.querySelector('h3').textContent;
+        const searchableText = (name + ' ' + info).toLowerCase();
+
+        if (searchableText.includes(lowerSearchTerm)) {
+            card.style.display = '';
+        } else {
+            card.style.display = 'none';
+        }
+    });
+}
+
+searchInput.addEventListener('input', function(e) {
+    filterDoors(e.target.value);
+});
+
+/* NEW DOORS logic (purely front-end, no DB) */
+const newDoorForm = document.getElementById('newDoorForm');
+const newDoorNumberInput = document.getElementById('newDoorNumber');
+const newTrailerNumberInput = document.getElementById('newTrailerNumber');
+const newDoorsList = document.getElementById('newDoorsList');
+
+const newDoors = [];
+
+function renderNewDoors() {
+    newDoorsList.innerHTML = '';
+    newDoors.forEach((item, index) => {
+        const li = document.createElement('li');
+        li.className = 'new-door-item';
+        li.dataset.index = index;
+
+        const labelSpan = document.createElement('span');
+        labelSpan.className = 'label';
+        labelSpan.textContent = `Door ${item.door} | Trailer ${item.trailer}`;
+
+        const hintSpan = document.createElement('span');
+        hintSpan.className = 'hint';
+        hintSpan.textContent = 'tap to remove';
+
+        li.appendChild(labelSpan);
+        li.appendChild(hintSpan);
+
+        newDoorsList.appendChild(li);
+    });
+}
+
+newDoorForm.addEventListener('submit', function(e) {
+    e.preventDefault();
+    const doorVal = newDoorNumberInput.value.trim();
+    const trailerVal = newTrailerNumberInput.value.trim();
+    if (!doorVal || !trailerVal) return;
+
+    newDoors.push({ door: doorVal, trailer: trailerVal });
+    renderNewDoors();
+
+    newDoorForm.reset();
+    newDoorNumberInput.focus();
+});
+
+newDoorsList.addEventListener('click', function(e) {
+    const item = e.target.closest('.new-door-item');
+    if (!item) return;
+    const idx = parseInt(item.dataset.index, 10);
+    if (!Number.isNaN(idx)) {
+        newDoors.splice(idx, 1);
+        renderNewDoors();
+    }
+});
@@ -0,0 +1,48 @@
+# Run from RUNFINAL/:  python -m pytest tests
+#
+# The app is imported once, against a throwaway database, and every test
+# starts from a freshly seeded board.
+import os
+import sys
+import tempfile
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DB_DIR = tempfile.mkdtemp(prefix='runfinal-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(DB_DIR, 'database.db')}"
+for name in ('SOCKETIO_MESSAGE_QUEUE', 'BOARD_MESSAGE_QUEUE'):
+    os.environ.pop(name, None)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import app as runfinal  # noqa: E402  (monkey-patches the process for eventlet)
+
+
+@pytest.fixture
+def board():
+    """The app module with a new database: 50 doors, no details, no history."""
+    with runfinal.app.app_context():
+        runfinal.db.drop_all()
+    runfinal.init_db()
+    return runfinal
+
+
+@pytest.fixture
+def client(board):
+    return board.app.test_client()
+
+
+@pytest.fixture
+def connect(board):
+    """Open Socket.IO test clients; they are disconnected after the test."""
+    clients = []
+
+    def connect():
+        socket = board.socketio.test_client(board.app)
+        clients.append(socket)
+        return socket
+
+    yield connect
+    for socket in clients:
+        if socket.is_connected():
+            socket.disconnect()
@@ -0,0 +1,51 @@
+def by_id(doors):
+    return {door['id']: door for door in doors}
+
+
+def test_reconnected_client_catches_up_from_its_revision(client, connect):
+    screen = connect()
+    screen.emit('subscribe', {'topics': ['board']}, callback=True)
+    first = screen.emit('board_sync', {'since': None}, callback=True)
+    assert first['full']
+    doors, rev = by_id(first['doors']), first['rev']
+
+    # Missed while offline: a click, a bulk change and a detail edit.
+    screen.disconnect()
+    other = connect()
+    assert 'rev' in other.emit('update_status', {'door_id': 3, 'status': 'Loading'}, callback=True)
+    client.post('/api/doors/status', json={'changes': [{'door_id': 4, 'status': 'Loaded'},
+                                                       {'door_id': 5, 'status': 'Empty'}]})
+    client.post('/api/door/6/details', json={'run_number': '42', 'loader': 'Sam'})
+
+    screen.connect()
+    screen.emit('subscribe', {'topics': ['board']}, callback=True)
+    missed = screen.emit('board_sync', {'since': rev, 'epoch': first['epoch']}, callback=True)
+    assert not missed['full']
+    assert sorted(door['id'] for door in missed['doors']) == [3, 4, 5, 6]
+    doors.update(by_id(missed['doors']))
+    rev = missed['rev']
+
+    current = client.get('/api/board/snapshot').get_json()
+    assert rev == current['rev']
+    assert doors == by_id(current['doors'])
+    assert doors[6]['detail']['run_number'] == '42'
+
+    # Live again: the next change arrives as a delta, with no sync needed.
+    screen.get_received()
+    client.post('/api/doors/status', json={'changes': [{'door_id': 7, 'status': 'Loaded'}]})
+    patches = [m['args'][0] for m in screen.get_received() if m['name'] == 'board_patch']
+    assert [patch['rev'] for patch in patches] == [rev + 1]
+    doors.update(by_id(patches[0]['doors']))
+    assert doors == by_id(client.get('/api/board/snapshot').get_json()['doors'])
+
+
+def test_revision_from_another_database_gets_the_full_board(client, connect):
+    screen = connect()
+    first = screen.emit('board_sync', {'since': None}, callback=True)
+    client.post('/api/doors/status', json={'changes': [{'door_id': 1, 'status': 'Loaded'}]})
+
+    stale = screen.emit('board_sync', {'since': first['rev'], 'epoch': 'old-epoch'}, callback=True)
+    assert stale['full']
+    assert len(stale['doors']) == 50
+    ahead = screen.emit('board_sync', {'since': first['rev'] + 100, 'epoch': first['epoch']}, callback=True)
+    assert ahead['full']
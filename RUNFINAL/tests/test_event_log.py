@@ -0,0 +1,64 @@
+import json
+import time
+from datetime import datetime
+
+
+def by_id(items):
+    return {item['id']: item for item in items}
+
+
+def board_now(client):
+    """The doors as the board serves them, less the per-door revision replays do not track."""
+    doors = client.get('/api/board/snapshot').get_json()['doors']
+    return by_id({key: value for key, value in door.items() if key != 'rev'} for door in doors)
+
+
+def test_board_as_of_replays_across_snapshots(board, client, monkeypatch):
+    monkeypatch.setattr(board, 'BOARD_SNAPSHOT_EVERY', 3)
+    new_door = {}
+
+    def add_new_door():
+        new_door.update(client.post('/api/new_doors', json={'door_number': '61', 'trailer_number': 'T9'}).get_json())
+
+    changes = [
+        lambda: client.post('/api/doors/status', json={'changes': [{'door_id': 1, 'status': 'Loading'}]}),
+        lambda: client.post('/api/door/2/details', json={'run_number': '12', 'loader': 'Sam', 'notes': 'seal'}),
+        add_new_door,
+        lambda: client.post('/api/doors/status', json={'changes': [{'door_id': 3, 'status': 'Loaded'},
+                                                                   {'door_id': 4, 'status': 'Empty'}]}),
+        lambda: client.post('/api/reset_all'),
+        lambda: client.post('/api/door/5/details', json={'run_number': '40', 'trailer': 'T5'}),
+        lambda: client.delete(f"/api/new_doors/{new_door['id']}"),
+        lambda: client.post('/api/clear_all_data'),
+        lambda: client.post('/api/doors/status', json={'changes': [{'door_id': 7, 'status': 'Backhaul'}]}),
+    ]
+    started = datetime.utcnow()
+    seen = []
+    for change in changes:
+        time.sleep(0.002)
+        change()
+        time.sleep(0.002)
+        seen.append((datetime.utcnow(), board_now(client),
+                     client.get('/api/new_doors').get_json()))
+
+    with board.app.app_context():
+        # Revisions 3 and 6 took snapshots, on top of the one init_db took.
+        assert [s.rev for s in board.BoardSnapshot.query.order_by(board.BoardSnapshot.id)] == [0, 3, 6]
+        for at, doors, new_doors in seen:
+            replayed = board.board_as_of(at)
+            assert by_id(replayed['doors']) == doors
+            assert replayed['new_doors'] == new_doors
+        assert board.board_as_of(datetime(2000, 1, 1)) is None
+
+    events = [json.loads(line) for line in client.get('/api/events', query_string={
+        'since': started.isoformat(), 'until': seen[-1][0].isoformat()}).get_data(as_text=True).splitlines()]
+    assert [(e['at'], e['id']) for e in events] == sorted((e['at'], e['id']) for e in events)
+    kinds = [e['kind'] for e in events]
+    assert kinds.count('new_door_added') == kinds.count('new_door_removed') == 1
+    assert kinds.count('clear') == 50 and kinds.count('detail') == 2
+    # Everything but the last click falls before ``until`` of the second-last change.
+    earlier = client.get('/api/events', query_string={
+        'since': started.isoformat(), 'until': seen[-2][0].isoformat()}).get_data(as_text=True).splitlines()
+    assert len(earlier) == len(events) - 1
+    door = client.get('/api/events', query_string={'door_id': 2}).get_data(as_text=True).splitlines()
+    assert [json.loads(line)['kind'] for line in door] == ['detail', 'status', 'clear']
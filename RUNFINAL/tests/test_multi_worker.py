@@ -0,0 +1,98 @@
+# Two real worker processes sharing one database and a LocalQueue, as
+# gunicorn runs them with SOCKETIO_MESSAGE_QUEUE set.
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+import requests
+import socketio
+
+from localqueue import LocalQueue
+
+RUNFINAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVE = "import sys, app; app.socketio.run(app.app, host='127.0.0.1', port=int(sys.argv[1]))"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until(check, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = check()
+        if result:
+            return result
+        time.sleep(0.05)
+    raise AssertionError('timed out')
+
+
+@pytest.fixture
+def workers():
+    """Base URLs of two workers, A and B."""
+    queue = LocalQueue(port=0).start()
+    env = dict(os.environ, SOCKETIO_MESSAGE_QUEUE=queue.url,
+               DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='runfinal-workers-'), 'database.db')}")
+    env.pop('BOARD_MESSAGE_QUEUE', None)
+    subprocess.run([sys.executable, '-c', 'import app; app.init_db()'], cwd=RUNFINAL, env=env, check=True)
+    ports = [free_port(), free_port()]
+    processes = [subprocess.Popen([sys.executable, '-c', SERVE, str(port)], cwd=RUNFINAL, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                 for port in ports]
+    urls = [f'http://127.0.0.1:{port}' for port in ports]
+
+    def up(url):
+        try:
+            return requests.get(url + '/api/cache_stats', timeout=1).ok
+        except requests.RequestException:
+            return False
+    try:
+        for url in urls:
+            wait_until(lambda: up(url), timeout=30)
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+        queue.shutdown()
+        queue.server_close()
+
+
+def test_a_change_on_one_worker_reaches_the_other(workers):
+    a, b = workers
+    # B has served nothing that loads its board cache yet.
+    assert not requests.get(b + '/api/cache_stats').json()['loaded']
+
+    screen = socketio.Client()
+    patches = []
+    screen.on('board_patch', patches.append)
+    screen.connect(b, transports=['websocket'])
+    try:
+        screen.call('subscribe', {'topics': ['board']})
+        # Let B's queue listeners subscribe before A publishes.
+        time.sleep(1)
+        rev = requests.post(a + '/api/doors/status',
+                            json={'changes': [{'door_id': 7, 'status': 'Loaded'}]}).json()['rev']
+
+        # A client connected to B gets the patch A emitted...
+        wait_until(lambda: any(patch['rev'] == rev for patch in patches))
+        # ...and B's revision moved forward even though its cache was never loaded.
+        wait_until(lambda: requests.get(b + '/api/cache_stats').json()['revision'] == rev)
+    finally:
+        screen.disconnect()
+
+    door = next(d for d in requests.get(b + '/api/board').json()['doors'] if d['id'] == 7)
+    assert door['status'] == 'Loaded'
+
+    # Once loaded, B's cache follows A's changes without going back to the database for the board.
+    rev = requests.post(a + '/api/doors/status',
+                        json={'changes': [{'door_id': 8, 'status': 'Backhaul'}]}).json()['rev']
+    wait_until(lambda: requests.get(b + '/api/cache_stats').json()['revision'] == rev)
+    door = next(d for d in requests.get(b + '/api/board').json()['doors'] if d['id'] == 8)
+    assert door['status'] == 'Backhaul'
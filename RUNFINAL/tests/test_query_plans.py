@@ -0,0 +1,20 @@
+import sqlalchemy
+
+
+def test_hot_queries_use_an_index(board):
+    with board.app.app_context():
+        plans = list(board.explain_hot_queries())
+        assert len(plans) == len(board.hot_queries())
+    assert [(name, bad) for name, _, bad in plans if bad] == []
+
+
+def test_full_scans_are_caught(board):
+    assert board.full_scans(['SCAN door_event', 'SEARCH door USING INTEGER PRIMARY KEY (rowid=?)',
+                            'SCAN door USING INDEX ix_door']) == ['SCAN door_event']
+
+
+def test_checking_plans_leaves_the_database_alone(board):
+    with board.app.app_context():
+        board.db.drop_all()
+        list(board.explain_hot_queries())
+        assert sqlalchemy.inspect(board.db.engine).get_table_names() == []
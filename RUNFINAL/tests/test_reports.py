@@ -0,0 +1,123 @@
+import sqlite3
+import time
+
+import eventlet
+
+
+def committed(board):
+    """A connection of our own, standing in for another worker."""
+    with board.app.app_context():
+        path = board.db.engine.url.database
+    return sqlite3.connect(path)
+
+
+def write_elsewhere(board, door_id, status):
+    """Change a door the way another worker would: this worker's cache never hears of it."""
+    db = committed(board)
+    with db:
+        db.execute('UPDATE door SET status = ? WHERE id = ?', (status, door_id))
+        db.execute('UPDATE board_state SET revision = revision + 1 WHERE id = 1')
+    return db.execute('SELECT epoch, revision FROM board_state').fetchone()
+
+
+def test_report_key_follows_the_database_not_the_cache(board, client):
+    # This worker has only served reports: its board cache was never loaded.
+    assert not board.board_cache.stats()['loaded']
+    first = client.post('/api/reports').get_json()
+    assert client.post('/api/reports').get_json()['id'] == first['id']
+
+    key = write_elsewhere(board, 3, 'Loaded')
+    second = client.post('/api/reports').get_json()
+    assert second['id'] != first['id']
+    assert board.report_jobs.get(second['id']).key == key
+
+    # Same again after the bus reconnected and dropped the cache.
+    client.get('/api/board')
+    board.board_cache.invalidate()
+    key = write_elsewhere(board, 4, 'Backhaul')
+    third = client.post('/api/reports').get_json()
+    assert third['id'] not in (first['id'], second['id'])
+    assert board.report_jobs.get(third['id']).key == key
+
+
+def add_doors(board, count):
+    """Grow the board to ``count`` more doors, each with a filled-in detail."""
+    db = committed(board)
+    with db:
+        start, = db.execute('SELECT max(id) FROM door').fetchone()
+        ids = range(start + 1, start + count + 1)
+        db.executemany('INSERT INTO door (id, name, status) VALUES (?, ?, ?)',
+                       [(i, f'Door {i}', 'Loaded') for i in ids])
+        db.executemany('INSERT INTO door_detail (door_id, run_number, loader, trailer, stores, notes) '
+                       'VALUES (?, ?, ?, ?, ?, ?)',
+                       [(i, str(i), 'Sam', f'T{i}', '101, 102, 103', 'Check seals ' * 8) for i in ids])
+
+
+def event_latencies(board, screen, count):
+    """Seconds from handing a status click to the hub to its ack, ``count`` times."""
+    latencies = []
+    for n in range(count):
+        started = time.perf_counter()
+        # The sleep lets every other green thread run, as a real socket read would.
+        eventlet.sleep(0.005)
+        screen.emit('update_status', {'door_id': 1, 'status': ('Loading', 'Loaded')[n % 2]}, callback=True)
+        latencies.append(time.perf_counter() - started)
+    return sorted(latencies)
+
+
+def test_socket_events_stay_fast_while_large_reports_render(board, client, connect):
+    add_doors(board, 1500)
+    screen = connect()
+    baseline = event_latencies(board, screen, 40)
+
+    jobs = []
+    for n in range(3):
+        # A click between submissions, so each one is a render of its own.
+        client.post('/api/doors/status', json={'changes': [{'door_id': 2, 'status': ('Loading', 'Loaded')[n % 2]}]})
+        jobs.append(board.report_jobs.get(client.post('/api/reports').get_json()['id']))
+    started = time.perf_counter()
+    during = []
+    while any(job.status == 'pending' for job in jobs):
+        during += event_latencies(board, screen, 5)
+    rendering = time.perf_counter() - started
+
+    assert [job.status for job in jobs] == ['done'] * 3
+    assert len(during) >= 20, 'the reports finished before any events were timed'
+    during.sort()
+    # A render blocking the hub would hold an event for the whole render (about
+    # a second for 1,550 doors); rendering in worker processes only costs the
+    # CPU they share with this one.
+    assert during[len(during) // 2] < baseline[len(baseline) // 2] + 0.05
+    assert during[-1] < max(0.25, rendering / 4)
+
+
+def test_a_worker_dying_mid_render_frees_its_slot(board):
+    workers = board.ReportWorkers(1)
+    spawned = []
+
+    def spawn():
+        spawned.append(board.ReportWorkers._spawn(workers))
+        return spawned[-1]
+
+    workers._spawn = spawn
+    with board.app.app_context():
+        args = board.load_report()
+    first = eventlet.spawn(workers.render, *args)
+    waiting = eventlet.spawn(workers.render, *args)
+    while not spawned:
+        eventlet.sleep(0.01)
+    # The first render has its job; the second is waiting for the only slot.
+    spawned[0].kill()
+
+    with eventlet.Timeout(30):
+        try:
+            first.wait()
+        except RuntimeError as e:
+            assert str(e) == 'report worker exited'
+        else:
+            raise AssertionError('the killed render returned a PDF')
+        assert waiting.wait().startswith(b'%PDF')
+    assert len(spawned) == 2 and workers.started == 1
+    for worker in spawned:
+        worker.kill()
+        worker.wait()
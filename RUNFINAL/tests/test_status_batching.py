@@ -0,0 +1,54 @@
+import json
+import sqlite3
+
+import eventlet
+
+STATUSES = ('Loading', 'Loaded', 'Backhaul', 'Empty')
+
+
+def committed(board):
+    """A connection of our own, so it sees only what has been committed."""
+    with board.app.app_context():
+        path = board.db.engine.url.database
+    return sqlite3.connect(path)
+
+
+def test_clicks_on_one_door_commit_in_order_and_ack_after_commit(board, client, connect):
+    client.get('/api/board')
+    db = committed(board)
+    screens = [connect() for _ in range(12)]
+    clicks, acks = [], []
+
+    def click(n, screen):
+        # Spread the clicks over several batch windows.
+        eventlet.sleep(n * board.status_batcher.window / 3)
+        status = STATUSES[n % len(STATUSES)]
+        clicks.append(status)
+        ack = screen.emit('update_status', {'door_id': 5, 'status': status}, callback=True)
+        # The ack only comes back once the change is in the database.
+        rev, = db.execute('SELECT revision FROM board_state').fetchone()
+        events = {door_id: json.loads(data) for door_id, data in
+                  db.execute('SELECT door_id, data FROM door_event WHERE rev = ?', (ack['rev'],))}
+        acks.append((n, ack['rev'], rev, events))
+
+    pool = eventlet.GreenPool()
+    for n, screen in enumerate(screens):
+        pool.spawn(click, n, screen)
+    pool.waitall()
+
+    assert sorted(n for n, *_ in acks) == list(range(len(screens)))
+    for n, ack_rev, db_rev, events in acks:
+        assert ack_rev <= db_rev
+        assert 5 in events
+    # Clicks were batched, and a later click never got an earlier revision.
+    revs = [ack_rev for _, ack_rev, _, _ in sorted(acks)]
+    assert revs == sorted(revs)
+    assert 1 < len(set(revs)) < len(screens)
+
+    # The last click wins, in the database as in the batch and the cache.
+    final, = db.execute('SELECT status FROM door WHERE id = 5').fetchone()
+    assert final == clicks[-1]
+    last_event, = db.execute('SELECT data FROM door_event WHERE door_id = 5 ORDER BY rev DESC LIMIT 1').fetchone()
+    assert json.loads(last_event)['status'] == clicks[-1]
+    assert board.board_cache.get(5)['status'] == clicks[-1]
+    db.close()
@@ -0,0 +1,52 @@
+import pytest
+
+
+@pytest.mark.parametrize('changes', [
+    [],
+    [{'door_id': 999, 'status': 'Loaded'}],
+    [{'door_id': 1, 'status': 'Parked'}],
+    [{'door_id': 1, 'status': 'Loaded'}, {'door_id': '2', 'status': 'Loaded'}],
+])
+def test_bulk_update_rejects_bad_changes_without_writing(board, client, connect, changes):
+    screen = connect()
+    screen.emit('subscribe', {'topics': ['board', 'counts']}, callback=True)
+    screen.get_received()
+    rev = client.get('/api/board').get_json()['rev']
+
+    response = client.post('/api/doors/status', json={'changes': changes})
+    assert response.status_code == 400
+    assert 'error' in screen.emit('bulk_update_status', {'changes': changes}, callback=True)
+
+    assert client.get('/api/board').get_json()['rev'] == rev
+    assert screen.get_received() == []
+    with board.app.app_context():
+        assert board.DoorEvent.query.filter(board.DoorEvent.rev.isnot(None)).count() == 0
+
+
+def test_bulk_update_applies_valid_changes_as_one_revision(client):
+    rev = client.get('/api/board').get_json()['rev']
+    response = client.post('/api/doors/status', json={'changes': [{'door_id': 1, 'status': 'Loading'},
+                                                                  {'door_id': 2, 'status': ' Loaded '}]})
+    assert response.get_json() == {'rev': rev + 1, 'count': 2}
+    doors = {door['id']: door['status'] for door in client.get('/api/board').get_json()['doors']}
+    assert (doors[1], doors[2]) == ('Loading', 'Loaded')
+
+
+def test_emit_counts_bytes_payloads_exactly_and_samples_json(board, monkeypatch):
+    monkeypatch.setattr(board.socketio, 'emit', lambda *args, **kwargs: None)
+    sent = lambda event: board.EMIT_BYTES._values.get((event,), 0)
+    before = sent('board_delta'), sent('door_details')
+
+    board.emit_event('board_delta', b'\x92\x01\x90', 'board~msgpack')
+    assert sent('board_delta') == before[0] + 3
+    # Outside the sample a JSON payload is not serialised just to be measured.
+    monkeypatch.setattr(board.random, 'random', lambda: 0.5)
+    monkeypatch.setattr(board.json, 'dumps', None)
+    board.emit_event('door_details', {'door_id': 1}, 'board')
+    assert sent('door_details') == before[1]
+    monkeypatch.undo()
+
+    monkeypatch.setattr(board.socketio, 'emit', lambda *args, **kwargs: None)
+    monkeypatch.setattr(board.random, 'random', lambda: 0.01)
+    board.emit_event('door_details', {'door_id': 1}, 'board')
+    assert sent('door_details') == before[1] + board.EMIT_SIZE_SAMPLE * len('{"door_id":1}')
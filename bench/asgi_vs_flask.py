@@ -0,0 +1,92 @@
+"""load-map-app API under concurrent clients: the threaded Flask server vs
+asgi.py under uvicorn, side by side on the same database.
+
+    python bench/asgi_vs_flask.py [--clients 32] [--writers 4] [--duration 15] [--rows 2000]
+
+Each server runs as its own process on one scratch database of ``--rows``
+load maps, one after the other: ``python app.py``'s threaded Werkzeug server
+(without debug) and ``uvicorn asgi:app``. ``--clients`` threads in this
+process keep one request each in flight over keep-alive HTTP connections;
+``--writers`` of them PATCH a random map's title, the rest read 50-map list
+pages. Clients and server share the machine's cores, so on a small box the
+rows compare how each server copes with the same contention.
+"""
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+from harness import ROOT, arguments, fill_load_maps, load_app, run_load, scratch_dir, summary, table
+
+LOAD_MAP_APP = os.path.join(ROOT, 'load-map-app')
+SERVERS = (
+    ('flask (threaded)', "import sys, app; app.app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"),
+    ('uvicorn (asgi.py)', "import sys, uvicorn; uvicorn.run('asgi:app', host='127.0.0.1', port=int(sys.argv[1]), "
+                          "log_level='warning')"),
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start(code, env):
+    port = free_port()
+    process = subprocess.Popen([sys.executable, '-c', code, str(port)], cwd=LOAD_MAP_APP, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url + '/api/loadmaps?limit=1', timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f'server on {url} did not come up')
+
+
+def tasks(url, clients, writers, rows):
+    def reader(n):
+        session = requests.Session()
+        return lambda: session.get(url + '/api/loadmaps?limit=50').status_code == 200
+
+    def writer(n):
+        session, rng = requests.Session(), random.Random(n)
+        return lambda: session.patch(f'{url}/api/loadmaps/{rng.randrange(1, rows + 1)}', json=[
+            {'op': 'replace', 'path': '/title', 'value': f'Run {rng.randrange(10000)}'}]).status_code == 200
+
+    return ([('patch', writer(n)) for n in range(writers)]
+            + [('list page', reader(n)) for n in range(clients - writers)])
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], clients=32, writers=4, duration=15.0, rows=2000)
+    scratch = scratch_dir()
+    fill_load_maps(load_app('load-map-app', scratch), args.rows)
+    env = dict(os.environ, DATABASE_PATH=os.path.join(scratch, 'database.sqlite3'))
+    results = []
+    for label, code in SERVERS:
+        process, url = start(code, env)
+        try:
+            measured = run_load(tasks(url, args.clients, args.writers, args.rows), args.duration)
+        finally:
+            process.terminate()
+            process.wait()
+        for kind, (samples, failures) in sorted(measured.items()):
+            stats = summary(samples)
+            results.append((label, kind, stats['n'], round(stats['n'] / args.duration), failures,
+                            stats['p50'], stats['p99'], stats['max']))
+    print(f'{args.clients} clients ({args.writers} writing), {args.rows} load maps, '
+          f'{args.duration:g} s per server, {os.cpu_count()} CPU(s)\n')
+    table(('server', 'kind', 'requests', 'per s', 'failed', 'p50 ms', 'p99 ms', 'max ms'), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Bulk import throughput: load maps per second through POST /api/loadmaps/import,
+against one POST /api/loadmaps per map.
+
+    python bench/bulk_import.py [--sizes 1000,10000,50000] [--pallets 30,0] [--repeat 3] [--single 1000]
+
+Records are harness.sample_load_map() payloads (30 pallets, a few stops and
+notes, ~3 kB of JSON each), encoded once up front and sent as a JSON array
+and as NDJSON through the Flask test client. The time covers the whole
+request: parsing, validation, the executemany of each chunk (with its
+totals), the chunk's pallet and stop rows, FTS entries and daily rollups,
+which the import fills set-based instead of through the per-row triggers,
+and the per-record results. ``--pallets`` trims each map's pallet list:
+every pallet becomes a load_map_pallets row and feeds the totals and the FTS
+store list, so it is most of the per-map work. Imports keep adding to the
+same table; "one by one" posts the first ``--single`` full records
+individually, as the WMS did before.
+"""
+import json
+import random
+import time
+
+from harness import arguments, load_app, sample_load_map, summary, table
+
+
+def records(count, pallets=30, seed=1):
+    rng = random.Random(seed)
+    maps = [sample_load_map(n, rng) for n in range(count)]
+    for m in maps:
+        del m['pallets_json'][pallets:]
+    return maps
+
+
+def post_import(client, body, mimetype):
+    response = client.post('/api/loadmaps/import', data=body, content_type=mimetype)
+    result = response.get_json()
+    assert response.status_code == 200 and result['failed'] == 0, result
+    return result['inserted']
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], sizes=[1000, 10000, 50000], pallets=[30, 0], repeat=3, single=1000)
+    app = load_app('load-map-app')
+    client = app.app.test_client()
+    rows = []
+    for pallets in args.pallets:
+        for size in args.sizes:
+            maps = records(size, pallets)
+            bodies = (('json array', json.dumps(maps), 'application/json'),
+                      ('ndjson', ''.join(json.dumps(m) + '\n' for m in maps), 'application/x-ndjson'))
+            for label, body, mimetype in bodies:
+                samples = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    post_import(client, body, mimetype)
+                    samples.append(time.perf_counter() - started)
+                stats = summary(samples)
+                rows.append((size, pallets, label, round(size / (stats['p50'] / 1000)), stats['p50'],
+                             len(body) // size))
+    maps = records(args.single, seed=2)
+    started = time.perf_counter()
+    for m in maps:
+        assert client.post('/api/loadmaps', json=m).status_code == 201
+    elapsed = time.perf_counter() - started
+    rows.append((args.single, 30, 'one by one', round(args.single / elapsed), elapsed * 1000, None))
+    table(('maps', 'pallets', 'body', 'maps / s', 'p50 ms', 'bytes / map'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""load-map-app under N concurrent writers and M readers: per-request connections
+with the rollback journal (before) vs the WAL connection pool (after).
+
+    python bench/db_concurrency.py [--writers 4] [--readers 16] [--duration 10]
+
+Writers PUT a whole load map, as main.js saved before PATCH; readers
+alternate between a load map and the first page of the list. Every request
+goes through the Flask app on its own thread. "before" swaps app.pool for
+what get_db() used to do (sqlite3.connect per request, default journal) on a
+copy of the same database.
+"""
+import random
+import sqlite3
+
+from harness import arguments, fill_load_maps, load_app, run_load, sample_load_map, summary, table
+
+
+class ConnectPerRequest:
+    """get_db() before pooling: a fresh connection per request, closed at teardown."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def acquire(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def release(self, conn):
+        conn.close()
+
+
+def rollback_journal_copy(path):
+    copy = path + '.before'
+    with sqlite3.connect(path) as src, sqlite3.connect(copy) as dst:
+        src.backup(dst)
+        dst.execute('PRAGMA journal_mode = DELETE')
+    return copy
+
+
+def tasks(app, writers, readers, rows):
+    def writer(n):
+        client, rng = app.app.test_client(), random.Random(n)
+        return lambda: client.put(f'/api/loadmaps/{rng.randrange(1, rows + 1)}',
+                                  json=sample_load_map(n, rng)).status_code == 200
+
+    def reader(n):
+        client, rng, turn = app.app.test_client(), random.Random(-n), [0]
+
+        def read():
+            turn[0] += 1
+            url = f'/api/loadmaps/{rng.randrange(1, rows + 1)}' if turn[0] % 2 else '/api/loadmaps?limit=50'
+            return client.get(url).status_code == 200
+        return read
+
+    return ([('write', writer(n)) for n in range(writers)]
+            + [('read', reader(n)) for n in range(readers)])
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], writers=4, readers=16, rows=2000, duration=10.0)
+    app = load_app('load-map-app', DB_POOL_SIZE=args.writers + args.readers)
+    fill_load_maps(app, args.rows)
+    pooled = app.pool
+    setups = (('before', ConnectPerRequest(rollback_journal_copy(pooled.path))), ('after', pooled))
+    results = []
+    for label, pool in setups:
+        app.pool = pool
+        for kind, (samples, failures) in sorted(run_load(tasks(app, args.writers, args.readers, args.rows),
+                                                         args.duration).items()):
+            stats = summary(samples)
+            results.append((label, kind, stats['n'], round(stats['n'] / args.duration), failures,
+                            stats['p50'], stats['p99'], stats['max']))
+    print(f'{args.writers} writers, {args.readers} readers, {args.rows} load maps, {args.duration:g} s each\n')
+    table(('setup', 'kind', 'requests', 'per s', 'failed', 'p50 ms', 'p99 ms', 'max ms'), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Peak memory of the streaming export against the number of load maps, with
+the whole-list GET /api/loadmaps for comparison.
+
+    python bench/export_memory.py [--sizes 10000,100000,1000000] [--csv-max 100000] [--list-max 100000]
+
+The table is filled once, up to each size in turn (see harness.fill_load_maps,
+30 pallets per map). At each size the export is read to the end through the
+Flask test client with buffered=False, chunk by chunk as a socket would, and
+thrown away. "peak MiB" is the most the process's anonymous resident memory
+(RssAnon in /proc/self/status, so Linux only) grew above its starting value
+during the request, sampled every 50 chunks. Each request runs in a fresh
+process, so memory kept from filling or an earlier request hides nothing.
+That covers the heap and SQLite's page cache (cache_size caps it at ~16 MB)
+but not the database pages SQLite maps in, which the kernel can drop at any
+time. CSV writes one row per pallet (30x the rows of NDJSON), so it stops
+at ``--csv-max``; the unpaged list holds everything in memory at once, so
+it stops at ``--list-max``.
+"""
+import json
+import subprocess
+import sys
+import time
+
+from harness import arguments, fill_load_maps, load_app, scratch_dir, table
+
+
+def memory_kib(field):
+    with open('/proc/self/status') as status:
+        return next(int(line.split()[1]) for line in status if line.startswith(field + ':'))
+
+
+def measure(client, url):
+    """(bytes sent, seconds, peak MiB above the starting RssAnon) for reading ``url`` to the end."""
+    before = peak = memory_kib('RssAnon')
+    started = time.perf_counter()
+    response = client.get(url, buffered=False)
+    peak = max(peak, memory_kib('RssAnon'))
+    size = 0
+    for n, chunk in enumerate(response.response):
+        size += len(chunk)
+        if n % 50 == 0:
+            peak = max(peak, memory_kib('RssAnon'))
+    response.close()
+    elapsed = time.perf_counter() - started
+    return size, elapsed, (peak - before) / 1024
+
+
+def measure_in_child(scratch, url):
+    """measure() in a fresh process, printed back as JSON."""
+    output = subprocess.run([sys.executable, __file__, '--measure', url, '--scratch', scratch],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def child(args):
+    app = load_app('load-map-app', args.scratch)
+    client = app.app.test_client()
+    client.get('/api/loadmaps?limit=1')   # imports, first request and the connection pool
+    print(json.dumps(measure(client, args.measure)))
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], sizes=[10000, 100000, 1000000], csv_max=100000, list_max=100000,
+                     measure='', scratch='')
+    if args.measure:
+        return child(args)
+    scratch = scratch_dir()
+    app = load_app('load-map-app', scratch)
+    rows, filled = [], 0
+    for size in args.sizes:
+        fill_load_maps(app, size, start=filled)
+        filled = size
+        runs = [('ndjson export', '/api/loadmaps/export?format=ndjson')]
+        if size <= args.csv_max:
+            runs.append(('csv export', '/api/loadmaps/export?format=csv'))
+        if size <= args.list_max:
+            runs.append(('list (before)', '/api/loadmaps'))
+        for label, url in runs:
+            sent, elapsed, peak = measure_in_child(scratch, url)
+            rows.append((size, label, round(sent / 2**20), round(size / elapsed), peak))
+    table(('load maps', 'endpoint', 'MiB sent', 'maps / s', 'peak MiB'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""LIKE vs FTS5 search latency for GET /api/loadmaps?q=, at growing table sizes.
+
+    python bench/fts_search.py [--sizes 10000,100000,1000000] [--repeat 30]
+
+The table is filled once, up to each size in turn, through the app's INSERT
+(so every trigger runs). Each search goes through list_query() as the API
+would run it, first paged (limit=50, what the editor asks for) and then
+unpaged, with FTS_ENABLED switched off for the LIKE rows. LIKE only looks at
+title, run # and trailer #, so it finds nothing for a driver's name.
+"""
+from werkzeug.datastructures import MultiDict
+
+from harness import arguments, fill_load_maps, load_app, summary, table, timed
+
+SEARCHES = (
+    ('town (common)', 'Dover'),
+    ('run number', '4521'),
+    ('no match', 'T04242x'),
+    ('driver name', 'Okafor'),
+)
+
+
+def search(app, db, q, paged):
+    args = MultiDict({'q': q, 'limit': '50'} if paged else {'q': q})
+    sql, params, _ = app.list_query(args)
+    return db.execute(sql, params).fetchall()
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], sizes=[10000, 100000, 1000000], repeat=30)
+    app = load_app('load-map-app')
+    rows, filled = [], 0
+    for size in args.sizes:
+        fill_load_maps(app, size, start=filled)
+        filled = size
+        with app.app.app_context():
+            db = app.get_db()
+            db.execute('PRAGMA optimize')
+            for label, q in SEARCHES:
+                for paged in (True, False):
+                    for engine, fts in (('LIKE', False), ('FTS5', True)):
+                        app.app.config['FTS_ENABLED'] = fts
+                        found = len(search(app, db, q, paged))
+                        stats = summary(timed(lambda: search(app, db, q, paged), args.repeat))
+                        rows.append((size, label, 'limit 50' if paged else 'all', engine, found,
+                                     stats['p50'], stats['p99']))
+            app.app.config['FTS_ENABLED'] = True
+    table(('rows', 'search', 'page', 'engine', 'found', 'p50 ms', 'p99 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
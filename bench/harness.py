@@ -0,0 +1,166 @@
+"""Shared helpers for the benchmarks in this directory.
+
+Every benchmark imports one of the apps against a scratch database in a
+temporary directory, so the databases shipped in RUNFINAL/ and load-map-app/
+are never touched. Results are printed as a plain table; latencies are in
+milliseconds.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scratch_dir():
+    return tempfile.mkdtemp(prefix='loxdash-bench-')
+
+
+def load_app(name, scratch=None, **env):
+    """Import ``<name>/app.py`` ('RUNFINAL' or 'load-map-app') against a scratch database.
+
+    ``env`` sets the app's environment settings before the import. Only one
+    app can be loaded per process: both are the module ``app``.
+    """
+    scratch = scratch or scratch_dir()
+    if name == 'RUNFINAL':
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'database.db')}"
+    else:
+        os.environ['DATABASE_PATH'] = os.path.join(scratch, 'database.sqlite3')
+    os.environ.update({key: str(value) for key, value in env.items()})
+    sys.path.insert(0, os.path.join(ROOT, name))
+    import app
+    return app
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+
+
+def summary(samples):
+    """p50, p99 and max of latencies in seconds, as milliseconds."""
+    if not samples:
+        return {'n': 0, 'p50': None, 'p99': None, 'max': None}
+    return {'n': len(samples), 'p50': percentile(samples, 50) * 1000,
+            'p99': percentile(samples, 99) * 1000, 'max': max(samples) * 1000}
+
+
+def timed(fn, repeat):
+    """Seconds taken by each of ``repeat`` calls of ``fn``."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def fmt(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f'{value:,.2f}' if value < 1000 else f'{value:,.0f}'
+    return f'{value:,}' if isinstance(value, int) else str(value)
+
+
+def table(headers, rows):
+    """Print rows of values under headers, right-aligned."""
+    cells = [list(map(str, headers))] + [[fmt(v) for v in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for n, row in enumerate(cells):
+        print('  '.join(cell.rjust(width) for cell, width in zip(row, widths)))
+        if n == 0:
+            print('  '.join('-' * width for width in widths))
+    print()
+
+
+def int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+
+def arguments(description, **options):
+    """Parse ``--name value`` options; each default's type is the option's type."""
+    parser = argparse.ArgumentParser(description=description)
+    for name, default in options.items():
+        kind = int_list if isinstance(default, list) else type(default)
+        parser.add_argument('--' + name.replace('_', '-'), type=kind, default=default,
+                            help=f'default: {",".join(map(str, default)) if isinstance(default, list) else default}')
+    return parser.parse_args()
+
+
+TOWNS = ('Dover', 'Leeds', 'Hull', 'Bristol', 'Derby', 'York', 'Bath', 'Ely', 'Ripon', 'Wells')
+NAMES = ('Okafor', 'Nguyen', 'Silva', 'Kowalski', 'Haddad', 'Moreau', 'Patel', 'Jensen', 'Rossi', 'Tanaka')
+TYPES = ('Frozen', 'Chiller', 'Ambient', 'Eggs', 'Bread', 'DP', 'Flower', 'Equip')
+WORDS = ('pallet', 'wrapped', 'late', 'seal', 'broken', 'checked', 'temp', 'ok', 'bay', 'returned')
+
+
+def sample_load_map(n, rng):
+    """A load-map-app payload like the editor saves: 30 pallets, a few stops, notes."""
+    return {
+        'title': f'Run {n % 9000 + 1000} {rng.choice(TOWNS)}',
+        'run_number': str(n % 9000 + 1000),
+        'trailer_number': f'T{rng.randrange(100000):05d}',
+        'door': str(rng.randrange(1, 60)),
+        'driver_name': rng.choice(NAMES),
+        'loader_name': rng.choice(NAMES),
+        'wol_olpn_count': rng.randrange(200),
+        'stops_json': [{'stop': s, 'loader': rng.choice(NAMES), 'driver': rng.choice(NAMES)}
+                       for s in range(1, rng.randrange(2, 5))],
+        'pallets_json': [{'pos': pos, 'row': (pos - 1) // 2 + 1, 'col': (pos - 1) % 2 + 1,
+                          'type': rng.choice(TYPES), 'store': str(rng.randrange(1000, 1400)), 'zone': ''}
+                         for pos in range(1, 31)],
+        'bulkheads_json': [rng.randrange(1, 15)],
+        'loader_notes': ' '.join(rng.choices(WORDS, k=6)),
+        'driver_notes': ' '.join(rng.choices(WORDS, k=4)),
+    }
+
+
+def fill_load_maps(app, count, start=0, seed=1, batch=5000):
+    """Insert load maps ``start`` .. ``count - 1`` through the app's own INSERT (and its triggers)."""
+    rng = random.Random(seed + start)
+    with app.app.app_context():
+        db = app.get_db()
+        for first in range(start, count, batch):
+            db.executemany(app.INSERT_LOAD_MAP_SQL,
+                           [app.load_map_values(sample_load_map(n, rng), stamp(n))
+                            for n in range(first, min(first + batch, count))])
+            db.commit()
+
+
+def stamp(n):
+    """Timestamp of the n-th sample load map: one a minute from 2024-01-01."""
+    return (datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=n)).isoformat() + 'Z'
+
+
+def run_load(tasks, duration):
+    """Call each ``(kind, fn)`` of ``tasks`` in a loop on its own thread for ``duration`` seconds.
+
+    ``fn`` returns True on success. Returns ``{kind: (latencies, failures)}``.
+    """
+    import threading
+    deadline = time.perf_counter() + duration
+    results = {kind: ([], [0]) for kind, _ in tasks}
+    lock = threading.Lock()
+
+    def loop(kind, fn):
+        samples, failures = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            ok = fn()
+            samples.append(time.perf_counter() - started)
+            failures += not ok
+        with lock:
+            results[kind][0].extend(samples)
+            results[kind][1][0] += failures
+
+    threads = [threading.Thread(target=loop, args=task) for task in tasks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {kind: (samples, failures[0]) for kind, (samples, failures) in results.items()}
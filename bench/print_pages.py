@@ -0,0 +1,35 @@
+"""Printed pages per second through GET /api/loadmaps/print, as one PDF and
+as a ZIP of one PDF per map, with the memory the request took.
+
+    python bench/print_pages.py [--sizes 100,500,2000]
+
+Each map is a harness.sample_load_map() (30 pallets, stops and notes), which
+prints on exactly one page, so maps per second are pages per second. The table is filled
+once, up to each size in turn, and the maps are selected with ``ids=``. Pages
+render in the app's print pool (PRINT_WORKERS, one process per CPU unless
+set). Each request is read to the end in a fresh process by
+export_memory.measure_in_child, so "peak MiB" is how far the serving
+process's anonymous memory grew while it streamed the file; the render
+workers' own memory is not counted.
+"""
+from export_memory import measure_in_child
+from harness import arguments, fill_load_maps, load_app, scratch_dir, table
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], sizes=[100, 500, 2000])
+    scratch = scratch_dir()
+    app = load_app('load-map-app', scratch)
+    rows, filled = [], 0
+    for size in args.sizes:
+        fill_load_maps(app, size, start=filled)
+        filled = size
+        ids = ','.join(str(n) for n in range(1, size + 1))
+        for fmt in ('pdf', 'zip'):
+            sent, elapsed, peak = measure_in_child(scratch, f'/api/loadmaps/print?format={fmt}&ids={ids}')
+            rows.append((size, fmt, round(size / elapsed, 1), round(elapsed, 1), round(sent / 2**20, 1), peak))
+    table(('load maps', 'format', 'pages / s', 'seconds', 'MiB sent', 'peak MiB'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Socket.IO client capacity against worker count: board patch delivery to N
+dock screens with gunicorn running 1, 2 and 4 eventlet workers.
+
+    python bench/socket_capacity.py [--workers 1,2,4] [--clients 100,500,1000] [--events 20]
+
+Each worker count gets its own gunicorn (RUNFINAL/gunicorn.conf.py) on a
+scratch database, with SOCKETIO_MESSAGE_QUEUE pointing at a LocalQueue
+(RUNFINAL/localqueue.py) so emits fan out across workers as they would
+through Redis. Screens are raw engine.io websocket connections that subscribe
+to the board, like the dock screens, and the kernel spreads them over the
+workers. Once all are connected, ``--events`` status changes are POSTed,
+``--interval`` seconds apart, and every screen timestamps each board_patch.
+Latency runs from sending the POST to a screen receiving the patch; a patch
+not received ``--timeout`` seconds after the last POST is missed.
+
+The screens run on green threads in this process and share the machine with
+the workers, so with few cores the rows show contention rather than what
+more workers buy.
+"""
+import eventlet
+
+eventlet.monkey_patch()
+
+import json  # noqa: E402
+import os  # noqa: E402
+import socket  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+
+import requests  # noqa: E402
+import websocket  # noqa: E402
+
+from harness import ROOT, arguments, scratch_dir, summary, table  # noqa: E402
+
+RUNFINAL = os.path.join(ROOT, 'RUNFINAL')
+STATUSES = ('Loading', 'Loaded', 'Backhaul', 'Empty')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'{process.args} exited with {process.returncode}')
+        try:
+            if requests.get(url, timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f'{url} did not come up')
+
+
+def start_gunicorn(workers, clients, queue_url):
+    port = free_port()
+    env = dict(os.environ, BIND=f'127.0.0.1:{port}', WEB_CONCURRENCY=str(workers),
+               WORKER_CONNECTIONS=str(clients + 100), SOCKETIO_MESSAGE_QUEUE=queue_url,
+               DATABASE_URL=f"sqlite:///{os.path.join(scratch_dir(), 'database.db')}")
+    env.pop('BOARD_MESSAGE_QUEUE', None)
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                               cwd=RUNFINAL, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    wait_until_up(url + '/api/cache_stats', process)
+    return process, url
+
+
+def screen(url, received, connected, stop):
+    """One dock screen: connect, subscribe to the board, timestamp board patches."""
+    try:
+        ws = websocket.create_connection(url.replace('http', 'ws', 1) + '/socket.io/?EIO=4&transport=websocket',
+                                         timeout=30)
+    except (OSError, websocket.WebSocketException):
+        return
+    try:
+        ws.recv()                    # engine.io open
+        ws.send('40')                # socket.io connect
+        ws.recv()
+        ws.send('420["subscribe",{"topics":["board"]}]')
+        while not ws.recv().startswith('430'):
+            pass
+        connected.append(ws)
+        while not stop.ready():
+            message = ws.recv()
+            if message == '2':
+                ws.send('3')
+            elif message.startswith('42["board_patch"'):
+                received.append((json.loads(message[2:])[1]['rev'], time.perf_counter()))
+    except (OSError, websocket.WebSocketException):
+        pass
+    finally:
+        ws.close()
+
+
+def run(url, clients, events, interval, timeout):
+    received, connected, stop = [], [], eventlet.Event()
+    pool = eventlet.GreenPool(clients + 1)
+    for _ in range(clients):
+        pool.spawn_n(screen, url, received, connected, stop)
+    deadline = time.monotonic() + 60
+    while len(connected) < clients and time.monotonic() < deadline:
+        eventlet.sleep(0.1)
+    eventlet.sleep(1)
+
+    sent = {}
+    for i in range(events):
+        started = time.perf_counter()
+        response = requests.post(url + '/api/doors/status', json={'changes': [
+            {'door_id': i % 50 + 1, 'status': STATUSES[(i // 50) % len(STATUSES)]}]})
+        sent[response.json()['rev']] = started
+        eventlet.sleep(interval)
+    expected = len(connected) * events
+    deadline = time.monotonic() + timeout
+    while len(received) < expected and time.monotonic() < deadline:
+        eventlet.sleep(0.1)
+
+    stop.send()
+    for ws in connected:
+        ws.close()
+    latencies = [at - sent[rev] for rev, at in received if rev in sent]
+    return len(connected), latencies, expected - len(latencies)
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], workers=[1, 2, 4], clients=[100, 500, 1000], events=20,
+                     interval=0.25, timeout=5.0)
+    queue_port = free_port()
+    queue = subprocess.Popen([sys.executable, 'localqueue.py', '--port', str(queue_port)],
+                             cwd=RUNFINAL, stdout=subprocess.DEVNULL)
+    rows = []
+    try:
+        for workers in args.workers:
+            for clients in args.clients:
+                gunicorn, url = start_gunicorn(workers, clients, f'redis://127.0.0.1:{queue_port}/0')
+                try:
+                    connected, latencies, missed = run(url, clients, args.events, args.interval, args.timeout)
+                finally:
+                    gunicorn.terminate()
+                    gunicorn.wait()
+                stats = summary(latencies)
+                rows.append((workers, clients, connected, stats['n'], missed,
+                             stats['p50'], stats['p99'], stats['max']))
+    finally:
+        queue.terminate()
+    print(f'{args.events} board changes per run, {args.interval:g} s apart, {os.cpu_count()} CPU(s)\n')
+    table(('workers', 'clients', 'connected', 'patches', 'missed', 'p50 ms', 'p99 ms', 'max ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
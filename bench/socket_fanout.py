@@ -0,0 +1,94 @@
+"""Socket.IO fan-out for a mixed screen population: frames and bytes sent per
+board or NEW DOORS event, with rooms (after) vs every screen hearing every
+event (before).
+
+    python bench/socket_fanout.py [--board 10] [--ranges 40] [--new-doors 10] [--events 200]
+
+The screens are Socket.IO test clients of RUNFINAL on a scratch database:
+``--board`` whole-board screens, ``--ranges`` dock screens each showing 12
+doors (1-12, 13-24, 25-36, 37-48 in turn) and ``--new-doors`` /new_doors_ui
+screens. "before" subscribes every screen to every topic, which is what the
+global broadcast delivered; "after" subscribes each to what its page asks
+for. The same mix of events runs for each: single-door status changes,
+detail edits, and NEW DOORS entries added and removed. Bytes are the encoded
+Socket.IO packets, so they match what goes on the wire per client.
+"""
+import random
+
+from socketio import packet
+
+from harness import arguments, load_app, table
+
+STATUSES = ('Empty', 'Loading', 'Loaded', 'Backhaul')
+RANGES = ('1-12', '13-24', '25-36', '37-48')
+
+
+def screens(args):
+    """``(kind, subscription)`` for each screen, as its page subscribes."""
+    return ([('board', {'topics': ['board']})] * args.board
+            + [('door range', {'doors': RANGES[n % len(RANGES)]}) for n in range(args.ranges)]
+            + [('new doors', {'topics': ['new_doors']})] * args.new_doors)
+
+
+def events(app, client, count, seed=1):
+    """Drive ``count`` changes through the HTTP API, as the pages do."""
+    rng = random.Random(seed)
+    new_doors = []
+    for n in range(count):
+        roll = rng.random()
+        if roll < 0.6:
+            client.post('/api/doors/status', json={'changes': [{'door_id': rng.randrange(1, 51),
+                                                                'status': rng.choice(STATUSES)}]})
+        elif roll < 0.8:
+            client.post(f'/api/door/{rng.randrange(1, 51)}/details',
+                        json={'run_number': str(rng.randrange(1000, 9999)), 'loader': 'Sam', 'notes': f'note {n}'})
+        elif roll < 0.9 or not new_doors:
+            new_doors.append(client.post('/api/new_doors', json={'door_number': str(rng.randrange(1, 51)),
+                                                                 'trailer_number': f'T{n:05d}'}).get_json()['id'])
+        else:
+            client.delete(f'/api/new_doors/{new_doors.pop(0)}')
+
+
+def wire_size(message):
+    return len(packet.Packet(packet.EVENT, data=[message['name']] + message['args'],
+                             namespace=message['namespace']).encode())
+
+
+def run(app, population, count, everything):
+    with app.app.app_context():
+        app.db.drop_all()
+    app.init_db()
+    connected = []
+    for kind, subscription in population:
+        socket = app.socketio.test_client(app.app)
+        socket.emit('subscribe', {'topics': list(app.TOPICS)} if everything else subscription, callback=True)
+        socket.get_received()
+        connected.append((kind, socket))
+    events(app, app.app.test_client(), count)
+    totals = {}
+    for kind, socket in connected:
+        received = socket.get_received()
+        frames, size = totals.get(kind, (0, 0))
+        totals[kind] = (frames + len(received), size + sum(wire_size(m) for m in received))
+        socket.disconnect()
+    return totals
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], board=10, ranges=40, new_doors=10, events=200)
+    app = load_app('RUNFINAL')
+    population = screens(args)
+    counts = {kind: sum(1 for k, _ in population if k == kind) for kind, _ in population}
+    rows = []
+    for label, everything in (('before', True), ('after', False)):
+        totals = run(app, population, args.events, everything)
+        for kind, (frames, size) in totals.items():
+            rows.append((label, kind, counts[kind], frames / args.events, size / args.events))
+        frames, size = map(sum, zip(*totals.values()))
+        rows.append((label, 'all', len(population), frames / args.events, size / args.events))
+    print(f'{args.events} events: 60% status clicks, 20% detail edits, 20% NEW DOORS adds and removals\n')
+    table(('setup', 'screens', 'count', 'frames / event', 'bytes / event'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Board event and snapshot wire formats: encoded size and encode/decode time
+per 1,000 events, JSON vs the compact array format vs msgpack.
+
+    python bench/wire_format.py [--events 1000] [--repeat 20] [--seed 1]
+
+The events are generated the way the yard produces them: 70% status clicks,
+25% detail edits (one or two fields) and 5% detail clears, on a 50-door
+board where most doors have details. Each event is encoded the way
+emit_board() sends it: JSON subscribers get the board_patch payload (the
+whole door, every key spelled out), compact and msgpack subscribers get
+``[rev, delta]`` from encode_delta(). Encode time includes building the
+payload; decode is json.loads or msgpack.unpackb. The snapshot table encodes
+the whole board through encode_changes(), as GET /api/board does.
+"""
+import json
+import random
+
+import msgpack
+
+from harness import NAMES, WORDS, arguments, load_app, summary, table, timed
+
+STATUSES = ('Empty', 'Loading', 'Loaded', 'Backhaul')
+
+
+def sample_detail(rng):
+    return {'run_number': str(rng.randrange(1000, 9999)), 'loader': rng.choice(NAMES),
+            'trailer': f'T{rng.randrange(100000):05d}', 'trailer_temp1': f'{rng.uniform(-25, 5):.1f}',
+            'trailer_temp2': f'{rng.uniform(-25, 5):.1f}', 'stores': ','.join(str(rng.randrange(1000, 1400))
+                                                                          for _ in range(rng.randrange(1, 4))),
+            'notes': ' '.join(rng.choices(WORDS, k=rng.randrange(0, 5)))}
+
+
+def sample_board(rng):
+    return {n: {'id': n, 'name': f'Door {n}', 'status': rng.choice(STATUSES), 'rev': 0,
+                'detail': sample_detail(rng) if rng.random() < 0.8 else None}
+            for n in range(1, 51)}
+
+
+def sample_events(app, board, count, rng):
+    """``count`` successive ``(rev, previous door, door)`` changes to ``board``."""
+    events = []
+    for rev in range(1, count + 1):
+        previous = board[rng.randrange(1, 51)]
+        roll = rng.random()
+        if roll < 0.7:
+            door = dict(previous, status=rng.choice([s for s in STATUSES if s != previous['status']]))
+        elif roll < 0.95:
+            detail = dict(previous['detail'] or sample_detail(rng))
+            for field in rng.sample(app.DETAIL_FIELDS, rng.randrange(1, 3)):
+                detail[field] = sample_detail(rng)[field]
+            door = dict(previous, detail=detail)
+        else:
+            door = dict(previous, detail=None)
+        door['rev'] = rev
+        board[door['id']] = door
+        events.append((rev, previous, door))
+    return events
+
+
+def encoders(app):
+    """``(name, encode(rev, previous, door), decode)`` per wire format."""
+    return (
+        ('json', lambda rev, previous, door: json.dumps({'rev': rev, 'doors': [door]}), json.loads),
+        ('compact', lambda rev, previous, door: json.dumps([rev, [app.encode_delta(previous, door)]]),
+         json.loads),
+        ('msgpack', lambda rev, previous, door: msgpack.packb([rev, [app.encode_delta(previous, door)]]),
+         msgpack.unpackb),
+    )
+
+
+def main():
+    args = arguments(__doc__.splitlines()[0], events=1000, repeat=20, seed=1)
+    app = load_app('RUNFINAL')
+    rng = random.Random(args.seed)
+    board = sample_board(rng)
+    snapshot = {'epoch': 'e' * 32, 'rev': args.events, 'full': True}
+    events = sample_events(app, board, args.events, rng)
+    snapshot['doors'] = list(board.values())
+    per = 1000 / args.events
+
+    rows = []
+    for name, encode, decode in encoders(app):
+        encoded = [encode(*event) for event in events]
+        size = sum(len(e) for e in encoded)
+        encode_ms = summary(timed(lambda: [encode(*event) for event in events], args.repeat))['p50']
+        decode_ms = summary(timed(lambda: [decode(e) for e in encoded], args.repeat))['p50']
+        rows.append((name, round(size * per), round(size / args.events), encode_ms * per, decode_ms * per))
+    print(f'{args.events} board events on a 50-door board\n')
+    table(('format', 'bytes / 1k', 'bytes each', 'encode ms / 1k', 'decode ms / 1k'), rows)
+
+    rows = []
+    for name in ('json', 'compact', 'msgpack'):
+        def encode():
+            body = app.encode_changes(snapshot, name)
+            return body if name == 'msgpack' else json.dumps(body)
+        decode = msgpack.unpackb if name == 'msgpack' else json.loads
+        body = encode()
+        rows.append((name, len(body), summary(timed(encode, args.repeat))['p50'],
+                     summary(timed(lambda: decode(body), args.repeat))['p50']))
+    print('Full board snapshot\n')
+    table(('format', 'bytes', 'encode ms', 'decode ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,60 +1,455 @@
 from __future__ import annotations
-import os, json, sqlite3, datetime
-from flask import Flask, request, jsonify, send_from_directory, render_template, g
+import os, io, re, csv, json, time, sqlite3, datetime, base64, queue, threading, zipfile, itertools, collections
+from concurrent.futures import ProcessPoolExecutor
+import pypdf
+from flask import (Flask, request, jsonify, send_from_directory, render_template, g, Response,
+                   stream_with_context, has_app_context)
+from werkzeug.datastructures import MultiDict
+from assets import Assets
+from metrics import Registry, COUNT_BUCKETS, CONTENT_TYPE
+import printing
 
 # ---------- Config ----------
-DB_PATH = os.path.join(os.path.dirname(__file__), "database.sqlite3")
+DB_PATH = os.environ.get("DATABASE_PATH", os.path.join(os.path.dirname(__file__), "database.sqlite3"))
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))   # seconds to wait for a free connection
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+
+# Applied to every pooled connection. WAL lets readers run alongside a writer;
+# NORMAL sync is durable across application crashes in WAL mode.
+DB_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}",
+    "PRAGMA cache_size = -16000",          # KiB, i.e. ~16 MB of page cache per connection
+    "PRAGMA mmap_size = 268435456",        # 256 MB
+    "PRAGMA temp_store = MEMORY",
+)
 
 app = Flask(__name__, static_folder="static", template_folder="templates")
+assets = Assets(app)
+
+# ---------- Metrics ----------
+# Exposed on /metrics. SQL is attributed to the route that ran it through
+# g.sql = [statements, seconds]; statements are counted by the sqlite3 trace
+# callback, so statements run by triggers count too.
+metrics = Registry()
+REQUEST_SECONDS = metrics.histogram("http_request_duration_seconds", "HTTP request latency.",
+                                    ("method","route","status"))
+SQL_STATEMENTS = metrics.histogram("db_statements_per_request", "SQL statements (including trigger statements) per request.",
+                                   ("route",), buckets=COUNT_BUCKETS)
+SQL_SECONDS = metrics.histogram("db_seconds_per_request", "Time spent in SQL per request.", ("route",))
+SQL_TOTAL = metrics.counter("db_statements_total", "SQL statements executed by this process.")
+POOL_IN_USE = metrics.gauge("db_pool_connections_in_use", "Pooled connections checked out.")
+
+def count_statement(sql):
+    SQL_TOTAL.inc()
+    if has_app_context() and "sql" in g:
+        g.sql[0] += 1
+
+class TimedConnection(sqlite3.Connection):
+    """Adds the time spent in execute* to the current request's g.sql."""
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            if has_app_context() and "sql" in g:
+                g.sql[1] += time.perf_counter() - started
+
+    def execute(self, *args):
+        return self._timed(sqlite3.Connection.execute, *args)
+
+    def executemany(self, *args):
+        return self._timed(sqlite3.Connection.executemany, *args)
+
+    def executescript(self, *args):
+        return self._timed(sqlite3.Connection.executescript, *args)
+
+@app.before_request
+def start_request_timer():
+    g.started = time.perf_counter()
+    g.sql = [0, 0.0]
+
+@app.after_request
+def record_request(response):
+    if "started" in g:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - g.started, request.method, route, response.status_code)
+        SQL_STATEMENTS.observe(g.sql[0], route)
+        SQL_SECONDS.observe(g.sql[1], route)
+    return response
 
 # ---------- DB Helpers ----------
+class PoolTimeout(RuntimeError):
+    pass
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections, each configured once with DB_PRAGMAS."""
+
+    def __init__(self, path, size, timeout):
+        self.path = path
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()   # most recently used first: warmest page cache
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                               factory=TimedConnection)
+        conn.row_factory = sqlite3.Row
+        conn.set_trace_callback(count_statement)
+        for pragma in DB_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout("No database connection available")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+        except sqlite3.Error:
+            conn.close()
+        finally:
+            self._slots.release()
+
+pool = ConnectionPool(DB_PATH, DB_POOL_SIZE, DB_POOL_TIMEOUT)
+
 def get_db():
     if 'db' not in g:
-        g.db = sqlite3.connect(DB_PATH)
-        g.db.row_factory = sqlite3.Row
+        g.db = pool.acquire()
+        POOL_IN_USE.inc()
     return g.db
 
 @app.teardown_appcontext
 def close_db(exception):
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        pool.release(db)
+        POOL_IN_USE.dec()
+
+@app.errorhandler(PoolTimeout)
+def pool_timeout(e):
+    return jsonify({"error": str(e)}), 503
+
+def ensure_column(db, table, column, decl):
+    """Add a column that databases created before it existed are missing."""
+    if column not in {r["name"] for r in db.execute(f"PRAGMA table_info({table})")}:
+        db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+LOAD_MAPS_SQL = """
+CREATE TABLE IF NOT EXISTS load_maps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    title TEXT NOT NULL,
+    run_number TEXT,
+    trailer_number TEXT,
+    door TEXT,
+    fuel_level TEXT,
+    driver_name TEXT,
+    loader_name TEXT,
+    loaded_temp TEXT,
+    wol_olpn_count INTEGER,
+    stops_json TEXT NOT NULL,          -- [{stop:1, loader:"", driver:""}, ...]
+    pallets_json TEXT NOT NULL,        -- 30 items: [{pos:1, row:1, col:1, type:"Frozen|Chiller|Ambient|Eggs|Bread|DP|Flower|Equip", store:"", zone:"F|C|A|E|B|DP|FL|..."}]
+    bulkheads_json TEXT NOT NULL,      -- list of indices where bulkheads between pallets are placed (0..15 for row splits); simple integer markers
+    plbs_loaded INTEGER DEFAULT 0,
+    plbs_created INTEGER DEFAULT 0,
+    dpr_rebuilds INTEGER DEFAULT 0,
+    dpr_rewraps INTEGER DEFAULT 0,
+    dpr_consolidations INTEGER DEFAULT 0,
+    loader_notes TEXT,
+    driver_notes TEXT,
+    sanitary_q1 INTEGER DEFAULT NULL,
+    sanitary_q2 INTEGER DEFAULT NULL,
+    sanitary_q3 INTEGER DEFAULT NULL,
+    sanitary_q4 INTEGER DEFAULT NULL,
+    totals_json TEXT NOT NULL,         -- {"frozen":0,"chiller":0,"ambient":0,"eggs":0,"bread":0,"dp":0,"flower":0,"equip":0,"total":0}
+    version INTEGER NOT NULL DEFAULT 1 -- bumped on every write
+);
+"""
+
+# Schema migrations, applied in order to any database whose user_version is
+# below their number. Each step is idempotent, so databases created before
+# versioning (user_version 0) simply run through all of them once.
+MIGRATIONS = (
+    (1, LOAD_MAPS_SQL),
+    (2, lambda db: ensure_column(db, "load_maps", "version", "INTEGER NOT NULL DEFAULT 1")),
+    (3, lambda db: init_normalized(db)),
+    (4, lambda db: init_rollups(db)),
+    (5, """
+    CREATE INDEX IF NOT EXISTS idx_load_maps_updated ON load_maps(updated_at, id);
+    CREATE INDEX IF NOT EXISTS idx_load_maps_created ON load_maps(created_at, id);
+    CREATE INDEX IF NOT EXISTS idx_load_maps_run_number ON load_maps(run_number);
+    CREATE INDEX IF NOT EXISTS idx_load_maps_trailer_number ON load_maps(trailer_number);
+    """),
+    (6, lambda db: init_import(db)),
+    (7, lambda db: init_fts(db)),
+    (8, "CREATE INDEX IF NOT EXISTS idx_load_map_pallets_zone ON load_map_pallets(zone);"),
+)
+
+def run_migrations(db):
+    """Apply the MIGRATIONS newer than the database's user_version, committing after each."""
+    current = db.execute("PRAGMA user_version").fetchone()[0]
+    for version, step in MIGRATIONS:
+        if version <= current:
+            continue
+        if callable(step):
+            step(db)
+        else:
+            db.executescript(step)
+        db.execute(f"PRAGMA user_version = {version}")
+        db.commit()
+        app.logger.info("migrated database to version %s", version)
 
 def init_db():
     db = get_db()
-    db.executescript("""
-    CREATE TABLE IF NOT EXISTS load_maps (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        created_at TEXT NOT NULL,
-        updated_at TEXT NOT NULL,
-        title TEXT NOT NULL,
-        run_number TEXT,
-        trailer_number TEXT,
-        door TEXT,
-        fuel_level TEXT,
-        driver_name TEXT,
-        loader_name TEXT,
-        loaded_temp TEXT,
-        wol_olpn_count INTEGER,
-        stops_json TEXT NOT NULL,          -- [{stop:1, loader:"", driver:""}, ...]
-        pallets_json TEXT NOT NULL,        -- 30 items: [{pos:1, row:1, col:1, type:"Frozen|Chiller|Ambient|Eggs|Bread|DP|Flower|Equip", store:"", zone:"F|C|A|E|B|DP|FL|..."}]
-        bulkheads_json TEXT NOT NULL,      -- list of indices where bulkheads between pallets are placed (0..15 for row splits); simple integer markers
-        plbs_loaded INTEGER DEFAULT 0,
-        plbs_created INTEGER DEFAULT 0,
-        dpr_rebuilds INTEGER DEFAULT 0,
-        dpr_rewraps INTEGER DEFAULT 0,
-        dpr_consolidations INTEGER DEFAULT 0,
-        loader_notes TEXT,
-        driver_notes TEXT,
-        sanitary_q1 INTEGER DEFAULT NULL,
-        sanitary_q2 INTEGER DEFAULT NULL,
-        sanitary_q3 INTEGER DEFAULT NULL,
-        sanitary_q4 INTEGER DEFAULT NULL,
-        totals_json TEXT NOT NULL          -- {"frozen":0,"chiller":0,"ambient":0,"eggs":0,"bread":0,"dp":0,"flower":0,"equip":0,"total":0}
+    run_migrations(db)
+    # Migration 7 leaves the FTS table out when SQLite was built without FTS5.
+    app.config["FTS_ENABLED"] = bool(db.execute("SELECT 1 FROM sqlite_master WHERE name = 'load_maps_fts'").fetchone())
+
+# Row-per-pallet / row-per-stop copies of pallets_json and stops_json so
+# per-store and per-type questions are answered from an index instead of by
+# decoding every blob. Triggers keep them in step with every write to
+# load_maps; the JSON columns stay the source of truth for the editor.
+PALLET_ROWS_SQL = """
+    INSERT INTO load_map_pallets (load_map_id, pos, row, col, type, store, zone)
+    SELECT {src}.id, coalesce(json_extract(value, '$.pos'), key + 1),
+           json_extract(value, '$.row'), json_extract(value, '$.col'),
+           nullif(json_extract(value, '$.type'), ''), nullif(json_extract(value, '$.store'), ''),
+           nullif(json_extract(value, '$.zone'), '')
+    FROM {rows}json_each({src}.pallets_json)
+    WHERE (coalesce(json_extract(value, '$.type'), '') <> ''
+           OR coalesce(json_extract(value, '$.store'), '') <> '');
+"""
+STOP_ROWS_SQL = """
+    INSERT INTO load_map_stops (load_map_id, stop, loader, driver)
+    SELECT {src}.id, coalesce(json_extract(value, '$.stop'), key + 1),
+           nullif(json_extract(value, '$.loader'), ''), nullif(json_extract(value, '$.driver'), '')
+    FROM {rows}json_each({src}.stops_json)
+    WHERE (coalesce(json_extract(value, '$.loader'), '') <> ''
+           OR coalesce(json_extract(value, '$.driver'), '') <> '');
+"""
+
+def init_normalized(db):
+    if db.execute("SELECT 1 FROM sqlite_master WHERE name = 'load_map_pallets'").fetchone():
+        return
+    trigger_pallets = PALLET_ROWS_SQL.format(src="new", rows="")
+    trigger_stops = STOP_ROWS_SQL.format(src="new", rows="")
+    db.executescript(f"""
+    CREATE TABLE load_map_pallets (
+        load_map_id INTEGER NOT NULL REFERENCES load_maps(id),
+        pos INTEGER NOT NULL,
+        row INTEGER,
+        col INTEGER,
+        type TEXT,
+        store TEXT,
+        zone TEXT
     );
+    CREATE INDEX idx_load_map_pallets_map ON load_map_pallets(load_map_id);
+    CREATE INDEX idx_load_map_pallets_store ON load_map_pallets(store);
+    CREATE INDEX idx_load_map_pallets_type ON load_map_pallets(type);
+    CREATE TABLE load_map_stops (
+        load_map_id INTEGER NOT NULL REFERENCES load_maps(id),
+        stop INTEGER NOT NULL,
+        loader TEXT,
+        driver TEXT
+    );
+    CREATE INDEX idx_load_map_stops_map ON load_map_stops(load_map_id);
+    CREATE INDEX idx_load_map_stops_loader ON load_map_stops(loader);
+    CREATE INDEX idx_load_map_stops_driver ON load_map_stops(driver);
+
+    CREATE TRIGGER load_map_children_ai AFTER INSERT ON load_maps BEGIN
+        {trigger_pallets}
+        {trigger_stops}
+    END;
+    CREATE TRIGGER load_map_pallets_au AFTER UPDATE OF pallets_json ON load_maps BEGIN
+        DELETE FROM load_map_pallets WHERE load_map_id = old.id;
+        {trigger_pallets}
+    END;
+    CREATE TRIGGER load_map_stops_au AFTER UPDATE OF stops_json ON load_maps BEGIN
+        DELETE FROM load_map_stops WHERE load_map_id = old.id;
+        {trigger_stops}
+    END;
+    CREATE TRIGGER load_map_children_ad AFTER DELETE ON load_maps BEGIN
+        DELETE FROM load_map_pallets WHERE load_map_id = old.id;
+        DELETE FROM load_map_stops WHERE load_map_id = old.id;
+    END;
+
+    {PALLET_ROWS_SQL.format(src="load_maps", rows="load_maps, ")}
+    {STOP_ROWS_SQL.format(src="load_maps", rows="load_maps, ")}
+    """)
+    db.commit()
+
+# totals_json is derived from pallets_json by the server: every write path
+# computes it with TOTALS_SQL (counting pallet types the way main.js does), so
+# clients cannot store totals that disagree with the pallets.
+PALLET_TYPE_KEYS = {"Frozen":"frozen","Chiller":"chiller","Ambient":"ambient","Eggs":"eggs",
+                    "Bread":"bread","DP":"dp","Flower":"flower","Equip":"equip"}
+TOTALS_SQL = "(SELECT json_object({counts}, 'total', count(*) FILTER (WHERE t IN ({types}))) FROM (SELECT json_extract(value, '$.type') AS t FROM json_each({{pallets}})))".format(
+    counts=", ".join(f"'{key}', count(*) FILTER (WHERE t = '{t}')" for t, key in PALLET_TYPE_KEYS.items()),
+    types=", ".join(f"'{t}'" for t in PALLET_TYPE_KEYS))
+
+# Per day / door / loader sums of the totals and DPR counters, kept current by
+# triggers on load_maps so /api/loadmaps/stats never scans the load maps.
+ROLLUP_TOTALS = tuple(PALLET_TYPE_KEYS.values()) + ("total",)
+ROLLUP_COUNTERS = ("plbs_loaded","plbs_created","dpr_rebuilds","dpr_rewraps","dpr_consolidations")
+ROLLUP_MEASURES = ("load_maps",) + ROLLUP_TOTALS + ROLLUP_COUNTERS
+ROLLUP_KEY_SQL = "substr({src}.created_at, 1, 10), coalesce({src}.door, ''), coalesce({src}.loader_name, '')"
+ROLLUP_SQL = """
+    INSERT INTO load_map_daily_stats (day, door, loader, {measures})
+    VALUES ({key}, {values})
+    ON CONFLICT (day, door, loader) DO UPDATE SET {accumulate};
+""".format(
+    measures=", ".join(ROLLUP_MEASURES),
+    key=ROLLUP_KEY_SQL,
+    values=", ".join(["{sign}1"]
+                     + [f"{{sign}}coalesce(json_extract({{src}}.totals_json, '$.{k}'), 0)" for k in ROLLUP_TOTALS]
+                     + [f"{{sign}}coalesce({{src}}.{c}, 0)" for c in ROLLUP_COUNTERS]),
+    accumulate=", ".join(f"{m} = {m} + excluded.{m}" for m in ROLLUP_MEASURES))
+# The same sums for a set of load maps at once, added to what is already there.
+ROLLUP_ADD_SQL = """
+    INSERT INTO load_map_daily_stats (day, door, loader, {measures})
+    SELECT {key}, count(*), {sums}
+    FROM load_maps {{where}} GROUP BY 1, 2, 3
+    ON CONFLICT (day, door, loader) DO UPDATE SET {accumulate};
+""".format(
+    measures=", ".join(ROLLUP_MEASURES),
+    key=ROLLUP_KEY_SQL.format(src="load_maps"),
+    sums=", ".join([f"coalesce(sum(json_extract(totals_json, '$.{k}')), 0)" for k in ROLLUP_TOTALS]
+                   + [f"coalesce(sum({c}), 0)" for c in ROLLUP_COUNTERS]),
+    accumulate=", ".join(f"{m} = {m} + excluded.{m}" for m in ROLLUP_MEASURES))
+ROLLUP_PRUNE_SQL = """
+    DELETE FROM load_map_daily_stats
+    WHERE (day, door, loader) = ({key}) AND load_maps = 0;
+""".format(key=ROLLUP_KEY_SQL)
+
+def init_rollups(db):
+    if db.execute("SELECT 1 FROM sqlite_master WHERE name = 'load_map_daily_stats'").fetchone():
+        return
+    add_new = ROLLUP_SQL.format(src="new", sign="")
+    remove_old = ROLLUP_SQL.format(src="old", sign="-") + ROLLUP_PRUNE_SQL.format(src="old")
+    db.executescript(f"""
+    CREATE TABLE load_map_daily_stats (
+        day TEXT NOT NULL,
+        door TEXT NOT NULL,
+        loader TEXT NOT NULL,
+        {', '.join(f'{m} INTEGER NOT NULL DEFAULT 0' for m in ROLLUP_MEASURES)},
+        PRIMARY KEY (day, door, loader)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER load_map_daily_stats_ai AFTER INSERT ON load_maps BEGIN
+        {add_new}
+    END;
+    CREATE TRIGGER load_map_daily_stats_au
+    AFTER UPDATE OF created_at, door, loader_name, totals_json, {', '.join(ROLLUP_COUNTERS)} ON load_maps BEGIN
+        {remove_old}
+        {add_new}
+    END;
+    CREATE TRIGGER load_map_daily_stats_ad AFTER DELETE ON load_maps BEGIN
+        {remove_old}
+    END;
+
+    -- Totals stored before the server computed them may disagree with the pallets.
+    UPDATE load_maps SET totals_json = {TOTALS_SQL.format(pallets="pallets_json")};
+    DELETE FROM load_map_daily_stats;
+    {ROLLUP_ADD_SQL.format(where="WHERE true")}
     """)
     db.commit()
 
+# Full-text index over the searchable text of each load map. Store IDs come
+# out of pallets_json so "store 1234" finds every trailer carrying it.
+FTS_COLUMNS = ("title","run_number","trailer_number","door","driver_name","loader_name",
+               "loader_notes","driver_notes")
+FTS_WEIGHTS = (10.0, 5.0, 5.0, 2.0, 2.0, 2.0, 1.0, 1.0, 3.0)   # ... , stores
+FTS_STORES_SQL = """(SELECT group_concat(json_extract(value, '$.store'), ' ')
+                     FROM json_each({src}.pallets_json)
+                     WHERE coalesce(json_extract(value, '$.store'), '') <> '')"""
+
+FTS_INSERT_SQL = "INSERT INTO load_maps_fts(rowid, {cols}, stores) ".format(cols=", ".join(FTS_COLUMNS))
+
+def fts_values(src):
+    return ", ".join([f"{src}.id"] + [f"{src}.{c}" for c in FTS_COLUMNS] + [FTS_STORES_SQL.format(src=src)])
+
+def init_fts(db):
+    """Create the FTS5 table and its sync triggers; False if SQLite lacks FTS5."""
+    if db.execute("SELECT 1 FROM sqlite_master WHERE name = 'load_maps_fts'").fetchone():
+        return True
+    try:
+        db.executescript(f"""
+        CREATE VIRTUAL TABLE load_maps_fts USING fts5({", ".join(FTS_COLUMNS)}, stores, prefix='2 3');
+        {FTS_INSERT_TRIGGER_SQL}
+        CREATE TRIGGER load_maps_fts_ad AFTER DELETE ON load_maps BEGIN
+            DELETE FROM load_maps_fts WHERE rowid = old.id;
+        END;
+        CREATE TRIGGER load_maps_fts_au AFTER UPDATE ON load_maps BEGIN
+            DELETE FROM load_maps_fts WHERE rowid = old.id;
+            {FTS_INSERT_SQL}VALUES ({fts_values("new")});
+        END;
+        {FTS_INSERT_SQL}SELECT {fts_values("load_maps")} FROM load_maps;
+        """)
+    except sqlite3.OperationalError:
+        # No FTS5 in this SQLite build: the step is skipped and search falls back to LIKE.
+        db.rollback()
+        app.logger.warning("SQLite has no FTS5; search uses LIKE")
+        return False
+    db.commit()
+    return True
+
+# Bulk imports fill the derived tables a chunk at a time rather than row by
+# row. While load_map_import holds a row the AFTER INSERT triggers stand down,
+# and insert_chunk fills the chunk's id range with one statement per table.
+# The row only exists inside the import's own transaction, which holds the
+# write lock, so no other connection ever sees it.
+IMPORT_SKIP_SQL = "WHEN NOT EXISTS (SELECT 1 FROM load_map_import)"
+IMPORT_CHUNK_SQL = "(SELECT * FROM load_maps WHERE id BETWEEN :first AND :last) AS chunk, "
+FTS_INSERT_TRIGGER_SQL = f"""
+    CREATE TRIGGER load_maps_fts_ai AFTER INSERT ON load_maps {IMPORT_SKIP_SQL} BEGIN
+        {FTS_INSERT_SQL}VALUES ({fts_values("new")});
+    END;
+"""
+IMPORT_DERIVED_SQL = (
+    PALLET_ROWS_SQL.format(src="chunk", rows=IMPORT_CHUNK_SQL),
+    STOP_ROWS_SQL.format(src="chunk", rows=IMPORT_CHUNK_SQL),
+    ROLLUP_ADD_SQL.format(where="WHERE id BETWEEN :first AND :last"),
+)
+IMPORT_FTS_SQL = f"{FTS_INSERT_SQL}SELECT {fts_values('load_maps')} FROM load_maps WHERE id BETWEEN :first AND :last"
+
+def init_import(db):
+    fts = db.execute("SELECT 1 FROM sqlite_master WHERE name = 'load_maps_fts'").fetchone()
+    db.executescript(f"""
+    CREATE TABLE IF NOT EXISTS load_map_import (active INTEGER NOT NULL);
+    DROP TRIGGER IF EXISTS load_map_children_ai;
+    CREATE TRIGGER load_map_children_ai AFTER INSERT ON load_maps {IMPORT_SKIP_SQL} BEGIN
+        {PALLET_ROWS_SQL.format(src="new", rows="")}
+        {STOP_ROWS_SQL.format(src="new", rows="")}
+    END;
+    DROP TRIGGER IF EXISTS load_map_daily_stats_ai;
+    CREATE TRIGGER load_map_daily_stats_ai AFTER INSERT ON load_maps {IMPORT_SKIP_SQL} BEGIN
+        {ROLLUP_SQL.format(src="new", sign="")}
+    END;
+    {"DROP TRIGGER IF EXISTS load_maps_fts_ai;" + FTS_INSERT_TRIGGER_SQL if fts else ""}
+    """)
+    db.commit()
+
+def fts_query(q):
+    """Turn free text into an FTS5 MATCH expression: every word, prefix-matched."""
+    words = re.findall(r"\w+", q)
+    return " ".join(f'"{w}"*' for w in words)
+
 # Ensure DB exists on startup
 with app.app_context():
     init_db()
@@ -64,105 +459,1076 @@ with app.app_context():
 def index():
     return render_template("index.html")
 
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus text exposition of this process's metrics."""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
 @app.route("/api/health")
 def health():
     return jsonify({"status":"ok","time": datetime.datetime.utcnow().isoformat()+"Z"})
 
+JSON_FIELDS = ("stops_json","pallets_json","bulkheads_json","totals_json")
+
+LOAD_MAP_COLUMNS = (
+    "id","created_at","updated_at","title","run_number","trailer_number","door","fuel_level",
+    "driver_name","loader_name","loaded_temp","wol_olpn_count","stops_json","pallets_json",
+    "bulkheads_json","plbs_loaded","plbs_created","dpr_rebuilds","dpr_rewraps","dpr_consolidations",
+    "loader_notes","driver_notes","sanitary_q1","sanitary_q2","sanitary_q3","sanitary_q4","totals_json",
+    "version",
+)
+
+# Plain (non-JSON) columns a client may write.
+SCALAR_FIELDS = (
+    "title","run_number","trailer_number","door","fuel_level","driver_name","loader_name",
+    "loaded_temp","wol_olpn_count","plbs_loaded","plbs_created","dpr_rebuilds","dpr_rewraps",
+    "dpr_consolidations","loader_notes","driver_notes","sanitary_q1","sanitary_q2","sanitary_q3","sanitary_q4",
+)
+
+# What the sidebar list in main.js needs; no JSON blobs, so nothing to decode.
+SUMMARY_FIELDS = ("id","title","run_number","trailer_number","door","updated_at")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 def row_to_dict(row):
     d = dict(row)
     # Parse JSON fields
-    for k in ("stops_json","pallets_json","bulkheads_json","totals_json"):
+    for k in JSON_FIELDS:
         if d.get(k):
             d[k] = json.loads(d[k])
     return d
 
+def parse_fields(value):
+    """`fields=` projection: "summary" or a comma list of columns. None means all."""
+    if not value:
+        return None
+    if value == "summary":
+        return list(SUMMARY_FIELDS)
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in LOAD_MAP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # The keyset cursor is built from these two, so they are always selected.
+    for key in ("updated_at","id"):
+        if key not in fields:
+            fields.append(key)
+    return fields
+
+def encode_cursor(row):
+    raw = json.dumps([row["updated_at"], row["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def encode_offset_cursor(offset):
+    # Ranked search results have no stable keyset, so they page by offset.
+    return base64.urlsafe_b64encode(json.dumps([offset]).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor, ranked=False):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value = json.loads(raw)
+        if ranked:
+            (offset,) = value
+            if not isinstance(offset, int) or offset < 0:
+                raise ValueError
+            return offset
+        updated_at, lid = value
+        if not isinstance(updated_at, str) or not isinstance(lid, int):
+            raise ValueError
+        return updated_at, lid
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+INSERT_LOAD_MAP_SQL = """
+    INSERT INTO load_maps
+    (created_at, updated_at, title, run_number, trailer_number, door, fuel_level,
+     driver_name, loader_name, loaded_temp, wol_olpn_count, stops_json, pallets_json,
+     bulkheads_json, plbs_loaded, plbs_created, dpr_rebuilds, dpr_rewraps,
+     dpr_consolidations, loader_notes, driver_notes, sanitary_q1, sanitary_q2,
+     sanitary_q3, sanitary_q4, totals_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, """ + TOTALS_SQL.format(pallets="?") + """)
+"""
+
+def load_map_values(payload, now):
+    """Parameters for INSERT_LOAD_MAP_SQL, with the defaults a new load map gets."""
+    pallets = json.dumps(payload.get("pallets_json", []))
+    return (
+        now, now,
+        payload.get("title","New Load Map"),
+        payload.get("run_number"), payload.get("trailer_number"), payload.get("door"),
+        payload.get("fuel_level"), payload.get("driver_name"), payload.get("loader_name"),
+        payload.get("loaded_temp"), payload.get("wol_olpn_count", 0),
+        json.dumps(payload.get("stops_json", [])),
+        pallets,
+        json.dumps(payload.get("bulkheads_json", [])),
+        payload.get("plbs_loaded", 0), payload.get("plbs_created", 0),
+        payload.get("dpr_rebuilds", 0), payload.get("dpr_rewraps", 0),
+        payload.get("dpr_consolidations", 0),
+        payload.get("loader_notes",""), payload.get("driver_notes",""),
+        payload.get("sanitary_q1"), payload.get("sanitary_q2"), payload.get("sanitary_q3"),
+        payload.get("sanitary_q4"),
+        pallets   # totals_json, computed from the pallets
+    )
+
+def create_load_map(db, payload):
+    """Insert a new load map from a JSON payload and return its row."""
+    now = datetime.datetime.utcnow().isoformat()+"Z"
+    db.execute(INSERT_LOAD_MAP_SQL, load_map_values(payload, now))
+    db.commit()
+    new_id = db.execute("SELECT last_insert_rowid() as id").fetchone()["id"]
+    return db.execute("SELECT * FROM load_maps WHERE id = ?", (new_id,)).fetchone()
+
+def list_query(args):
+    """SQL, params and paging state (None when unpaged) for a GET /api/loadmaps query string.
+
+    Without limit/cursor the full list is returned as before; with either,
+    results are paged by the (updated_at, id) keyset and wrapped with next_cursor.
+    A search (q) is answered from the FTS index, best bm25 match first.
+    Raises ValueError for unknown fields or a bad cursor.
+    """
+    q = args.get("q","").strip()
+    match = fts_query(q) if q and app.config.get("FTS_ENABLED") else ""
+    cursor = args.get("cursor")
+    paged = cursor is not None or "limit" in args
+    fields = parse_fields(args.get("fields"))
+    limit = min(max(args.get("limit", DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    after = decode_cursor(cursor, ranked=bool(match)) if cursor else None
+
+    select = ", ".join(f"lm.{f}" for f in fields) if fields else "lm.*"
+    where, params = [], []
+    if match:
+        sql = f"SELECT {select} FROM load_maps_fts JOIN load_maps lm ON lm.id = load_maps_fts.rowid"
+        where.append("load_maps_fts MATCH ?")
+        params.append(match)
+        order = f"bm25(load_maps_fts, {', '.join(map(str, FTS_WEIGHTS))}), lm.id DESC"
+    else:
+        sql = f"SELECT {select} FROM load_maps lm"
+        if q:
+            where.append("(lm.title LIKE ? OR lm.run_number LIKE ? OR lm.trailer_number LIKE ?)")
+            params += [f"%{q}%", f"%{q}%", f"%{q}%"]
+        if after:
+            where.append("(lm.updated_at, lm.id) < (?, ?)")
+            params += list(after)
+        order = "lm.updated_at DESC, lm.id DESC"
+    for col in ("run_number","trailer_number"):
+        if args.get(col):
+            where.append(f"lm.{col} = ?")
+            params.append(args[col])
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {order}"
+    if not paged:
+        return sql, params, None
+    # One extra row tells us whether there is a next page.
+    sql += " LIMIT ?"
+    params.append(limit + 1)
+    if match:
+        sql += " OFFSET ?"
+        params.append(after or 0)
+    return sql, params, (limit, after, bool(match))
+
+DETAIL_SQL = "SELECT * FROM load_maps WHERE id = ?"
+
+def list_result(rows, page):
+    """The response body for the rows of a list_query()."""
+    if page is None:
+        return [row_to_dict(r) for r in rows]
+    limit, after, ranked = page
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_offset_cursor((after or 0) + limit) if ranked else encode_cursor(items[-1])
+    return {"items": [row_to_dict(r) for r in items], "next_cursor": next_cursor}
+
 @app.route("/api/loadmaps", methods=["GET","POST"])
 def loadmaps():
     db = get_db()
     if request.method == "POST":
-        payload = request.get_json(force=True)
-        now = datetime.datetime.utcnow().isoformat()+"Z"
-        db.execute("""
-            INSERT INTO load_maps
-            (created_at, updated_at, title, run_number, trailer_number, door, fuel_level,
-             driver_name, loader_name, loaded_temp, wol_olpn_count, stops_json, pallets_json,
-             bulkheads_json, plbs_loaded, plbs_created, dpr_rebuilds, dpr_rewraps,
-             dpr_consolidations, loader_notes, driver_notes, sanitary_q1, sanitary_q2,
-             sanitary_q3, sanitary_q4, totals_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            now, now,
-            payload.get("title","New Load Map"),
-            payload.get("run_number"), payload.get("trailer_number"), payload.get("door"),
-            payload.get("fuel_level"), payload.get("driver_name"), payload.get("loader_name"),
-            payload.get("loaded_temp"), payload.get("wol_olpn_count", 0),
-            json.dumps(payload.get("stops_json", [])),
-            json.dumps(payload.get("pallets_json", [])),
-            json.dumps(payload.get("bulkheads_json", [])),
-            payload.get("plbs_loaded", 0), payload.get("plbs_created", 0),
-            payload.get("dpr_rebuilds", 0), payload.get("dpr_rewraps", 0),
-            payload.get("dpr_consolidations", 0),
-            payload.get("loader_notes",""), payload.get("driver_notes",""),
-            payload.get("sanitary_q1"), payload.get("sanitary_q2"), payload.get("sanitary_q3"),
-            payload.get("sanitary_q4"),
-            json.dumps(payload.get("totals_json", {}))
-        ))
+        row = create_load_map(db, request.get_json(force=True))
+        return with_etag(jsonify(row_to_dict(row)), row["id"], row["version"]), 201
+
+    try:
+        sql, params, page = list_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(list_result(db.execute(sql, params).fetchall(), page))
+
+class PatchError(ValueError):
+    pass
+
+# Why a valid patch matched no row of an existing load map.
+PATCH_CONFLICT = "Patch not applied: a test failed or a path does not exist"
+
+def parse_pointer(path):
+    """RFC 6901 pointer -> (column, JSON path or None for the whole column, the path's parent)."""
+    if not isinstance(path, str) or not path.startswith("/"):
+        raise PatchError(f"Invalid path: {path!r}")
+    tokens = [t.replace("~1", "/").replace("~0", "~") for t in path[1:].split("/")]
+    column, rest = tokens[0], tokens[1:]
+    if column in SCALAR_FIELDS:
+        if rest:
+            raise PatchError(f"{column} has no members: {path}")
+        return column, None, None
+    if column not in JSON_FIELDS:
+        raise PatchError(f"Path is not patchable: {path}")
+    if column == "totals_json":
+        raise PatchError("totals_json is computed from pallets_json")
+    if not rest:
+        return column, None, None
+    json_path = parent = "$"
+    for i, t in enumerate(rest):
+        parent = json_path
+        if t == "-" and i == len(rest) - 1:
+            json_path += "[#]"
+        elif t.isdigit():
+            json_path += f"[{int(t)}]"
+        elif '"' in t:
+            # SQLite JSON paths cannot quote a key containing a double quote.
+            raise PatchError(f"Unsupported key in path: {path}")
+        else:
+            json_path += '."' + t + '"'
+    return column, json_path, parent
+
+def compile_patch(ops):
+    """Compile RFC 6902 operations into SET expressions and WHERE guards for one UPDATE.
+
+    Operations on the same JSON column nest (json_set(json_set(col, ...), ...)),
+    so a whole patch is applied by a single statement. `test` operations become
+    WHERE conditions evaluated against the stored row. As RFC 6902 requires,
+    replace and remove need their target to exist and add its parent; those
+    checks are WHERE conditions too, on the value as the preceding operations
+    leave it. move/copy are not supported.
+    Each written pointer gets a RETURNING expression so only the new values
+    of what was patched are sent back. Patching pallets_json recomputes
+    totals_json, which is returned too.
+    """
+    if not isinstance(ops, list) or not ops:
+        raise PatchError("Body must be a non-empty JSON Patch array")
+    sets, guards, returning = {}, [], {}
+    for op in ops:
+        kind = op.get("op") if isinstance(op, dict) else None
+        if kind not in ("add","replace","remove","test"):
+            raise PatchError(f"Unsupported op: {kind!r}")
+        if kind != "remove" and "value" not in op:
+            raise PatchError(f"{kind} needs a value")
+        column, json_path, parent = parse_pointer(op.get("path"))
+        value = op.get("value")
+        if kind == "test":
+            if json_path is None and column in SCALAR_FIELDS:
+                guards.append((f"{column} IS ?", [value]))
+            elif json_path is None:
+                guards.append((f"json({column}) = json(?)", [json.dumps(value)]))
+            else:
+                guards.append((f"json_extract({column}, ?) IS json_extract(?, '$')", [json_path, json.dumps(value)]))
+            continue
+        expr, params = sets.get(column, (column, []))
+        if json_path is not None:
+            target = parent if kind == "add" else json_path
+            guards.append((f"json_type({expr}, ?) IS NOT NULL", params + [target]))
+        if column in SCALAR_FIELDS:
+            expr, params = "?", [None if kind == "remove" else value]
+        elif json_path is None:
+            if kind == "remove":
+                raise PatchError(f"{column} cannot be removed")
+            expr, params = "json(?)", [json.dumps(value)]
+        elif kind == "remove":
+            expr, params = f"json_remove({expr}, ?)", params + [json_path]
+        elif kind == "add" and json_path.endswith("[#]"):
+            expr, params = f"json_insert({expr}, ?, json(?))", params + [json_path, json.dumps(value)]
+        elif kind == "add" and json_path.endswith("]"):
+            raise PatchError("add at an array index is not supported; use replace or '-' to append")
+        else:
+            expr, params = f"json_set({expr}, ?, json(?))", params + [json_path, json.dumps(value)]
+        sets[column] = (expr, params)
+        if column in SCALAR_FIELDS:
+            returning[op["path"]] = (column, [])
+        elif kind != "remove":
+            # json_array() keeps the JSON subtype, so objects come back as JSON, not text.
+            if json_path is None:
+                returning[op["path"]] = (f"json_array(json({column}))", [])
+            else:
+                read_path = json_path[:-3] + "[#-1]" if json_path.endswith("[#]") else json_path
+                returning[op["path"]] = (f"json_array(json_extract({column}, ?))", [read_path])
+    if "pallets_json" in sets:
+        expr, params = sets["pallets_json"]
+        sets["totals_json"] = (TOTALS_SQL.format(pallets=expr), list(params))
+        returning["/totals_json"] = ("json_array(json(totals_json))", [])
+    return sets, guards, returning
+
+# Strong ETags are "<id>-<version>": a conditional GET only needs the version
+# column, and If-Match turns into a `version IN (...)` guard on the write itself.
+def make_etag(lid, version):
+    return f"{lid}-{version}"
+
+def with_etag(response, lid, version):
+    response.set_etag(make_etag(lid, version))
+    response.headers["Cache-Control"] = "no-cache"   # always revalidate, 304 when unchanged
+    return response
+
+def if_match_guard(lid, if_match):
+    """WHERE fragment and params for an If-Match ETags set, or None when it is empty or `*`."""
+    if not if_match or if_match.star_tag:
+        return None
+    versions = []
+    for tag in if_match.as_set():
+        tag_id, _, version = tag.partition("-")
+        if tag_id == str(lid) and version.isdigit():
+            versions.append(int(version))
+    if not versions:
+        return "0", []
+    return f"version IN ({', '.join('?' * len(versions))})", versions
+
+def write_failure(db, lid, guard):
+    """Why a guarded write touched no row: (404, ...) if gone, (412, ...) if If-Match is stale, else None."""
+    current = db.execute("SELECT version FROM load_maps WHERE id = ?", (lid,)).fetchone()
+    if not current:
+        return 404, "Not found"
+    if guard and current["version"] not in guard[1]:
+        return 412, "Load map was changed by someone else"
+    return None
+
+def write_failed(db, lid, guard, otherwise=None):
+    failure = write_failure(db, lid, guard)
+    if failure is None:
+        return otherwise
+    status, error = failure
+    return jsonify({"error": error}), status
+
+def update_load_map(db, lid, payload, guard):
+    """Apply a PUT payload; the updated row, or None if no row matched id and guard."""
+    now = datetime.datetime.utcnow().isoformat()+"Z"
+    # Build dynamic update for JSON fields
+    sets = ["updated_at = ?", "version = version + 1"]
+    params = [now]
+    for f in SCALAR_FIELDS:
+        if f in payload:
+            sets.append(f"{f} = ?")
+            params.append(payload.get(f))
+    for jf in JSON_FIELDS:
+        if jf in payload and jf != "totals_json":
+            sets.append(f"{jf} = ?")
+            params.append(json.dumps(payload.get(jf)))
+    if "pallets_json" in payload:
+        sets.append("totals_json = " + TOTALS_SQL.format(pallets="?"))
+        params.append(json.dumps(payload.get("pallets_json")))
+    params.append(lid)
+    where = "id = ?"
+    if guard:
+        where += f" AND {guard[0]}"
+        params += guard[1]
+    rows = db.execute(f"UPDATE load_maps SET {', '.join(sets)} WHERE {where} RETURNING *", params).fetchall()
+    db.commit()
+    return rows[0] if rows else None
+
+def patch_load_map(db, lid, ops, guard):
+    """Apply RFC 6902 operations in one UPDATE; the response body, or None if no row matched.
+
+    Only the touched columns and the new version come back. Raises PatchError
+    for an invalid patch or one SQLite cannot apply.
+    """
+    sets, guards, returning = compile_patch(ops)
+    now = datetime.datetime.utcnow().isoformat()+"Z"
+    assignments = [f"{col} = {expr}" for col, (expr, _) in sets.items()]
+    params = [p for _, ps in sets.values() for p in ps]
+    if guard:
+        guards.append(guard)
+    where = ["id = ?"] + [cond for cond, _ in guards]
+    params += [now, lid] + [p for _, ps in guards for p in ps]
+    params += [p for _, ps in returning.values() for p in ps]
+    returning_sql = ", ".join(["version", "updated_at"] + [expr for expr, _ in returning.values()])
+    try:
+        row = db.execute(f"""
+            UPDATE load_maps SET {', '.join(assignments + ['updated_at = ?', 'version = version + 1'])}
+            WHERE {' AND '.join(where)}
+            RETURNING {returning_sql}
+        """, params).fetchall()
+    except sqlite3.OperationalError as e:
+        db.rollback()
+        raise PatchError(f"Patch could not be applied: {e}")
+    db.commit()
+    if not row:
+        return None
+    version, updated_at, *values = row[0]
+    changed = {}
+    for (path, (expr, _)), value in zip(returning.items(), values):
+        changed[path] = json.loads(value)[0] if expr.startswith("json_array") else value
+    return {"id": lid, "version": version, "updated_at": updated_at, "changed": changed}
+
+def delete_load_map(db, lid, guard):
+    """Delete a load map; False only when a guard was given and no row matched it."""
+    if guard:
+        cur = db.execute(f"DELETE FROM load_maps WHERE id = ? AND {guard[0]}", [lid] + guard[1])
         db.commit()
-        new_id = db.execute("SELECT last_insert_rowid() as id").fetchone()["id"]
-        row = db.execute("SELECT * FROM load_maps WHERE id = ?", (new_id,)).fetchone()
-        return jsonify(row_to_dict(row)), 201
-
-    # GET (list)
-    q = request.args.get("q","").strip()
-    sql = "SELECT * FROM load_maps"
-    params = []
-    if q:
-        sql += " WHERE title LIKE ? OR run_number LIKE ? OR trailer_number LIKE ?"
-        params = [f"%{q}%", f"%{q}%", f"%{q}%"]
-    sql += " ORDER BY updated_at DESC"
-    rows = db.execute(sql, params).fetchall()
-    return jsonify([row_to_dict(r) for r in rows])
-
-@app.route("/api/loadmaps/<int:lid>", methods=["GET","PUT","DELETE"])
+        return bool(cur.rowcount)
+    db.execute("DELETE FROM load_maps WHERE id = ?", (lid,))
+    db.commit()
+    return True
+
+@app.route("/api/loadmaps/<int:lid>", methods=["GET","PUT","PATCH","DELETE"])
 def loadmap_detail(lid: int):
     db = get_db()
     if request.method == "GET":
-        row = db.execute("SELECT * FROM load_maps WHERE id = ?", (lid,)).fetchone()
+        if request.if_none_match:
+            current = db.execute("SELECT version FROM load_maps WHERE id = ?", (lid,)).fetchone()
+            if current and request.if_none_match.contains_weak(make_etag(lid, current["version"])):
+                return with_etag(app.response_class(status=304), lid, current["version"])
+        row = db.execute(DETAIL_SQL, (lid,)).fetchone()
         if not row: 
             return jsonify({"error":"Not found"}), 404
-        return jsonify(row_to_dict(row))
+        return with_etag(jsonify(row_to_dict(row)), lid, row["version"])
+
+    guard = if_match_guard(lid, request.if_match)
 
     if request.method == "PUT":
-        payload = request.get_json(force=True)
-        now = datetime.datetime.utcnow().isoformat()+"Z"
-        # Build dynamic update for JSON fields
-        fields = ["title","run_number","trailer_number","door","fuel_level","driver_name","loader_name",
-                  "loaded_temp","wol_olpn_count","plbs_loaded","plbs_created","dpr_rebuilds","dpr_rewraps",
-                  "dpr_consolidations","loader_notes","driver_notes","sanitary_q1","sanitary_q2","sanitary_q3","sanitary_q4"]
-        json_fields = ["stops_json","pallets_json","bulkheads_json","totals_json"]
-        sets = ["updated_at = ?"]
-        params = [now]
-        for f in fields:
-            if f in payload:
-                sets.append(f"{f} = ?")
-                params.append(payload.get(f))
-        for jf in json_fields:
-            if jf in payload:
-                sets.append(f"{jf} = ?")
-                params.append(json.dumps(payload.get(jf)))
-        params.append(lid)
-        db.execute(f"UPDATE load_maps SET {', '.join(sets)} WHERE id = ?", params)
-        db.commit()
-        row = db.execute("SELECT * FROM load_maps WHERE id = ?", (lid,)).fetchone()
+        row = update_load_map(db, lid, request.get_json(force=True), guard)
         if not row: 
-            return jsonify({"error":"Not found"}), 404
-        return jsonify(row_to_dict(row))
+            return write_failed(db, lid, guard)
+        return with_etag(jsonify(row_to_dict(row)), lid, row["version"])
+
+    if request.method == "PATCH":
+        try:
+            result = patch_load_map(db, lid, request.get_json(force=True), guard)
+        except PatchError as e:
+            return jsonify({"error": str(e)}), 400
+        if not result:
+            return write_failed(db, lid, guard, otherwise=(jsonify({"error": PATCH_CONFLICT}), 409))
+        return with_etag(jsonify(result), lid, result["version"])
 
     # DELETE
-    db.execute("DELETE FROM load_maps WHERE id = ?", (lid,))
-    db.commit()
+    if not delete_load_map(db, lid, guard):
+        return write_failed(db, lid, guard)
     return jsonify({"ok": True})
 
+def parse_date_range(args):
+    """`date=` or `from=`/`to=` (YYYY-MM-DD, inclusive) as [start, end) bounds on created_at."""
+    start, end = args.get("from") or args.get("date"), args.get("to") or args.get("date")
+    try:
+        start = datetime.date.fromisoformat(start).isoformat() if start else None
+        end = (datetime.date.fromisoformat(end) + datetime.timedelta(days=1)).isoformat() if end else None
+    except ValueError:
+        raise ValueError("Dates must be YYYY-MM-DD")
+    return start, end
+
+def map_filters(args, column="lm.created_at"):
+    """WHERE fragments and params for the date range of a per-store / per-type query."""
+    start, end = parse_date_range(args)
+    where, params = [], []
+    if start:
+        where.append(f"{column} >= ?")
+        params.append(start)
+    if end:
+        where.append(f"{column} < ?")
+        params.append(end)
+    return where, params
+
+ROLLUP_DIMENSIONS = ("day","door","loader")
+
+def stats_sql(args):
+    """Grouped SQL (None without group_by), total SQL and params for a GET /api/loadmaps/stats query string.
+
+    Raises ValueError for a bad group_by or date.
+    """
+    group_by = [d.strip() for d in args.get("group_by", "day").split(",") if d.strip()]
+    if any(d not in ROLLUP_DIMENSIONS for d in group_by):
+        raise ValueError(f"group_by must be drawn from {', '.join(ROLLUP_DIMENSIONS)}")
+    where, params = map_filters(args, column="day")
+    for dim in ("door","loader"):
+        if dim in args:
+            where.append(f"{dim} = ?")
+            params.append(args[dim])
+    where_sql = " WHERE " + " AND ".join(where) if where else ""
+    sums = ", ".join(f"sum({m}) AS {m}" for m in ROLLUP_MEASURES)
+    grouped = None
+    if group_by:
+        cols = ", ".join(group_by)
+        grouped = f"SELECT {cols}, {sums} FROM load_map_daily_stats{where_sql} GROUP BY {cols} ORDER BY {cols}"
+    return grouped, f"SELECT {sums} FROM load_map_daily_stats{where_sql}", params
+
+@app.route("/api/loadmaps/stats")
+def loadmap_stats():
+    """Load map, pallet-total and DPR sums from the daily rollup table.
+
+    `group_by` is a comma list of day, door, loader (default day); `door` and
+    `loader` filter, and `date` or `from`/`to` restrict the days.
+    """
+    try:
+        grouped, total_sql, params = stats_sql(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    db = get_db()
+    rows = db.execute(grouped, params).fetchall() if grouped else []
+    total = db.execute(total_sql, params).fetchone()
+    return jsonify({"rows": [dict(r) for r in rows],
+                    "total": {m: total[m] or 0 for m in ROLLUP_MEASURES}})
+
+def pallets_sql(args):
+    """SQL and params for a GET /api/pallets query string; ValueError if it is incomplete or bad."""
+    where, params = map_filters(args)
+    matches = [(col, args[col]) for col in ("store","type","zone") if args.get(col)]
+    if not matches:
+        raise ValueError("store, type or zone is required")
+    for col, value in matches:
+        where.append(f"p.{col} = ?")
+        params.append(value)
+    return f"""
+        SELECT lm.id, lm.title, lm.run_number, lm.trailer_number, lm.door, lm.created_at,
+               COUNT(*) AS pallets, group_concat(p.pos) AS positions
+        FROM load_map_pallets p JOIN load_maps lm ON lm.id = p.load_map_id
+        WHERE {' AND '.join(where)}
+        GROUP BY lm.id
+        ORDER BY lm.created_at DESC, lm.id DESC
+    """, params
+
+@app.route("/api/pallets")
+def pallets_query():
+    """Load maps carrying pallets for `store` / of `type` / in `zone`, optionally within a date range."""
+    try:
+        sql, params = pallets_sql(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    rows = get_db().execute(sql, params).fetchall()
+    result = []
+    for r in rows:
+        d = dict(r)
+        d["positions"] = sorted(int(p) for p in d["positions"].split(","))
+        result.append(d)
+    return jsonify(result)
+
+def pallets_summary_sql(args):
+    """SQL and params for a GET /api/pallets/summary query string; ValueError for a bad date."""
+    where, params = map_filters(args)
+    where.append("p.type IS NOT NULL")
+    if args.get("store"):
+        where.append("p.store = ?")
+        params.append(args["store"])
+    return f"""
+        SELECT p.type, COUNT(*) AS pallets, COUNT(DISTINCT p.load_map_id) AS load_maps
+        FROM load_map_pallets p JOIN load_maps lm ON lm.id = p.load_map_id
+        WHERE {' AND '.join(where)}
+        GROUP BY p.type
+    """, params
+
+@app.route("/api/pallets/summary")
+def pallets_summary():
+    """Pallet counts per type (optionally for one `store`) within a date range."""
+    try:
+        sql, params = pallets_summary_sql(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    rows = get_db().execute(sql, params).fetchall()
+    by_type = {r["type"]: {"pallets": r["pallets"], "load_maps": r["load_maps"]} for r in rows}
+    return jsonify({"by_type": by_type, "total": sum(v["pallets"] for v in by_type.values())})
+
+def stops_sql(args):
+    """SQL and params for a GET /api/stops query string; ValueError if it is incomplete or bad."""
+    where, params = map_filters(args)
+    names = [(col, args[col]) for col in ("loader","driver") if args.get(col)]
+    if not names:
+        raise ValueError("loader or driver is required")
+    for col, value in names:
+        where.append(f"s.{col} = ?")
+        params.append(value)
+    return f"""
+        SELECT lm.id, lm.title, lm.run_number, lm.trailer_number, lm.door, lm.created_at,
+               s.stop, s.loader, s.driver
+        FROM load_map_stops s JOIN load_maps lm ON lm.id = s.load_map_id
+        WHERE {' AND '.join(where)}
+        ORDER BY lm.created_at DESC, lm.id DESC, s.stop
+    """, params
+
+@app.route("/api/stops")
+def stops_query():
+    """Load maps with a stop handled by `loader` and/or `driver`, optionally within a date range."""
+    try:
+        sql, params = stops_sql(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify([dict(r) for r in get_db().execute(sql, params).fetchall()])
+
+IMPORT_CHUNK_SIZE = 1000
+JSON_FIELD_TYPES = {"stops_json": list, "pallets_json": list, "bulkheads_json": list}
+# The triggers read pallets and stops with json_extract, which fails on anything but objects.
+JSON_ITEMS_OBJECTS = ("stops_json","pallets_json")
+INTEGER_FIELDS = ("wol_olpn_count","plbs_loaded","plbs_created","dpr_rebuilds","dpr_rewraps",
+                  "dpr_consolidations","sanitary_q1","sanitary_q2","sanitary_q3","sanitary_q4")
+
+def validate_load_map(record):
+    """Why `record` cannot be imported, or None if it can."""
+    if not isinstance(record, dict):
+        return "record must be an object"
+    if "title" in record and not isinstance(record["title"], str):
+        return "title must be a string"
+    for field, kind in JSON_FIELD_TYPES.items():
+        if field in record and not isinstance(record[field], kind):
+            return f"{field} must be {'a list' if kind is list else 'an object'}"
+    for field in JSON_ITEMS_OBJECTS:
+        if not all(isinstance(item, dict) for item in record.get(field, ())):
+            return f"{field} items must be objects"
+    for field in SCALAR_FIELDS:
+        if isinstance(record.get(field), (list, dict)):
+            return f"{field} must be a plain value"
+    for field in INTEGER_FIELDS:
+        value = record.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            return f"{field} must be a number"
+    return None
+
+def import_records():
+    """(index, record, parse error) for each record of a JSON array or NDJSON request body."""
+    if request.mimetype == "application/x-ndjson":
+        stream = request.stream
+        if isinstance(stream, io.RawIOBase):
+            # Werkzeug's LimitedStream is unbuffered: readline() would read a byte at a time.
+            stream = io.BufferedReader(stream, 64 * 1024)
+        def ndjson():
+            lines = (line for line in stream if line.strip())
+            for index, line in enumerate(lines):
+                try:
+                    yield index, json.loads(line), None
+                except ValueError:
+                    yield index, None, "invalid JSON"
+        return ndjson()
+    records = request.get_json(force=True, silent=True)
+    if not isinstance(records, list):
+        raise ValueError("Body must be a JSON array or NDJSON")
+    return ((index, record, None) for index, record in enumerate(records))
+
+def insert_chunk(db, values):
+    """Insert rows, with their pallet, stop, FTS and rollup rows, in one transaction and return their ids.
+
+    The transaction holds SQLite's write lock, so the rows get consecutive
+    ids ending at last_insert_rowid().
+    """
+    db.execute("INSERT INTO load_map_import (active) VALUES (1)")
+    db.executemany(INSERT_LOAD_MAP_SQL, values)
+    last = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    chunk = {"first": last - len(values) + 1, "last": last}
+    for sql in IMPORT_DERIVED_SQL + ((IMPORT_FTS_SQL,) if app.config.get("FTS_ENABLED") else ()):
+        db.execute(sql, chunk)
+    db.execute("DELETE FROM load_map_import")
+    db.commit()
+    return range(chunk["first"], last + 1)
+
+@app.route("/api/loadmaps/import", methods=["POST"])
+def import_loadmaps():
+    """Create many load maps at once, IMPORT_CHUNK_SIZE per transaction.
+
+    Invalid records are skipped; the response reports an id or an error for
+    every record, by its position in the body.
+    """
+    try:
+        records = import_records()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    db = get_db()
+    now = datetime.datetime.utcnow().isoformat()+"Z"
+    results, pending = [], []
+
+    def flush():
+        try:
+            ids = insert_chunk(db, [values for _, values in pending])
+        except sqlite3.Error:
+            db.rollback()
+            # Something validation missed: retry one by one so only the bad records fail.
+            for result, values in pending:
+                try:
+                    result["id"], = insert_chunk(db, [values])
+                except sqlite3.Error as e:
+                    db.rollback()
+                    result["error"] = f"insert failed: {e}"
+        else:
+            for (result, _), lid in zip(pending, ids):
+                result["id"] = lid
+        pending.clear()
+
+    for index, record, error in records:
+        result = {"index": index}
+        error = error or validate_load_map(record)
+        if error:
+            result["error"] = error
+        else:
+            pending.append((result, load_map_values(record, now)))
+        results.append(result)
+        if len(pending) >= IMPORT_CHUNK_SIZE:
+            flush()
+    if pending:
+        flush()
+    inserted = sum("id" in r for r in results)
+    return jsonify({"inserted": inserted, "failed": len(results) - inserted, "results": results})
+
+# Exports read through the cursor in batches of this many rows, so memory
+# stays flat however many load maps there are.
+EXPORT_BATCH_SIZE = 500
+EXPORT_PALLET_COLUMNS = ("pos","row","col","type","store","zone")
+# One CSV row per pallet (or one with empty pallet columns for a map without any).
+EXPORT_CSV_COLUMNS = ("id","created_at","updated_at") + SCALAR_FIELDS
+
+def iter_rows(db, sql, params):
+    cur = db.execute(sql, params)
+    while True:
+        rows = cur.fetchmany(EXPORT_BATCH_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+def export_sql(args):
+    """Format, SQL and params for a GET /api/loadmaps/export query string; ValueError if it is bad."""
+    fmt = args.get("format", "ndjson")
+    by = args.get("by", "created_at")
+    if fmt not in ("ndjson","csv"):
+        raise ValueError("format must be ndjson or csv")
+    if by not in ("created_at","updated_at"):
+        raise ValueError("by must be created_at or updated_at")
+    where, params = map_filters(args, column=f"lm.{by}")
+    where_sql = " WHERE " + " AND ".join(where) if where else ""
+    if fmt == "ndjson":
+        # Ordered by the filter column so a date range is read from its index.
+        return fmt, f"SELECT lm.* FROM load_maps lm{where_sql} ORDER BY lm.{by}, lm.id", params
+    return fmt, f"""
+        SELECT {', '.join(f'lm.{c}' for c in EXPORT_CSV_COLUMNS)},
+               {', '.join(f'p.{c}' for c in EXPORT_PALLET_COLUMNS)}
+        FROM load_maps lm LEFT JOIN load_map_pallets p ON p.load_map_id = lm.id
+        {where_sql}
+        ORDER BY lm.{by}, lm.id, p.pos
+    """, params
+
+@app.route("/api/loadmaps/export")
+def export_loadmaps():
+    """Stream every load map as NDJSON (whole maps) or CSV (one row per pallet).
+
+    `from`/`to` (or `date`) restrict the export to a range of `by` = created_at
+    (default) or updated_at.
+    """
+    try:
+        fmt, sql, params = export_sql(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    db = get_db()
+
+    if fmt == "ndjson":
+        def generate():
+            for row in iter_rows(db, sql, params):
+                yield json.dumps(row_to_dict(row)) + "\n"
+        mimetype = "application/x-ndjson"
+    else:
+        def generate():
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(EXPORT_CSV_COLUMNS + tuple(f"pallet_{c}" for c in EXPORT_PALLET_COLUMNS))
+            for n, row in enumerate(iter_rows(db, sql, params), 1):
+                writer.writerow(tuple(row))
+                if n % EXPORT_BATCH_SIZE == 0:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+            yield buf.getvalue()
+        mimetype = "text/csv"
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="loadmaps.{fmt}"'
+    return response
+
+# Server-side printing. Pages render in PRINT_WORKERS processes, PRINT_CHUNK_SIZE
+# maps per task, with at most two tasks per worker in flight so memory stays
+# bounded however many maps are printed.
+PRINT_WORKERS = int(os.environ.get("PRINT_WORKERS", str(os.cpu_count() or 1)))
+PRINT_CHUNK_SIZE = int(os.environ.get("PRINT_CHUNK_SIZE", "10"))
+PRINT_MAX_MAPS = int(os.environ.get("PRINT_MAX_MAPS", "2000"))
+print_pool = None
+print_pool_lock = threading.Lock()
+
+def get_print_pool():
+    global print_pool
+    with print_pool_lock:
+        if print_pool is None:
+            # The initializer builds printing's shared styles and layouts once per worker.
+            print_pool = ProcessPoolExecutor(PRINT_WORKERS, initializer=printing.layout)
+        return print_pool
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row_to_dict(row))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def rendered(chunks, render):
+    """render(chunk) for each chunk in worker processes, yielded in order."""
+    pool = get_print_pool()
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(pool.submit(render, chunk))
+        if len(pending) >= 2 * PRINT_WORKERS:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+class ZipStream(io.RawIOBase):
+    """Write-only file for zipfile whose bytes are handed on as they are written."""
+
+    def __init__(self):
+        self.chunks, self.pos = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.pos
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+class PdfStream:
+    """One PDF assembled from many, whose bytes are handed on as each part is added.
+
+    Each part's pages and everything they use are copied out as soon as it
+    arrives, so only the page list and each object's offset are kept. Objects
+    1-3 are reserved for the page tree, catalog and info dictionary, which
+    close() writes along with the cross-reference table.
+    """
+    PAGES, CATALOG, INFO = 1, 2, 3
+
+    def __init__(self, title):
+        self.title, self.pos, self.next_number = title, 0, 4
+        self.offsets, self.kids = {}, []
+
+    def start(self):
+        return self.emit(io.BytesIO(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"))
+
+    def add(self, pdf):
+        """The bytes that append the pages of `pdf` (a whole PDF file)."""
+        numbers, todo = {}, collections.deque()
+
+        def copy(obj):
+            # The same object with its references renumbered into this file.
+            if isinstance(obj, pypdf.generic.IndirectObject):
+                key = obj.idnum, obj.generation
+                if key not in numbers:
+                    numbers[key] = self.next_number
+                    self.next_number += 1
+                    todo.append((numbers[key], obj.get_object()))
+                return pypdf.generic.IndirectObject(numbers[key], 0, None)
+            if isinstance(obj, pypdf.generic.StreamObject):
+                # Decoded and compressed again through pypdf's public stream
+                # API; printing only writes Flate streams, which get_data() undoes.
+                new = pypdf.generic.DecodedStreamObject()
+                for key, value in obj.items():
+                    if key not in ("/Filter", "/DecodeParms", "/Length"):
+                        new[key] = copy(value)
+                new.set_data(obj.get_data())
+                return new.flate_encode()
+            if isinstance(obj, pypdf.generic.DictionaryObject):
+                new = obj.__class__()
+                for key, value in obj.items():
+                    if key != "/Parent" or obj.get("/Type") != "/Page":
+                        new[key] = copy(value)
+                return new
+            if isinstance(obj, pypdf.generic.ArrayObject):
+                return pypdf.generic.ArrayObject(copy(v) for v in obj)
+            return obj
+
+        reader = pypdf.PdfReader(io.BytesIO(pdf))
+        self.kids += [copy(page.indirect_reference) for page in reader.pages]
+        buf = io.BytesIO()
+        while todo:
+            number, obj = todo.popleft()
+            obj = copy(obj)
+            if isinstance(obj, pypdf.generic.DictionaryObject) and obj.get("/Type") == "/Page":
+                obj[pypdf.generic.NameObject("/Parent")] = self.ref(self.PAGES)
+            self.write(buf, number, obj)
+        return self.emit(buf)
+
+    def close(self):
+        """The page tree, catalog, info dictionary, cross-reference table and trailer."""
+        name, ref = pypdf.generic.NameObject, self.ref
+        buf = io.BytesIO()
+        self.write(buf, self.PAGES, pypdf.generic.DictionaryObject({
+            name("/Type"): name("/Pages"), name("/Kids"): pypdf.generic.ArrayObject(self.kids),
+            name("/Count"): pypdf.generic.NumberObject(len(self.kids))}))
+        self.write(buf, self.CATALOG, pypdf.generic.DictionaryObject({
+            name("/Type"): name("/Catalog"), name("/Pages"): ref(self.PAGES)}))
+        self.write(buf, self.INFO, pypdf.generic.DictionaryObject({
+            name("/Title"): pypdf.generic.TextStringObject(self.title)}))
+        xref = self.pos + buf.tell()
+        buf.write(b"xref\n0 %d\n0000000000 65535 f \n" % self.next_number)
+        buf.writelines(b"%010d 00000 n \n" % self.offsets[n] for n in range(1, self.next_number))
+        buf.write(b"trailer\n")
+        pypdf.generic.DictionaryObject({
+            name("/Size"): pypdf.generic.NumberObject(self.next_number),
+            name("/Root"): ref(self.CATALOG), name("/Info"): ref(self.INFO)}).write_to_stream(buf)
+        buf.write(b"\nstartxref\n%d\n%%%%EOF\n" % xref)
+        return self.emit(buf)
+
+    @staticmethod
+    def ref(number):
+        return pypdf.generic.IndirectObject(number, 0, None)
+
+    def write(self, buf, number, obj):
+        self.offsets[number] = self.pos + buf.tell()
+        buf.write(b"%d 0 obj\n" % number)
+        obj.write_to_stream(buf)
+        buf.write(b"\nendobj\n")
+
+    def emit(self, buf):
+        data = buf.getvalue()
+        self.pos += len(data)
+        return data
+
+def aborting(body):
+    """`body`, logging an error that ends it early before re-raising it.
+
+    The server then drops the connection, so the client sees a failed download
+    instead of a file that ends normally but is missing its tail.
+    """
+    try:
+        yield from body
+    except Exception:
+        app.logger.exception("printing load maps failed part way; aborting the response")
+        raise
+
+@app.route("/api/loadmaps/print")
+def print_loadmaps():
+    """Printable load maps, a page each: one PDF (`format=pdf`, default) or a ZIP of one PDF per map.
+
+    Select maps with `ids=1,2,3`, or with `date=` or `from=`/`to=` on created_at.
+    """
+    fmt = request.args.get("format", "pdf")
+    if fmt not in ("pdf","zip"):
+        return jsonify({"error":"format must be pdf or zip"}), 400
+    try:
+        where, params = map_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if request.args.get("ids"):
+        try:
+            ids = [int(i) for i in request.args["ids"].split(",") if i.strip()]
+        except ValueError:
+            return jsonify({"error":"ids must be a comma list of integers"}), 400
+        if len(ids) > PRINT_MAX_MAPS:
+            return jsonify({"error": f"print at most {PRINT_MAX_MAPS} load maps at a time"}), 400
+        where.append(f"lm.id IN ({', '.join('?' * len(ids))})")
+        params += ids
+    if not where:
+        return jsonify({"error":"ids, date or from/to is required"}), 400
+    where_sql = " WHERE " + " AND ".join(where)
+    db = get_db()
+    count = db.execute(f"SELECT count(*) FROM load_maps lm{where_sql}", params).fetchone()[0]
+    if not count:
+        return jsonify({"error":"No load maps match"}), 404
+    if count > PRINT_MAX_MAPS:
+        return jsonify({"error": f"{count} load maps match; print at most {PRINT_MAX_MAPS} at a time"}), 400
+    chunks = chunked(iter_rows(db, f"SELECT lm.* FROM load_maps lm{where_sql} ORDER BY lm.created_at, lm.id",
+                               params), PRINT_CHUNK_SIZE)
+    parts = rendered(chunks, printing.render_each if fmt == "zip" else printing.render_pdf)
+    # The first chunk renders before the response starts, so a map that cannot
+    # be printed is a 500 rather than a 200 that is cut short.
+    try:
+        first = next(parts)
+    except Exception:
+        app.logger.exception("printing load maps failed")
+        return jsonify({"error":"Printing failed"}), 500
+    parts = itertools.chain([first], parts)
+
+    if fmt == "zip":
+        def generate():
+            out = ZipStream()
+            # PDF pages are already compressed, so the entries are stored as they are.
+            with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as zf:
+                for files in parts:
+                    for lid, pdf in files:
+                        zf.writestr(f"load_map_{lid}.pdf", pdf)
+                    yield out.drain()
+            yield out.drain()
+        mimetype = "application/zip"
+    else:
+        def generate():
+            # Chunks render in parallel as separate PDFs; each one's pages are
+            # sent on as it arrives, so the whole file is never held in memory.
+            out = PdfStream("Load Maps")
+            yield out.start()
+            for pdf in parts:
+                yield out.add(pdf)
+            yield out.close()
+        mimetype = "application/pdf"
+
+    response = Response(stream_with_context(aborting(generate())), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="loadmaps.{fmt}"'
+    return response
+
+def hot_queries():
+    """(name, SQL, params) for what the list, search, detail, pallet, stop, stats and
+    export endpoints run, built by their own query builders from sample query strings.
+
+    None of them may read a whole table to find its rows. The unpaged full list
+    and the LIKE search fallback read everything by design and are left out.
+    """
+    days = {"from": "2024-01-01", "to": "2024-01-31"}
+    q = lambda **args: MultiDict(args)
+    cursor = encode_cursor({"updated_at": "2024-01-01T00:00:00Z", "id": 1})
+    stats_grouped, stats_total, stats_params = stats_sql(q(group_by="day,door", **days))
+    queries = [
+        ("list page", list_query(q(limit="50"))[:2]),
+        ("list after cursor", list_query(q(limit="50", cursor=cursor))[:2]),
+        ("by run number", list_query(q(run_number="12", limit="50"))[:2]),
+        ("by trailer number", list_query(q(trailer_number="T1"))[:2]),
+        ("detail", (DETAIL_SQL, (1,))),
+        ("pallets by store", pallets_sql(q(store="1234"))),
+        ("pallets by type", pallets_sql(q(type="Frozen", **days))),
+        ("pallets by zone", pallets_sql(q(zone="F"))),
+        ("pallet summary", pallets_summary_sql(q(**days))),
+        ("pallet summary for a store", pallets_summary_sql(q(store="1234", **days))),
+        ("stops by loader", stops_sql(q(loader="Sam"))),
+        ("stops by driver", stops_sql(q(driver="Alex", **days))),
+        ("stats by day and door", (stats_grouped, stats_params)),
+        ("stats total", (stats_total, stats_params)),
+        ("ndjson export by created_at", export_sql(q(**days))[1:]),
+        ("ndjson export by updated_at", export_sql(q(by="updated_at", **days))[1:]),
+        ("csv export", export_sql(q(format="csv", **days))[1:]),
+    ]
+    if app.config.get("FTS_ENABLED"):
+        queries += [("search", list_query(q(q="store 1234", limit="50"))[:2]),
+                    ("search next page", list_query(q(q="store 1234", limit="50",
+                                                      cursor=encode_offset_cursor(50)))[:2])]
+    return [(name, sql, params) for name, (sql, params) in queries]
+
+def full_scans(plan):
+    """Plan steps that read a whole table without an index (virtual tables excepted)."""
+    return [d for d in plan if d.startswith("SCAN ") and " USING " not in d and " VIRTUAL TABLE " not in d]
+
+def explain_hot_queries(db=None):
+    """(name, plan steps, full scans) for each of hot_queries().
+
+    Without `db` the plans come from an empty in-memory database built by
+    MIGRATIONS, so the check needs (and changes) no real database.
+    """
+    if db is None:
+        db = sqlite3.connect(":memory:")
+        db.row_factory = sqlite3.Row
+        run_migrations(db)
+    for name, sql, params in hot_queries():
+        plan = [row["detail"] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        yield name, plan, full_scans(plan)
+
+@app.cli.command("check-query-plans")
+def check_query_plans_command():
+    """EXPLAIN every hot query; exit non-zero if one scans a table it should search."""
+    failed = False
+    for name, plan, bad in explain_hot_queries():
+        failed = failed or bool(bad)
+        print(f"{'FAIL' if bad else 'ok'}  {name}: {'; '.join(plan)}")
+    if failed:
+        raise SystemExit(1)
+
 # Serve favicon if needed
 @app.route('/favicon.ico')
 def favicon():
@@ -0,0 +1,174 @@
+"""ASGI entry point for the load map app, served by uvicorn:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5501
+
+/api/loadmaps and /api/loadmaps/<id> are async handlers with the same
+contract as the Flask views in app.py (and the same SQL, shared from there).
+Their SQLite work runs on a thread pool no larger than the connection pool,
+so a request either runs or waits on the event loop without holding a thread;
+past ASGI_MAX_PENDING waiting requests the API answers 503 instead of queueing
+without bound. Every other route is the Flask app, mounted behind them.
+"""
+from __future__ import annotations
+import os, json, time, asyncio, contextlib
+from concurrent.futures import ThreadPoolExecutor
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_etags
+from flask import g
+from app import (app as wsgi_app, get_db, DB_POOL_SIZE, PatchError, PATCH_CONFLICT, PoolTimeout,
+                 REQUEST_SECONDS, SQL_STATEMENTS, SQL_SECONDS, row_to_dict, make_etag, list_query,
+                 list_result, create_load_map, if_match_guard, write_failure, update_load_map,
+                 patch_load_map, delete_load_map)
+
+ASGI_MAX_PENDING = int(os.environ.get("ASGI_MAX_PENDING", "256"))   # API requests waiting for or holding a connection
+WSGI_WORKERS = int(os.environ.get("WSGI_WORKERS", str(DB_POOL_SIZE)))   # threads for the mounted Flask routes
+
+db_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+pending = 0
+
+class Overloaded(RuntimeError):
+    pass
+
+def _in_app_context(fn, args):
+    # An app context gives fn a pooled connection through get_db(), released
+    # by app.py's teardown, and per-request SQL counts in g.sql for /metrics.
+    with wsgi_app.app_context():
+        g.sql = [0, 0.0]
+        return fn(get_db(), *args), g.sql
+
+async def run_db(route, fn, *args):
+    """Run fn(db, *args) on the database executor and attribute its SQL to route."""
+    global pending
+    if pending >= ASGI_MAX_PENDING:
+        raise Overloaded("Too many requests in flight")
+    pending += 1
+    try:
+        result, (statements, seconds) = await asyncio.get_running_loop().run_in_executor(
+            db_executor, _in_app_context, fn, args)
+    finally:
+        pending -= 1
+    SQL_STATEMENTS.observe(statements, route)
+    SQL_SECONDS.observe(seconds, route)
+    return result
+
+def error(message, status):
+    return JSONResponse({"error": message}, status_code=status)
+
+def with_etag(response, lid, version):
+    response.headers["ETag"] = f'"{make_etag(lid, version)}"'
+    response.headers["Cache-Control"] = "no-cache"   # always revalidate, 304 when unchanged
+    return response
+
+async def json_body(request):
+    """The body as JSON whatever the content type, like request.get_json(force=True)."""
+    return json.loads(await request.body())
+
+def api(route):
+    """Time the handler under the Flask rule it mirrors and map overload and pool errors."""
+    def decorator(handler):
+        async def endpoint(request):
+            started = time.perf_counter()
+            try:
+                response = await handler(request)
+            except (Overloaded, PoolTimeout) as e:
+                response = error(str(e), 503)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route,
+                                    response.status_code)
+            return response
+        return endpoint
+    return decorator
+
+# ---------- Handlers ----------
+def _get_load_map(db, lid, if_none_match):
+    if if_none_match:
+        current = db.execute("SELECT version FROM load_maps WHERE id = ?", (lid,)).fetchone()
+        if current and if_none_match.contains_weak(make_etag(lid, current["version"])):
+            return current["version"], None
+    row = db.execute("SELECT * FROM load_maps WHERE id = ?", (lid,)).fetchone()
+    return (row["version"], row_to_dict(row)) if row else (None, None)
+
+def _list_load_maps(db, sql, params, page):
+    # Encoded here too: a page of full load maps is the biggest body we send.
+    return json.dumps(list_result(db.execute(sql, params).fetchall(), page))
+
+def _create_load_map(db, payload):
+    return row_to_dict(create_load_map(db, payload))
+
+def _guarded_write(db, lid, guard, fn, *args):
+    """fn(db, lid, *args, guard), and on no match why it failed, in one trip to the executor."""
+    result = fn(db, lid, *args, guard)
+    if result:
+        return result, None
+    return result, write_failure(db, lid, guard)
+
+@api("/api/loadmaps")
+async def loadmaps(request):
+    route = "/api/loadmaps"
+    if request.method == "POST":
+        try:
+            payload = await json_body(request)
+        except ValueError:
+            return error("Request body is not valid JSON", 400)
+        row = await run_db(route, _create_load_map, payload)
+        return with_etag(JSONResponse(row, status_code=201), row["id"], row["version"])
+
+    try:
+        sql, params, page = list_query(MultiDict(request.query_params.multi_items()))
+    except ValueError as e:
+        return error(str(e), 400)
+    body = await run_db(route, _list_load_maps, sql, params, page)
+    return Response(body, media_type="application/json")
+
+@api("/api/loadmaps/<int:lid>")
+async def loadmap_detail(request):
+    route = "/api/loadmaps/<int:lid>"
+    lid = request.path_params["lid"]
+    if request.method == "GET":
+        if_none_match = parse_etags(request.headers.get("if-none-match"))
+        version, row = await run_db(route, _get_load_map, lid, if_none_match)
+        if version is None:
+            return error("Not found", 404)
+        if row is None:
+            return with_etag(Response(status_code=304), lid, version)
+        return with_etag(JSONResponse(row), lid, version)
+
+    guard = if_match_guard(lid, parse_etags(request.headers.get("if-match")))
+
+    if request.method == "DELETE":
+        deleted, failure = await run_db(route, _guarded_write, lid, guard, delete_load_map)
+        if failure:
+            return error(failure[1], failure[0])
+        return JSONResponse({"ok": True})
+
+    try:
+        payload = await json_body(request)
+    except ValueError:
+        return error("Request body is not valid JSON", 400)
+    if request.method == "PUT":
+        row, failure = await run_db(route, _guarded_write, lid, guard, update_load_map, payload)
+        result = row_to_dict(row) if row else None
+    else:
+        try:
+            result, failure = await run_db(route, _guarded_write, lid, guard, patch_load_map, payload)
+        except PatchError as e:
+            return error(str(e), 400)
+    if result:
+        return with_etag(JSONResponse(result), lid, result["version"])
+    if failure:
+        return error(failure[1], failure[0])
+    return error(PATCH_CONFLICT, 409)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    db_executor.shutdown(wait=False)
+
+app = Starlette(lifespan=lifespan, routes=[
+    Route("/api/loadmaps", loadmaps, methods=["GET","POST"]),
+    Route("/api/loadmaps/{lid:int}", loadmap_detail, methods=["GET","PUT","PATCH","DELETE"]),
+    Mount("/", WSGIMiddleware(wsgi_app, workers=WSGI_WORKERS)),
+])
@@ -0,0 +1,128 @@
+"""Fingerprinted, precompressed static assets.
+
+build() copies each file under static/ into static/dist/ as
+``name.<hash>.ext``, with a ``.gz`` (and, when the brotli module is installed,
+a ``.br``) copy of text assets, and records the mapping in manifest.json.
+Templates link them with ``asset_url('css/app.css')``. /assets/<name> serves
+the built files with an ETag and ``Cache-Control: immutable`` for a year,
+picking the precompressed copy the client accepts. Changed content gets a new
+name, so no cache ever needs purging and repeat page loads fetch only the HTML.
+
+Copied into RUNFINAL and load-map-app; tests/test_shared_modules.py keeps the copies identical.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import abort, current_app, request, send_file, url_for
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE = (".css", ".js", ".json", ".svg", ".txt", ".html", ".map")
+MAX_AGE = 365 * 24 * 3600
+MANIFEST = "manifest.json"
+
+
+def write_atomic(path, data):
+    # Workers may build at the same time; a reader never sees a partial file.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def source_files(static_dir, dist_dir):
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist_dir]
+        for name in files:
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_dir).replace(os.sep, "/"), path
+
+
+def build(static_dir, dist_dir):
+    """Fingerprint and precompress every file under ``static_dir``; return the manifest."""
+    manifest = {}
+    for rel, path in source_files(static_dir, dist_dir):
+        with open(path, "rb") as f:
+            data = f.read()
+        base, ext = os.path.splitext(rel)
+        built = f"{base}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        manifest[rel] = built
+        out = os.path.join(dist_dir, built)
+        if os.path.exists(out):
+            continue
+        if ext in COMPRESSIBLE:
+            write_atomic(out + ".gz", gzip.compress(data, 9, mtime=0))
+            if brotli is not None:
+                write_atomic(out + ".br", brotli.compress(data, quality=11))
+        write_atomic(out, data)
+    write_atomic(os.path.join(dist_dir, MANIFEST), json.dumps(manifest, indent=1, sort_keys=True).encode())
+    return manifest
+
+
+class Assets:
+    """Build-on-start and serving of fingerprinted assets for a Flask app."""
+
+    def __init__(self, app):
+        self.static_dir = app.static_folder
+        self.dist_dir = os.path.join(self.static_dir, "dist")
+        self.refresh()
+        app.add_template_global(self.url, "asset_url")
+        app.add_url_rule("/assets/<path:filename>", "assets", self.serve)
+
+        @app.cli.command("build-assets")
+        def build_assets_command():
+            """Fingerprint and precompress static/ into static/dist/."""
+            for rel, built in sorted(build(self.static_dir, self.dist_dir).items()):
+                print(f"{rel} -> {built}")
+
+    def refresh(self):
+        self.manifest = self.load()
+        self.built = set(self.manifest.values())
+
+    def load(self):
+        """The manifest, rebuilt first if a source file is newer than it."""
+        path = os.path.join(self.dist_dir, MANIFEST)
+        try:
+            built_at = os.path.getmtime(path)
+            if all(os.path.getmtime(p) <= built_at for _, p in source_files(self.static_dir, self.dist_dir)):
+                with open(path) as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+        return build(self.static_dir, self.dist_dir)
+
+    def url(self, rel):
+        if current_app.debug:
+            self.refresh()   # pick up edits without a restart
+        built = self.manifest.get(rel)
+        if built is None:
+            return url_for("static", filename=rel)
+        return url_for("assets", filename=built)
+
+    def serve(self, filename):
+        if filename not in self.built:
+            abort(404)
+        path = os.path.join(self.dist_dir, filename)
+        encoding = None
+        for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if candidate in request.accept_encodings and os.path.exists(path + suffix):
+                encoding, path = candidate, path + suffix
+                break
+        # The name carries the content hash, so it is the validator too.
+        response = send_file(path, mimetype=mimetypes.guess_type(filename)[0], max_age=MAX_AGE,
+                             etag=f"{filename}-{encoding}" if encoding else filename)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add("Accept-Encoding")
+        # A 206 carries a byte range of the compressed file, so it needs the header
+        # as much as a 200 does; a 304 has no body and a 416 no range of it.
+        if encoding and response.status_code in (200, 206):
+            response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,152 @@
+"""Printable load maps: one page per map with the 30-pallet grid, stops,
+counters, the sanitary checklist, totals and notes, rendered with ReportLab.
+
+Everything pages have in common (paragraph styles, the grid's table style and
+column widths, pallet type colours) is built once per process by layout() and
+reused for every page. The render functions take plain row dicts (see
+app.row_to_dict) so they can run in worker processes.
+"""
+import io, functools
+from types import SimpleNamespace
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+
+# Same colours and labels as the editor (static/css/styles.css, templates/index.html).
+PALLET_TYPES = {
+    "Frozen": ("Frozen", "#3aa3a8"),
+    "Chiller": ("Chiller", "#9fc27a"),
+    "Ambient": ("Ambient", "#c2a27a"),
+    "Eggs": ("Eggs", "#c29a9a"),
+    "Bread": ("Bread", "#c2c07a"),
+    "DP": ("Dry Produce", "#a0a0c2"),
+    "Flower": ("Flower", "#c29fc2"),
+    "Equip": ("Equipment", "#8899a8"),
+}
+TOTAL_KEYS = ("frozen","chiller","ambient","eggs","bread","dp","flower","equip")
+SANITARY_QUESTIONS = (
+    "1. Trailer temp set & cooling correctly?",
+    "2. Trailer condition OK?",
+    "3. Pallets stable & items secured?",
+    "4. Bulkheads in place & airflow OK?",
+)
+META_FIELDS = (
+    ("Run #","run_number"), ("Trailer #","trailer_number"), ("Door #","door"),
+    ("Fuel Level","fuel_level"), ("Loaded Temp","loaded_temp"), ("Loader","loader_name"),
+    ("Driver","driver_name"), ("WOL # oLPNs","wol_olpn_count"), ("Date","created_at"),
+)
+COUNTER_FIELDS = (
+    ("PLBs Loaded","plbs_loaded"), ("PLBs Created","plbs_created"), ("DPR Rebuilds","dpr_rebuilds"),
+    ("DPR Rewraps","dpr_rewraps"), ("DPR Consolidations","dpr_consolidations"),
+)
+GRID_ROWS, GRID_COLS = 15, 2   # as on screen: positions 1..30 left to right, nose first
+
+@functools.lru_cache(maxsize=None)
+def layout():
+    """Styles and table layouts shared by every page, built once per process."""
+    sheet = getSampleStyleSheet()
+    box = [("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+           ("FONTSIZE", (0, 0), (-1, -1), 9),
+           ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+           ("TOPPADDING", (0, 0), (-1, -1), 2),
+           ("BOTTOMPADDING", (0, 0), (-1, -1), 2)]
+    header = [("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2c3e50")),
+              ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+              ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold")]
+    return SimpleNamespace(
+        title=ParagraphStyle("LoadMapTitle", parent=sheet["Heading1"], fontSize=18, spaceAfter=6),
+        heading=ParagraphStyle("LoadMapHeading", parent=sheet["Heading4"], spaceBefore=6, spaceAfter=3),
+        note=ParagraphStyle("LoadMapNote", parent=sheet["BodyText"], fontSize=9, leading=11),
+        colours={t: colors.HexColor(c) for t, (_, c) in PALLET_TYPES.items()},
+        grid_widths=[1.6 * inch] * GRID_COLS,
+        grid_height=0.42 * inch,
+        grid_style=box + [("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                          ("FONTSIZE", (0, 0), (-1, -1), 11),
+                          ("BOX", (0, 0), (-1, -1), 1.5, colors.black)],
+        bulkhead=(2.5, colors.black),
+        pairs_widths=[1.25 * inch, 1.9 * inch],
+        pairs_style=TableStyle(box + [("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold")]),
+        stops_widths=[0.6 * inch, 3.2 * inch, 3.2 * inch],
+        stops_style=TableStyle(box + header),
+        header_style=TableStyle(box + header),
+        body_width=3.3 * inch,
+    )
+
+def pallet_grid(m, lay):
+    pallets = {p.get("pos"): p for p in m.get("pallets_json") or [] if isinstance(p, dict)}
+    bulkheads = set(m.get("bulkheads_json") or [])
+    cells, style = [], list(lay.grid_style)
+    for r in range(GRID_ROWS):
+        row = []
+        for c in range(GRID_COLS):
+            pos = r * GRID_COLS + c + 1
+            p = pallets.get(pos, {})
+            ptype = p.get("type") or ""
+            row.append("\n".join(filter(None, [f"{pos}  {p.get('store') or ''}".strip(),
+                                                PALLET_TYPES.get(ptype, (ptype,))[0] + (f" / {p['zone']}" if p.get("zone") else "")])))
+            if ptype in lay.colours:
+                style.append(("BACKGROUND", (c, r), (c, r), lay.colours[ptype]))
+            if pos in bulkheads:
+                style.append(("LINEBELOW", (c, r), (c, r)) + lay.bulkhead)
+        cells.append(row)
+    table = Table(cells, colWidths=lay.grid_widths, rowHeights=lay.grid_height)
+    table.setStyle(TableStyle(style))
+    return table
+
+def yes_no(value):
+    return {1: "Yes", 0: "No"}.get(value, "--")
+
+def page(m, lay):
+    """Flowables for one load map's page."""
+    text = lambda v: "" if v is None else str(v)
+    meta = [[label, text(m.get(key))[:10] if key == "created_at" else text(m.get(key))] for label, key in META_FIELDS]
+    counters = [[label, text(m.get(key) or 0)] for label, key in COUNTER_FIELDS]
+    stops = [["Stop","Loader","Driver"]] + [[text(s.get("stop")), text(s.get("loader")), text(s.get("driver"))]
+                                            for s in m.get("stops_json") or [] if isinstance(s, dict)]
+    sanitary = [["Sanitary Transport Requirements", ""]] + [
+        [q, yes_no(m.get(f"sanitary_q{i}"))] for i, q in enumerate(SANITARY_QUESTIONS, 1)]
+    totals = m.get("totals_json") or {}
+    totals_rows = [["Pallet Count", ""]] + [[PALLET_TYPES[t][0], text(totals.get(k, 0))]
+                                             for t, k in zip(PALLET_TYPES, TOTAL_KEYS)]
+    totals_rows.append(["Total", text(totals.get("total", 0))])
+
+    right = [Table(meta, colWidths=lay.pairs_widths, style=lay.pairs_style), Spacer(1, 6),
+             Table(counters, colWidths=lay.pairs_widths, style=lay.pairs_style), Spacer(1, 6),
+             Table(sanitary, colWidths=[2.6 * inch, 0.55 * inch], style=lay.header_style), Spacer(1, 6),
+             Table(totals_rows, colWidths=lay.pairs_widths, style=lay.header_style)]
+    body = Table([[[Paragraph("Trailer Map (Nose &rarr; Door)", lay.heading), pallet_grid(m, lay)], right]],
+                 colWidths=[sum(lay.grid_widths) + 0.3 * inch, lay.body_width],
+                 style=[("VALIGN", (0, 0), (-1, -1), "TOP")])
+    flowables = [Paragraph(f"Load Map &ndash; {escape(text(m.get('title')))}", lay.title), body]
+    if len(stops) > 1:
+        # Below the grid, where a long run of stops can continue on the next page.
+        flowables += [Paragraph("Stops", lay.heading),
+                      Table(stops, colWidths=lay.stops_widths, style=lay.stops_style, repeatRows=1, hAlign="LEFT")]
+    for label, key in (("Loader Notes","loader_notes"), ("Driver Notes","driver_notes")):
+        if m.get(key):
+            flowables += [Paragraph(label, lay.heading), Paragraph(escape(m[key]).replace("\n", "<br/>"), lay.note)]
+    return flowables
+
+def escape(value):
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def render_pdf(maps):
+    """One PDF with each load map starting on a new page."""
+    lay = layout()
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter, pageCompression=1, title="Load Maps",
+                            leftMargin=0.4 * inch, rightMargin=0.4 * inch,
+                            topMargin=0.4 * inch, bottomMargin=0.4 * inch)
+    flowables = []
+    for m in maps:
+        if flowables:
+            flowables.append(PageBreak())
+        flowables += page(m, lay)
+    doc.build(flowables)
+    return buf.getvalue()
+
+def render_each(maps):
+    """(load map id, PDF) for each map, for the ZIP download."""
+    return [(m["id"], render_pdf([m])) for m in maps]
@@ -3,6 +3,8 @@ const $ = (sel) => document.querySelector(sel);
 const $$ = (sel) => Array.from(document.querySelectorAll(sel));
 
 let currentId = null;
+let original = null;    // body as loaded, to send only what changed on save
+let currentEtag = null; // version we loaded; saves are rejected (412) if someone else saved since
 let pallets = [];       // length=30
 let bulkheads = [];     // indices 1..15 per row put marker after position (1..14); we store absolute positions 1..14 per row (A=1..14, B=16..29) for simplicity
 let totals = {
@@ -54,12 +56,20 @@ function recomputeTotals(){
   $("#t_total").textContent = totals.total;
 }
 
-async function fetchList(q=""){
-  const res = await fetch(`/api/loadmaps${q?`?q=${encodeURIComponent(q)}`:""}`);
+const PAGE_SIZE = 50;
+
+// Sidebar list: summary columns only, one keyset page at a time.
+async function fetchList(q="", cursor=null){
+  const params = new URLSearchParams({fields:"summary", limit:String(PAGE_SIZE)});
+  if(q) params.set("q", q);
+  if(cursor) params.set("cursor", cursor);
+  const res = await fetch(`/api/loadmaps?${params}`);
   const data = await res.json();
   const list = $("#mapsList");
-  list.innerHTML = "";
-  data.forEach(item=>{
+  if(!cursor) list.innerHTML = "";
+  const oldMore = $("#loadMoreBtn");
+  if(oldMore) oldMore.remove();
+  data.items.forEach(item=>{
     const div = document.createElement("div");
     div.className = "list-item";
     const left = document.createElement("div");
@@ -74,6 +84,14 @@ async function fetchList(q=""){
     div.appendChild(left); div.appendChild(right);
     list.appendChild(div);
   });
+  if(data.next_cursor){
+    const more = document.createElement("button");
+    more.id = "loadMoreBtn";
+    more.className = "btn";
+    more.textContent = "Load more";
+    more.onclick = ()=> fetchList(q, data.next_cursor);
+    list.appendChild(more);
+  }
 }
 
 function palletCard(p){
@@ -142,7 +160,10 @@ function openEditor(id){
     return;
   }
   // existing
-  fetch(`/api/loadmaps/${id}`).then(r=>r.json()).then(item=>{
+  fetch(`/api/loadmaps/${id}`).then(r=>{
+    currentEtag = r.headers.get("ETag");
+    return r.json();
+  }).then(item=>{
     $("#title").value = item.title || "";
     $("#run_number").value = item.run_number || "";
     $("#trailer_number").value = item.trailer_number || "";
@@ -172,6 +193,7 @@ function openEditor(id){
     bulkheads = item.bulkheads_json || [];
     renderGrid();
     recomputeTotals();
+    original = JSON.parse(JSON.stringify(collectBody()));
   });
 }
 
@@ -179,6 +201,8 @@ function closeEditor(){
   $("#editor").classList.add("hidden");
   $("#listView").classList.remove("hidden");
   currentId = null;
+  original = null;
+  currentEtag = null;
 }
 
 function collectStops(){
@@ -195,8 +219,8 @@ function ynToNum(v){
   return None;
 }
 
-async function save(){
-  const body = {
+function collectBody(){
+  return {
     title: $("#title").value.trim() || "Load Map",
     run_number: $("#run_number").value.trim(),
     trailer_number: $("#trailer_number").value.trim(),
@@ -219,18 +243,64 @@ async function save(){
     sanitary_q1: $("#san_q1").value==="Yes"?1:($("#san_q1").value==="No"?0:null),
     sanitary_q2: $("#san_q2").value==="Yes"?1:($("#san_q2").value==="No"?0:null),
     sanitary_q3: $("#san_q3").value==="Yes"?1:($("#san_q3").value==="No"?0:null),
-    sanitary_q4: $("#san_q4").value==="Yes"?1:($("#san_q4").value==="No"?0:null),
-    totals_json: totals
+    sanitary_q4: $("#san_q4").value==="Yes"?1:($("#san_q4").value==="No"?0:null)
+    // totals_json is computed by the server from pallets_json
   };
+}
+
+// JSON Patch (RFC 6902) ops for what differs between two bodies: per
+// pallet/stop field rather than whole blobs. A field the stored item lacks is
+// added, since replace requires its target to exist.
+function diffOps(before, after){
+  const ops = [];
+  const same = (a, b)=> JSON.stringify(a) === JSON.stringify(b);
+  Object.keys(after).forEach(key=>{
+    const a = before[key], b = after[key];
+    if(same(a, b)) return;
+    if(key !== "bulkheads_json" && Array.isArray(a) && Array.isArray(b) && a.length === b.length){
+      b.forEach((item, i)=>{
+        if(same(a[i], item)) return;
+        if(!a[i] || typeof a[i] !== "object" || !item || typeof item !== "object"){
+          ops.push({op:"replace", path:`/${key}/${i}`, value:item});
+          return;
+        }
+        Object.keys(item).forEach(f=>{
+          if(!same(a[i][f], item[f])) ops.push({op: f in a[i] ? "replace" : "add", path:`/${key}/${i}/${f}`, value:item[f]});
+        });
+      });
+    } else if(a && b && typeof a === "object" && typeof b === "object" && !Array.isArray(a) && !Array.isArray(b)){
+      Object.keys(b).forEach(f=>{
+        if(!same(a[f], b[f])) ops.push({op: f in a ? "replace" : "add", path:`/${key}/${f}`, value:b[f]});
+      });
+    } else {
+      ops.push({op:"replace", path:`/${key}`, value:b});
+    }
+  });
+  return ops;
+}
+
+function conditional(headers){
+  if(currentEtag) headers["If-Match"] = currentEtag;
+  return headers;
+}
+
+async function save(){
+  const body = collectBody();
   let res;
-  if(currentId){
-    res = await fetch(`/api/loadmaps/${currentId}`, {method:"PUT", headers:{"Content-Type":"application/json"}, body: JSON.stringify(body)});
+  if(currentId && original){
+    const ops = diffOps(original, body);
+    if(!ops.length){ closeEditor(); return; }
+    res = await fetch(`/api/loadmaps/${currentId}`, {method:"PATCH", headers:conditional({"Content-Type":"application/json-patch+json"}), body: JSON.stringify(ops)});
+  } else if(currentId){
+    res = await fetch(`/api/loadmaps/${currentId}`, {method:"PUT", headers:conditional({"Content-Type":"application/json"}), body: JSON.stringify(body)});
   } else {
     res = await fetch(`/api/loadmaps`, {method:"POST", headers:{"Content-Type":"application/json"}, body: JSON.stringify(body)});
   }
   if(res.ok){
     await fetchList();
     closeEditor();
+  } else if(res.status === 412){
+    alert("Someone else saved this load map while you were editing. Reopen it to see their changes.");
   } else {
     alert("Save failed");
   }
@@ -239,9 +309,10 @@ async function save(){
 function del(){
   if(!currentId){ closeEditor(); return; }
   if(!confirm("Delete this load map?")) return;
-  fetch(`/api/loadmaps/${currentId}`, {method:"DELETE"})
+  fetch(`/api/loadmaps/${currentId}`, {method:"DELETE", headers:conditional({})})
     .then(r=>{
       if(r.ok){ fetchList(); closeEditor(); }
+      else if(r.status === 412) alert("Someone else saved this load map since you opened it. Reopen it before deleting.");
       else alert("Delete failed");
     });
 }
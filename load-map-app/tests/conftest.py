@@ -0,0 +1,32 @@
+# Run from load-map-app/:  python -m pytest tests
+#
+# The app is imported once, against a throwaway database; each test starts
+# with no load maps.
+import os, sys, tempfile
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="load-map-tests-"), "database.sqlite3")
+sys.path.insert(0, os.path.dirname(HERE))
+
+import app as loadmap  # noqa: E402
+
+@pytest.fixture
+def app_module():
+    with loadmap.app.app_context():
+        db = loadmap.get_db()
+        db.execute("DELETE FROM load_maps")
+        db.commit()
+    return loadmap
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+@pytest.fixture
+def load_map(client):
+    """A stored load map with two pallets and a stop."""
+    body = {"title": "Run 12", "run_number": "12",
+            "pallets_json": [{"pos": 1, "type": "Frozen", "store": "1234"}, {"pos": 2, "type": "Bread"}],
+            "stops_json": [{"stop": 1, "loader": "Sam", "driver": ""}]}
+    return client.post("/api/loadmaps", json=body).get_json()
@@ -0,0 +1,21 @@
+import gzip, os
+
+def test_range_of_a_compressed_asset_says_how_it_is_encoded(app_module, client):
+    built = app_module.assets.manifest["css/styles.css"]
+    path = os.path.join(app_module.assets.dist_dir, built)
+    with open(path + ".gz", "rb") as f:
+        compressed = f.read()
+    url = f"/assets/{built}"
+    whole = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert whole.status_code == 200 and whole.headers["Content-Encoding"] == "gzip"
+    assert whole.data == compressed
+
+    part = client.get(url, headers={"Accept-Encoding": "gzip", "Range": "bytes=0-9"})
+    assert part.status_code == 206 and part.headers["Content-Encoding"] == "gzip"
+    assert part.data == compressed[:10]
+    rest = client.get(url, headers={"Accept-Encoding": "gzip", "Range": "bytes=10-"})
+    with open(path, "rb") as f:
+        assert gzip.decompress(part.data + rest.data) == f.read()
+
+    plain = client.get(url, headers={"Accept-Encoding": "identity", "Range": "bytes=0-9"})
+    assert plain.status_code == 206 and "Content-Encoding" not in plain.headers
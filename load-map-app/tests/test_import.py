@@ -0,0 +1,62 @@
+import pytest
+
+def import_maps(client, records):
+    r = client.post("/api/loadmaps/import", json=records)
+    assert r.status_code == 200
+    return r.get_json()
+
+@pytest.mark.parametrize("bad, error", [
+    ({"title": None}, "title must be a string"),
+    ({"title": 12}, "title must be a string"),
+    ({"pallets_json": ["Frozen"]}, "pallets_json items must be objects"),
+    ({"stops_json": [{"stop": 1}, None]}, "stops_json items must be objects"),
+    ({"wol_olpn_count": "12"}, "wol_olpn_count must be a number"),
+    ({"sanitary_q1": True}, "sanitary_q1 must be a number"),
+])
+def test_invalid_records_fail_alone(client, bad, error):
+    body = import_maps(client, [{"title": "a"}, dict({"title": "x"}, **bad), {"title": "b", "sanitary_q1": None}])
+    assert (body["inserted"], body["failed"]) == (2, 1)
+    first, failed, last = body["results"]
+    assert failed == {"index": 1, "error": error}
+    assert client.get(f"/api/loadmaps/{first['id']}").get_json()["title"] == "a"
+    assert client.get(f"/api/loadmaps/{last['id']}").get_json()["title"] == "b"
+
+def test_chunk_that_fails_in_sqlite_is_retried_record_by_record(app_module, client):
+    with app_module.app.app_context():
+        db = app_module.get_db()
+        db.execute("""CREATE TRIGGER reject_boom BEFORE INSERT ON load_maps WHEN new.title = 'boom'
+                      BEGIN SELECT RAISE(ABORT, 'boom'); END""")
+        db.commit()
+    try:
+        body = import_maps(client, [{"title": "a"}, {"title": "boom"}, {"title": "b"}])
+    finally:
+        with app_module.app.app_context():
+            db = app_module.get_db()
+            db.execute("DROP TRIGGER reject_boom")
+            db.commit()
+    assert (body["inserted"], body["failed"]) == (2, 1)
+    assert body["results"][1] == {"index": 1, "error": "insert failed: boom"}
+    ids = [r["id"] for r in body["results"] if "id" in r]
+    assert [client.get(f"/api/loadmaps/{i}").get_json()["title"] for i in ids] == ["a", "b"]
+
+def test_import_fills_derived_tables_like_single_writes(app_module, client):
+    maps = [{"title": f"Run {n}", "door": str(n % 3), "loader_name": "Sam", "plbs_loaded": n,
+             "pallets_json": [{"pos": 1, "type": "Frozen", "store": str(1000 + n), "zone": "F"},
+                              {"pos": 2, "type": "Bread"}, {"pos": 3}],
+             "stops_json": [{"stop": 1, "loader": "Sam", "driver": ""}, {"stop": 2}]} for n in range(5)]
+    imported = [r["id"] for r in import_maps(client, maps)["results"]]
+    posted = [client.post("/api/loadmaps", json=m).get_json()["id"] for m in maps]
+    with app_module.app.app_context():
+        db = app_module.get_db()
+        def children(table, ids):
+            return [tuple(r)[1:] for i in ids for r in
+                    db.execute(f"SELECT * FROM {table} WHERE load_map_id = ? ORDER BY rowid", (i,))]
+        for table in ("load_map_pallets", "load_map_stops"):
+            assert children(table, imported) == children(table, posted)
+        fts = lambda i: tuple(db.execute("SELECT * FROM load_maps_fts WHERE rowid = ?", (i,)).fetchone())
+        assert [fts(i) for i in imported] == [fts(i) for i in posted]
+        stats = db.execute("SELECT door, load_maps, frozen, bread, total, plbs_loaded FROM load_map_daily_stats "
+                           "ORDER BY door").fetchall()
+        assert [tuple(r) for r in stats] == [("0", 4, 4, 4, 8, 6), ("1", 4, 4, 4, 8, 10), ("2", 2, 2, 2, 4, 4)]
+        assert db.execute("SELECT count(*) FROM load_map_import").fetchone()[0] == 0
+    assert client.get("/api/loadmaps?q=1003").get_json()[0]["title"] == "Run 3"
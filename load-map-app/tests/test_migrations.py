@@ -0,0 +1,32 @@
+import sqlite3
+
+class NoFts5(sqlite3.Connection):
+    """A connection to a SQLite built without FTS5."""
+
+    def executescript(self, sql):
+        if "USING fts5" in sql:
+            raise sqlite3.OperationalError("no such module: fts5")
+        return super().executescript(sql)
+
+def connect(**kwargs):
+    db = sqlite3.connect(":memory:", **kwargs)
+    db.row_factory = sqlite3.Row
+    return db
+
+def tables(db):
+    return {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def test_migrations_build_the_fts_index(app_module):
+    db = connect()
+    app_module.run_migrations(db)
+    assert db.execute("PRAGMA user_version").fetchone()[0] == app_module.MIGRATIONS[-1][0]
+    assert "load_maps_fts" in tables(db)
+    assert db.execute("SELECT count(*) FROM sqlite_master WHERE name LIKE 'load_maps_fts_a_'").fetchone()[0] == 3
+
+def test_fts_step_is_skipped_without_fts5(app_module):
+    db = connect(factory=NoFts5)
+    app_module.run_migrations(db)
+    assert db.execute("PRAGMA user_version").fetchone()[0] == app_module.MIGRATIONS[-1][0]
+    assert not any(name.startswith("load_maps_fts") for name in tables(db))
+    db.execute(app_module.INSERT_LOAD_MAP_SQL, app_module.load_map_values({"title": "a"}, "2024-01-01"))
+    assert db.execute("SELECT count(*) FROM load_maps").fetchone()[0] == 1
@@ -0,0 +1,50 @@
+import pytest
+
+def patch(client, lid, ops):
+    return client.patch(f"/api/loadmaps/{lid}", json=ops)
+
+def test_patch_changes_only_the_given_paths(client, load_map):
+    r = patch(client, load_map["id"], [{"op": "replace", "path": "/pallets_json/1/type", "value": "Eggs"},
+                                       {"op": "add", "path": "/pallets_json/0/zone", "value": "F"},
+                                       {"op": "replace", "path": "/title", "value": "Run 13"}])
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["version"] == load_map["version"] + 1
+    assert body["changed"]["/pallets_json/1/type"] == "Eggs"
+    stored = client.get(f"/api/loadmaps/{load_map['id']}").get_json()
+    assert stored["pallets_json"] == [{"pos": 1, "type": "Frozen", "store": "1234", "zone": "F"},
+                                      {"pos": 2, "type": "Eggs"}]
+    assert stored["title"] == "Run 13"
+
+@pytest.mark.parametrize("op", [
+    {"op": "replace", "path": "/pallets_json/99/type", "value": "Eggs"},
+    {"op": "replace", "path": "/pallets_json/1/zone", "value": "B"},
+    {"op": "remove", "path": "/stops_json/3"},
+    {"op": "remove", "path": "/pallets_json/0/zone"},
+    {"op": "add", "path": "/pallets_json/40/zone", "value": "F"},
+])
+def test_missing_target_is_a_conflict_and_changes_nothing(client, load_map, op):
+    r = patch(client, load_map["id"], [{"op": "replace", "path": "/title", "value": "changed"}, op])
+    assert r.status_code == 409
+    stored = client.get(f"/api/loadmaps/{load_map['id']}").get_json()
+    assert stored["version"] == load_map["version"]
+    assert stored["title"] == "Run 12"
+
+def test_targets_added_earlier_in_the_patch_exist(client, load_map):
+    r = patch(client, load_map["id"], [{"op": "add", "path": "/pallets_json/-", "value": {"pos": 3, "type": ""}},
+                                       {"op": "replace", "path": "/pallets_json/2/type", "value": "Eggs"},
+                                       {"op": "add", "path": "/pallets_json/2/zone", "value": "E"},
+                                       {"op": "remove", "path": "/pallets_json/2/zone"}])
+    assert r.status_code == 200
+    stored = client.get(f"/api/loadmaps/{load_map['id']}").get_json()
+    assert stored["pallets_json"][2] == {"pos": 3, "type": "Eggs"}
+    assert stored["totals_json"]["total"] == 3
+
+def test_failed_test_op_is_a_conflict(client, load_map):
+    r = patch(client, load_map["id"], [{"op": "test", "path": "/pallets_json/0/store", "value": "9999"},
+                                       {"op": "replace", "path": "/pallets_json/0/store", "value": "1"}])
+    assert r.status_code == 409
+
+def test_keys_with_quotes_are_rejected(client, load_map):
+    r = patch(client, load_map["id"], [{"op": "add", "path": '/pallets_json/0/st"ore', "value": "1"}])
+    assert r.status_code == 400
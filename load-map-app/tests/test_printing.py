@@ -0,0 +1,55 @@
+import io
+import pypdf
+import pytest
+
+def test_pdf_streams_a_page_per_map_in_order(app_module, client):
+    maps = [{"title": f"Run {n}", "pallets_json": [{"pos": 1, "type": "Frozen", "store": "1234"}],
+             "stops_json": [{"stop": 1, "loader": "Sam", "driver": "Alex"}]} for n in range(25)]
+    ids = [r["id"] for r in client.post("/api/loadmaps/import", json=maps).get_json()["results"]]
+    r = client.get(f"/api/loadmaps/print?ids={','.join(map(str, ids))}", buffered=False)
+    assert r.status_code == 200 and r.mimetype == "application/pdf"
+    parts = list(r.response)
+    r.close()
+    # Header, one part per rendered chunk as it arrives, then the trailer.
+    chunks = -(-len(maps) // app_module.PRINT_CHUNK_SIZE)
+    assert len([p for p in parts if p]) == chunks + 2
+    pdf = pypdf.PdfReader(io.BytesIO(b"".join(parts)), strict=True)
+    assert pdf.metadata.title == "Load Maps"
+    assert [p.extract_text().split("\n")[0] for p in pdf.pages] == [f"Load Map – Run {n}" for n in range(25)]
+
+def test_pdf_stream_copies_page_contents_unchanged(app_module):
+    maps = [{"id": n, "title": f"Run {n}", "pallets_json": [{"pos": 1, "type": "Frozen", "store": "1234"}]}
+            for n in range(3)]
+    part = app_module.printing.render_pdf(maps)
+    out = app_module.PdfStream("Load Maps")
+    pdf = out.start() + out.add(part) + out.close()
+    copied, original = pypdf.PdfReader(io.BytesIO(pdf), strict=True), pypdf.PdfReader(io.BytesIO(part))
+    assert [p.get_contents().get_data() for p in copied.pages] == [p.get_contents().get_data() for p in original.pages]
+
+def failing_after(good):
+    """A stand-in for rendered() that renders `good` chunks in-process, then fails."""
+    def rendered(chunks, render):
+        for n, chunk in enumerate(chunks):
+            if n == good:
+                raise RuntimeError("renderer crashed")
+            yield render(chunk)
+    return rendered
+
+def print_maps(client, count):
+    ids = [r["id"] for r in client.post("/api/loadmaps/import", json=[{"title": f"Run {n}"}
+                                                                      for n in range(count)]).get_json()["results"]]
+    return client.get(f"/api/loadmaps/print?ids={','.join(map(str, ids))}", buffered=False)
+
+def test_print_fails_before_responding_if_the_first_chunk_fails(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "rendered", failing_after(0))
+    r = print_maps(client, 3)
+    assert r.status_code == 500 and r.get_json() == {"error": "Printing failed"}
+
+def test_print_aborts_the_response_if_a_later_chunk_fails(app_module, client, monkeypatch, caplog):
+    monkeypatch.setattr(app_module, "rendered", failing_after(1))
+    r = print_maps(client, app_module.PRINT_CHUNK_SIZE + 1)
+    assert r.status_code == 200
+    with pytest.raises(RuntimeError, match="renderer crashed"):
+        list(r.response)
+    r.close()
+    assert "aborting the response" in caplog.text
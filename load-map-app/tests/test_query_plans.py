@@ -0,0 +1,24 @@
+def test_hot_queries_use_an_index(app_module):
+    names = [name for name, _, _ in app_module.hot_queries()]
+    plans = list(app_module.explain_hot_queries())
+    assert [name for name, _, _ in plans] == names
+    # The ranked search is planned too wherever the app has its FTS table.
+    assert ("search" in names) == app_module.app.config["FTS_ENABLED"]
+    assert [(name, bad) for name, _, bad in plans if bad] == []
+
+def test_hot_queries_use_an_index_on_the_app_database(app_module):
+    with app_module.app.app_context():
+        plans = list(app_module.explain_hot_queries(app_module.get_db()))
+    assert [(name, bad) for name, _, bad in plans if bad] == []
+
+def test_hot_queries_come_from_the_endpoint_builders(app_module, monkeypatch):
+    # Dropping an index the pallet zone filter needs must fail the check.
+    def without_zone_index(db):
+        db.execute("DROP INDEX idx_load_map_pallets_zone")
+    monkeypatch.setattr(app_module, "MIGRATIONS", app_module.MIGRATIONS + ((99, without_zone_index),))
+    bad = {name: scans for name, _, scans in app_module.explain_hot_queries() if scans}
+    assert bad == {"pallets by zone": ["SCAN p"]}
+
+def test_full_scans_are_caught(app_module):
+    assert app_module.full_scans(["SCAN load_maps", "SCAN lm USING INDEX idx_load_maps_updated",
+                                  "SCAN load_maps_fts VIRTUAL TABLE INDEX 0:"]) == ["SCAN load_maps"]
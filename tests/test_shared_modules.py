@@ -0,0 +1,22 @@
+# Run from the repository root:  python -m pytest tests
+#
+# RUNFINAL and load-map-app each carry a copy of some modules: the apps are
+# deployed separately, each from its own directory, so neither can import
+# the other's.
+import ast
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def tree(path):
+    with open(path) as f:
+        return ast.dump(ast.parse(f.read()))
+
+
+@pytest.mark.parametrize('name', ['metrics.py', 'assets.py'])
+def test_copies_in_both_apps_match(name):
+    # Compared as syntax trees, so only the quote style may differ.
+    assert tree(os.path.join(ROOT, 'RUNFINAL', name)) == tree(os.path.join(ROOT, 'load-map-app', name))